@@ -5,7 +5,28 @@ CELL_SIZE = 60
 
 GRID_OFFSET_X = 195
 GRID_OFFSET_Y = 95
+BOARD_VIEWPORT = (GRID_OFFSET_X, GRID_OFFSET_Y, GRID_SIZE * CELL_SIZE, GRID_SIZE * CELL_SIZE)
+MIN_BOARD_SIZE = 3
+MAX_BOARD_SIZE = 32
+MIN_START_ZOOM = 0.5
+MAX_ZOOM = 1.0
+ZOOM_STEP = 1.25
+EFFECT_LINE = "line"
+EFFECT_BOMB = "bomb"
+EFFECT_COLOR = "color"
+EFFECT_ROW = "row"
+EFFECT_COLUMN = "column"
+EFFECTS = (EFFECT_LINE, EFFECT_BOMB, EFFECT_COLOR)
+BOMB_RADIUS = 1
 FPS = 60
+FIXED_DT = 1.0 / FPS
+SERVER_PORT = 8765
+MAX_FRAME_TIME = 0.25
+MAX_UPDATES_PER_FRAME = 8
+MAX_IDLE_UPDATES = int(MAX_FRAME_TIME * FPS)
+IDLE_WAIT_MS = 250
+LOOP_VARIABLE = "variable"
+LOOP_FIXED = "fixed"
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -25,4 +46,11 @@ GAME_OVER = 2
 HIGH_SCORES = 3
 HELP = 4
 TIME_ATTACK = "time"
-SCORE_CHALLENGE = "score"
\ No newline at end of file
+SCORE_CHALLENGE = "score"
+CASUAL = "casual"
+UNDO_HISTORY_LENGTH = 20
+MODE_NAMES = {
+    TIME_ATTACK: "Time Attack",
+    SCORE_CHALLENGE: "Score Challenge",
+    CASUAL: "Casual"
+}
@@ -1,100 +1,104 @@
 import time
-import os
+from typing import Optional
 from .constants import *
 import pygame
-import xml.etree.ElementTree as ET
 
+from functools import partial
 from .states.menu_state import MenuState
+from .states.loading_state import LoadingState
 
-from .utils.config_loader import ConfigLoader
+from .utils.config_cache import ConfigCache
+from .utils.score_store import ScoreStore
 from .utils.audio_manager import AudioManager
+from .utils.gc_manager import GCManager, GC_DEFAULT
+from .utils.asset_loader import AssetLoader
+from .utils.telemetry import Telemetry, TelemetryWriter
+
+BACKGROUND_FILES = {
+    'menu': 'assets/backgrounds/menu_bg.jpg',
+    'game': 'assets/backgrounds/game_bg.jpg',
+    'help': 'assets/backgrounds/help_bg.jpg',
+    'scores': 'assets/backgrounds/scores_bg.jpg'
+}
 
 
 class JewelQuestGame:
-    def __init__(self):
+    def __init__(self, gc_mode: str = GC_DEFAULT, loop_mode: str = LOOP_VARIABLE,
+                 telemetry_dir: Optional[str] = None):
+        self.gc = GCManager(gc_mode)
+        self.loop_mode = loop_mode
+        self.telemetry = Telemetry(TelemetryWriter(telemetry_dir)) if telemetry_dir else None
 
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Jewel Quest")
         self.clock = pygame.time.Clock()
         self.running = True
+        self.assets = AssetLoader()
         self.backgrounds = self._load_backgrounds()
-        self.levels_config = ConfigLoader.load_levels_config("levels.xml")
-        self.jewels_config = ConfigLoader.load_jewels_config("jewels.xml")
+        self.levels_config, self.jewels_config = ConfigCache().load(
+            "levels.xml", "jewels.xml")
         from .models.jewel_factory import JewelFactory
         self.jewel_factory = JewelFactory(self.jewels_config)
-        self.audio = AudioManager()
+        self.audio = AudioManager(load=False)
+        self.audio.load_async(self.assets)
         self.audio.play_music()
-        self.state = None
+        self.scores = ScoreStore()
+        self.state = LoadingState(self)
 
     def _load_backgrounds(self) -> dict[str, pygame.Surface]:
-        try:
-            return {
-                'menu': pygame.image.load('assets/backgrounds/menu_bg.jpg').convert(),
-                'game': pygame.image.load('assets/backgrounds/game_bg.jpg').convert(),
-                'help': pygame.image.load('assets/backgrounds/help_bg.jpg').convert(),
-                'scores': pygame.image.load('assets/backgrounds/scores_bg.jpg').convert()
-            }
-        except Exception:
-            default = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            default.fill(BACKGROUND_COLOR)
-            return {
-                'menu': default.copy(),
-                'game': default.copy(),
-                'help': default.copy(),
-                'scores': default.copy()
-            }
+        default = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        default.fill(BACKGROUND_COLOR)
+        backgrounds = {}
+        for key, path in BACKGROUND_FILES.items():
+            backgrounds[key] = default.copy()
+            self.assets.submit(f"background:{key}", partial(pygame.image.load, path),
+                               partial(self._set_background, key))
+        return backgrounds
+
+    def _set_background(self, key: str, image: pygame.Surface):
+        self.backgrounds[key] = image.convert()
+
+    def _poll_assets(self):
+        if self.assets.pending:
+            self.assets.poll()
+            if self.assets.done:
+                self.gc.freeze_startup_heap()
 
     def set_state(self, new_state):
         self.state = new_state
 
-    def is_high_score(self, score):
-        if not os.path.exists("high_scores.xml"):
-            root = ET.Element('high_scores')
-            tree = ET.ElementTree(root)
-            tree.write("high_scores.xml")
-
-        try:
-            self.scores = ConfigLoader.load_high_scores("high_scores.xml")
-        except Exception:
-            self.scores = []
-        is_high_score = False
-
-        if not self.scores:
-            is_high_score = True
-        elif score > int(self.scores[0]['points']):
-            is_high_score = True
-
-        if not is_high_score:
-            is_high_score = False
-        return is_high_score
+    def is_high_score(self, score: int, mode: str = TIME_ATTACK) -> bool:
+        return self.scores.is_high_score(mode, score)
 
     def save_high_score(self, mode: str, level: int,
                         score: int, time_left=0, player_name=None):
+        self.scores.add(player_name or "", score, level, mode)
 
-        if mode != TIME_ATTACK:
+    def run(self):
+        if self.loop_mode == LOOP_FIXED:
+            self._run_fixed()
+        else:
+            self._run_variable()
+        self.assets.shutdown()
+        self.scores.close()
+        if self.telemetry:
+            self.telemetry.close()
+        self.gc.restore()
+        if self.gc.mode == GC_DEFAULT:
             return
+        report = self.gc.report()
+        print(f"GC ({report['mode']}): {report['collections']} collections, "
+              f"max pause {report['max_pause_ms']:.2f} ms, p99 {report['p99_pause_ms']:.2f} ms, "
+              f"{report['hitches']} hitches")
 
-        new_record = {
-            'name': player_name,
-            'points': str(score),
-            'level': f"Level: {level}",
-            'mode': "Time Attack",
-            'date': time.strftime("%Y-%m-%d")
-        }
-
-        self.scores.insert(0, new_record)
-
-        self.scores.sort(key=lambda x: int(x['points']), reverse=True)
-        self.scores = self.scores[:10]
-
-        ConfigLoader.save_high_scores("high_scores.xml", self.scores)
-
-    def run(self):
+    def _run_variable(self):
         last_time = time.time()
         while self.running:
             current_time = time.time()
             dt = current_time - last_time
             last_time = current_time
+            if self.telemetry:
+                self.telemetry.frame(dt)
 
             dt = min(dt, 0.1)
 
@@ -102,10 +106,58 @@ class JewelQuestGame:
             for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
+                self.audio.handle_event(event)
 
+            self._poll_assets()
+            self.audio.update(dt)
             self.state.handle_events(events)
             self.state.update(dt)
             self.state.draw(self.screen)
             pygame.display.flip()
+            self.gc.on_frame(self.state.is_idle())
 
             self.clock.tick(60)
+
+    def _run_fixed(self):
+        accumulator = 0.0
+        previous = time.perf_counter()
+        while self.running:
+            static = self.state.is_static() and not self.audio.fade_remaining
+            if static:
+                events = [pygame.event.wait(IDLE_WAIT_MS)]
+                events.extend(pygame.event.get())
+                events = [event for event in events if event.type != pygame.NOEVENT]
+            else:
+                events = pygame.event.get()
+
+            current = time.perf_counter()
+            if self.telemetry and not static:
+                self.telemetry.frame(current - previous)
+            frame_time = min(current - previous, MAX_FRAME_TIME)
+            accumulator += frame_time
+            previous = current
+
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                self.audio.handle_event(event)
+            self._poll_assets()
+            self.audio.update(frame_time)
+            self.state.handle_events(events)
+
+            max_steps = MAX_IDLE_UPDATES if static else MAX_UPDATES_PER_FRAME
+            steps = 0
+            while accumulator >= FIXED_DT and steps < max_steps:
+                self.state.update(FIXED_DT)
+                accumulator -= FIXED_DT
+                steps += 1
+            if steps == max_steps:
+                accumulator %= FIXED_DT
+
+            self.state.render_alpha = accumulator / FIXED_DT
+            self.state.draw(self.screen)
+            pygame.display.flip()
+            self.gc.on_frame(self.state.is_idle())
+
+            if not static:
+                self.clock.tick(FPS)
@@ -0,0 +1,29 @@
+import pygame
+from .constants import *
+from .models.jewel_factory import JewelFactory
+from .utils.audio_manager import AudioManager
+from .utils.config_cache import ConfigCache
+
+
+class HeadlessGame:
+    def __init__(self, levels_file: str = "levels.xml", jewels_file: str = "jewels.xml",
+                 display: bool = True):
+        pygame.init()
+        self.screen = None
+        if display:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background.fill(BACKGROUND_COLOR)
+        self.backgrounds = {'game': background}
+        self.levels_config, self.jewels_config = ConfigCache().load(levels_file, jewels_file)
+        self.jewel_factory = JewelFactory(self.jewels_config)
+        self.audio = AudioManager(load=False)
+        self.audio.set_mute(True)
+        self.telemetry = None
+        self.state = None
+
+    def set_state(self, new_state):
+        self.state = new_state
+
+    def is_high_score(self, score: int, mode: str = TIME_ATTACK) -> bool:
+        return False
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .constants import TIME_ATTACK, SERVER_PORT
+
+
+def find_moves(cells: bytes, width: int, height: int) -> List[Tuple[int, int, int, int]]:
+    def matches_at(grid, x, y):
+        kind = grid[y * width + x]
+        if not kind:
+            return False
+        left = x
+        while left > 0 and grid[y * width + left - 1] == kind:
+            left -= 1
+        right = x
+        while right < width - 1 and grid[y * width + right + 1] == kind:
+            right += 1
+        if right - left >= 2:
+            return True
+        top = y
+        while top > 0 and grid[(top - 1) * width + x] == kind:
+            top -= 1
+        bottom = y
+        while bottom < height - 1 and grid[(bottom + 1) * width + x] == kind:
+            bottom += 1
+        return bottom - top >= 2
+
+    grid = bytearray(cells)
+    moves = []
+    for y in range(height):
+        for x in range(width):
+            for nx, ny in ((x + 1, y), (x, y + 1)):
+                if nx >= width or ny >= height:
+                    continue
+                a, b = y * width + x, ny * width + nx
+                grid[a], grid[b] = grid[b], grid[a]
+                if matches_at(grid, x, y) or matches_at(grid, nx, ny):
+                    moves.append((x, y, nx, ny))
+                grid[a], grid[b] = grid[b], grid[a]
+    return moves
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.latencies: Dict[str, List[float]] = {}
+
+    async def request(self, **request) -> Dict:
+        self.next_id += 1
+        request['id'] = self.next_id
+        started = time.perf_counter()
+        self.writer.write(json.dumps(request, separators=(',', ':')).encode() + b'\n')
+        await self.writer.drain()
+        line = await self.reader.readline()
+        self.latencies.setdefault(request['op'], []).append(time.perf_counter() - started)
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+
+async def connect(host: str, port: int, path: Optional[str]) -> Client:
+    if path:
+        return Client(*await asyncio.open_unix_connection(path))
+    return Client(*await asyncio.open_connection(host, port))
+
+
+async def run_client(index: int, args, deadline: float, totals: Dict) -> Dict[str, List[float]]:
+    client = await connect(args.host, args.port, args.unix)
+    rng = random.Random(args.seed + index)
+    try:
+        while time.perf_counter() < deadline:
+            response = await client.request(op='create', mode=args.mode, level=args.level,
+                                             seed=rng.getrandbits(63))
+            if not response['ok']:
+                raise RuntimeError(response['error'])
+            state = response['state']
+            session = state['session']
+            totals['sessions'] += 1
+            while not state['finished'] and time.perf_counter() < deadline:
+                moves = find_moves(bytes.fromhex(state['cells']), state['width'], state['height'])
+                if not moves:
+                    break
+                response = await client.request(op='swap', session=session, state=True,
+                                                **dict(zip(('x1', 'y1', 'x2', 'y2'),
+                                                           rng.choice(moves))))
+                if not response['ok']:
+                    totals['errors'] += 1
+                    break
+                totals['swaps'] += 1
+                totals['points'] += response['points']
+                state = response['state']
+            await client.request(op='close', session=session)
+    finally:
+        client.writer.close()
+    return client.latencies
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def load_test(args) -> Dict:
+    totals = {'sessions': 0, 'swaps': 0, 'points': 0, 'errors': 0}
+    started = time.perf_counter()
+    deadline = started + args.duration
+    results = await asyncio.gather(*(run_client(i, args, deadline, totals)
+                                     for i in range(args.clients)))
+    wall_time = time.perf_counter() - started
+    requests = sum(len(values) for result in results for values in result.values())
+    latencies = [latency for result in results for latency in result.get('swap', ())]
+    totals.update(
+        requests=requests,
+        swap_requests=len(latencies),
+        wall_time=wall_time,
+        swaps_per_second=totals['swaps'] / wall_time if wall_time else 0.0,
+        p50_ms=percentile(latencies, 0.50) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        max_ms=max(latencies, default=0.0) * 1000)
+    return totals
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test a Jewel Quest server.")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--unix', help="connect to a Unix socket instead of TCP")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--mode', default=TIME_ATTACK)
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        result = asyncio.run(load_test(args))
+    except (OSError, RuntimeError) as e:
+        print(f"Load test failed: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.clients} clients, {result['sessions']} sessions, {result['swaps']} swaps "
+          f"in {result['wall_time']:.1f}s: {result['swaps_per_second']:.0f} swaps/s")
+    print(f"swap latency p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+          f"max {result['max_ms']:.2f} ms over {result['swap_requests']} swaps "
+          f"({result['requests']} requests), {result['errors']} errors")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
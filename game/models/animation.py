@@ -0,0 +1,117 @@
+from typing import Callable, Dict, Iterator, List, Optional
+from .jewel import Jewel
+from .tween_backend import NumpyTweenBackend
+
+MOVE = "move"
+FALL = "fall"
+SHAKE = "shake"
+DESTROY = "destroy"
+
+
+class Tween:
+    __slots__ = ('kind', 'callbacks')
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.callbacks: List[Callable[[Jewel], None]] = []
+
+
+class AnimationSystem:
+    def __init__(self, backend: Optional[NumpyTweenBackend] = None):
+        self.active: Dict[Jewel, Tween] = {}
+        self.backend = backend
+        self.scalar: Dict[Jewel, Tween] = self.active if backend is None else {}
+
+    @property
+    def is_idle(self) -> bool:
+        return len(self.active) == 0
+
+    def move(self, jewel: Jewel, x: int, y: int,
+             on_complete: Optional[Callable[[Jewel], None]] = None):
+        jewel.move_to(x, y)
+        self._track(jewel, MOVE, on_complete)
+
+    def fall(self, jewel: Jewel, x: int, y: int,
+             on_complete: Optional[Callable[[Jewel], None]] = None):
+        jewel.move_to(x, y)
+        self._track(jewel, FALL, on_complete)
+
+    def spawn(self, jewel: Jewel, from_row: int = -1,
+              on_complete: Optional[Callable[[Jewel], None]] = None):
+        jewel.drop_in(from_row)
+        self._track(jewel, FALL, on_complete)
+
+    def shake(self, jewel: Jewel,
+              on_complete: Optional[Callable[[Jewel], None]] = None):
+        jewel.shake_animation()
+        self._track(jewel, SHAKE, on_complete)
+
+    def destroy(self, jewel: Jewel,
+                on_complete: Optional[Callable[[Jewel], None]] = None):
+        jewel.start_destroy_animation()
+        self._track(jewel, DESTROY, on_complete)
+
+    def jewels(self, kind: str) -> Iterator[Jewel]:
+        for jewel, tween in self.active.items():
+            if tween.kind == kind:
+                yield jewel
+
+    def cancel(self, jewel: Jewel):
+        self.active.pop(jewel, None)
+        if self.backend is not None:
+            self.scalar.pop(jewel, None)
+            self.backend.discard(jewel)
+
+    def clear(self):
+        for jewel in list(self.active):
+            self.cancel(jewel)
+
+    def update(self, dt: float):
+        if not self.active:
+            return
+        for jewel in self.active:
+            jewel.prev_x = jewel.screen_x
+            jewel.prev_y = jewel.screen_y
+        finished = [jewel for jewel in self.scalar if not jewel.update(dt)]
+        if self.backend is not None:
+            for jewel in finished:
+                del self.scalar[jewel]
+            if self.backend.count:
+                finished.extend(self.backend.step(dt))
+        for jewel in finished:
+            jewel.prev_x = jewel.screen_x
+            jewel.prev_y = jewel.screen_y
+            tween = self.active.pop(jewel)
+            for callback in tween.callbacks:
+                callback(jewel)
+
+    def _track(self, jewel: Jewel, kind: str,
+               on_complete: Optional[Callable[[Jewel], None]]):
+        tween = self.active.get(jewel)
+        if tween is None:
+            tween = self.active[jewel] = Tween(kind)
+        elif kind != SHAKE:
+            tween.kind = kind
+        if on_complete:
+            tween.callbacks.append(on_complete)
+        if self.backend is None:
+            return
+        if jewel.shaking:
+            self.backend.discard(jewel)
+            self.scalar[jewel] = tween
+            return
+        self.scalar.pop(jewel, None)
+        if kind == DESTROY:
+            self.backend.add_fade(jewel)
+        else:
+            self.backend.add_position(jewel)
+
+
+class InstantAnimationSystem(AnimationSystem):
+    def _track(self, jewel: Jewel, kind: str,
+               on_complete: Optional[Callable[[Jewel], None]]):
+        jewel.animating = jewel.destroying = jewel.shaking = False
+        jewel.screen_x = jewel.prev_x = jewel.target_x
+        jewel.screen_y = jewel.prev_y = jewel.target_y
+        if on_complete:
+            on_complete(jewel)
@@ -1,19 +1,32 @@
 import pygame
 import random
-import time
-from typing import List, Dict, Tuple, Optional
+import zlib
+from typing import List, Dict, Set, Tuple, Optional
 from .jewel import Jewel
 from .jewel_factory import JewelFactory
+from .animation import AnimationSystem, DESTROY
+from .board_layout import BoardLayout
+from .board_history import BoardHistory, BoardState
+from .event_bus import (EventBus, SWAP, MATCH, CASCADE_WAVE, CASCADE_END, RESHUFFLE,
+                        SwapEvent, MatchEvent, CascadeWaveEvent, CascadeEndEvent, ReshuffleEvent)
+from .match_group import MatchGroup, SHAPE_LINE, SHAPES_BY_RANK
+from .tween_backend import default_backend
+from ..utils.snapshot import BoardSnapshot
 from ..utils.audio_manager import AudioManager
 from ..constants import *
 
 class GridManager:
     
-    def __init__(self, width: int, height: int, jewel_factory: JewelFactory):
+    def __init__(self, width: int, height: int, jewel_factory: JewelFactory,
+                 animator: AnimationSystem, rng: Optional[random.Random] = None):
         self.width = width
         self.height = height
         self.jewel_factory = jewel_factory
+        self.animator = animator
+        self.rng = rng or random.Random()
         self.grid = [[None for _ in range(width)] for _ in range(height)]
+        self.revision = 0
+        self.dirty_columns: Set[int] = set()
     
     def fill_board(self, avoid_matches=True):
         for y in range(self.height):
@@ -43,9 +56,29 @@ class GridManager:
                         if up1 == up2 and up1 in possible_types:
                             possible_types.remove(up1)
 
-                jewel_type = random.choice(possible_types)
+                jewel_type = self.rng.choice(possible_types)
+                if self.grid[y][x]:
+                    self.animator.cancel(self.grid[y][x])
+                    self.jewel_factory.release(self.grid[y][x])
                 self.grid[y][x] = self.jewel_factory.create_jewel(
                     jewel_type, x, y)
+        self.dirty_columns.clear()
+        self.revision += 1
+
+    def set_jewel(self, x: int, y: int, jewel: Optional[Jewel]):
+        self.grid[y][x] = jewel
+        if jewel is None:
+            self.dirty_columns.add(x)
+        self.revision += 1
+
+    def clear_cell(self, x: int, y: int) -> Optional[Jewel]:
+        jewel = self.grid[y][x]
+        self.grid[y][x] = None
+        self.dirty_columns.add(x)
+        return jewel
+
+    def swap_cells(self, x1: int, y1: int, x2: int, y2: int):
+        self.grid[y1][x1], self.grid[y2][x2] = self.grid[y2][x2], self.grid[y1][x1]
     
     def get_jewel_at(self, x: int, y: int) -> Optional[Jewel]:
         if 0 <= x < self.width and 0 <= y < self.height:
@@ -58,89 +91,206 @@ class GridManager:
         jewel2 = self.get_jewel_at(x2, y2)
         
         if jewel1 and jewel2:
-            self.grid[y1][x1], self.grid[y2][x2] = self.grid[y2][x2], self.grid[y1][x1]
-            jewel1.x, jewel1.y = x2, y2
-            jewel2.x, jewel2.y = x1, y1
-            jewel1.move_to(x2, y2)  
-            jewel2.move_to(x1, y1)
+            self.swap_cells(x1, y1, x2, y2)
+            self.animator.move(jewel1, x2, y2)
+            self.animator.move(jewel2, x1, y1)
+            self.revision += 1
             return True
         return False
     
-    def collapse_columns(self):
-        
-        for x in range(self.width):
-            empty_spaces = []
+    def collapse_columns(self) -> Dict[int, List[Tuple[int, int]]]:
+        grid = self.grid
+        falls = {}
+        for x in self.dirty_columns:
+            write = self.height - 1
+            moves = []
             for y in range(self.height - 1, -1, -1):
-                if self.grid[y][x] is None:
-                    empty_spaces.append(y)
-                elif empty_spaces:
-                    lowest_empty = empty_spaces.pop(0)
-                    self.grid[lowest_empty][x] = self.grid[y][x]
-                    self.grid[y][x] = None
-                    self.grid[lowest_empty][x].move_to(x, lowest_empty)
-                    empty_spaces.append(y)
+                jewel = grid[y][x]
+                if jewel is None:
+                    continue
+                if y != write:
+                    grid[write][x] = jewel
+                    grid[y][x] = None
+                    self.animator.fall(jewel, x, write)
+                    moves.append((y, write))
+                write -= 1
+            if moves:
+                falls[x] = moves
+        self.revision += 1
+        return falls
     
-    def refill_board(self):
-       
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.grid[y][x] is None:
-                    new_jewel = self.jewel_factory.create_random_jewel(x, y)
-                    
-                    new_jewel.screen_x = GRID_OFFSET_X + x * CELL_SIZE 
-                    new_jewel.screen_y = GRID_OFFSET_Y - CELL_SIZE  
-                    new_jewel.target_x = GRID_OFFSET_X + x * CELL_SIZE+5
-                    new_jewel.target_y = GRID_OFFSET_Y + y * CELL_SIZE+5
-                    new_jewel.start_x = new_jewel.screen_x
-                    new_jewel.start_y = new_jewel.screen_y
-                    new_jewel.animating = True
-                    new_jewel.animation_start_time = time.time()
-                    self.grid[y][x] = new_jewel
+    def refill_board(self) -> Dict[int, List[int]]:
+        grid = self.grid
+        spawns = {}
+        for x in self.dirty_columns:
+            types = []
+            for y in range(self.height):
+                if grid[y][x] is not None:
+                    break
+                new_jewel = self.jewel_factory.create_random_jewel(x, y, self.rng)
+                self.animator.spawn(new_jewel)
+                grid[y][x] = new_jewel
+                types.append(new_jewel.type)
+            if types:
+                spawns[x] = types
+        self.dirty_columns.clear()
+        self.revision += 1
+        return spawns
+
+NO_OWNER = -1
+
+
+def _find_runs(lines) -> List[Tuple[int, int, int]]:
+    runs = []
+    for line, jewels in enumerate(lines):
+        size = len(jewels)
+        x = 2
+        while x < size:
+            jewel = jewels[x]
+            if jewel is None:
+                x += 3
+                continue
+            jewel_type = jewel.type
+            start = x
+            while start:
+                other = jewels[start - 1]
+                if other is None or other.type != jewel_type:
+                    break
+                start -= 1
+            end = x + 1
+            while end < size:
+                other = jewels[end]
+                if other is None or other.type != jewel_type:
+                    break
+                end += 1
+            if end - start >= 3:
+                runs.append((line, start, end))
+                x = end + 2
+            else:
+                x += 3
+    return runs
+
 
 class MatchFinder:
     
     def __init__(self, grid_manager: GridManager):
         self.grid_manager = grid_manager
+        self.row_cells: List[List[Tuple[int, int]]] = []
+        self.column_cells: List[List[Tuple[int, int]]] = []
+        self.run_ranks: List[List[int]] = []
+
+    def _cell_tables(self, width: int, height: int):
+        if len(self.row_cells) != height or len(self.column_cells) != width:
+            self.row_cells = [[(x, y) for x in range(width)] for y in range(height)]
+            self.column_cells = [[(x, y) for y in range(height)] for x in range(width)]
+            self.run_ranks = [[2] + [3] * (length - 2) + [2]
+                              for length in range(max(width, height) + 1)]
+        return self.row_cells, self.column_cells, self.run_ranks
     
-    def find_matches(self) -> List[List[Tuple[int, int]]]:
-        matches = []
+    def find_matches(self) -> List[MatchGroup]:
         grid = self.grid_manager.grid
-        width, height = self.grid_manager.width, self.grid_manager.height
-        
-        
-        for y in range(height):
-            x = 0
-            while x < width - 2:
-                jewel = grid[y][x]
-                if jewel:
-                    match_length = 1
-                    while x + match_length < width and grid[y][x + match_length] and grid[y][x + match_length].type == jewel.type:
-                        match_length += 1
-
-                    if match_length >= 3:
-                        matches.append([(x + i, y) for i in range(match_length)])
-                        x += match_length
-                        continue
-                x += 1
-        
-       
-        for x in range(width):
-            y = 0
-            while y < height - 2:
-                jewel = grid[y][x]
-                if jewel:
-                    match_length = 1
-                    while y + match_length < height and grid[y + match_length][x] and grid[y + match_length][x].type == jewel.type:
-                        match_length += 1
+        width = self.grid_manager.width
+        row_cells, column_cells, run_ranks = self._cell_tables(width, len(grid))
+        runs = []
+        owners = ranks = None
+        for y, start, end in _find_runs(grid):
+            if owners is None:
+                owners = [NO_OWNER] * (width * len(grid))
+                ranks = [0] * (width * len(grid))
+            length = end - start
+            owners[y * width + start:y * width + end] = [len(runs)] * length
+            ranks[y * width + start:y * width + end] = run_ranks[length]
+            runs.append(row_cells[y][start:end])
 
-                    if match_length >= 3:
-                        matches.append([(x, y + i) for i in range(match_length)])
-                        y += match_length
-                        continue
-                y += 1
+        groups = {}
+        for x, start, end in _find_runs(zip(*grid)):
+            crossing = ranks and ranks[start * width + x:end * width + x:width]
+            if not crossing or not max(crossing):
+                runs.append(column_cells[x][start:end])
+                continue
+            if crossing[0]:
+                crossing[0] -= 1
+            if crossing[-1]:
+                crossing[-1] -= 1
+            best = max(crossing)
+            key = (-best, start + crossing.index(best), x)
+            index = len(runs)
+            group = None
+            for owner in owners[start * width + x:end * width + x:width]:
+                if owner < 0:
+                    continue
+                other = groups.get(owner)
+                if other is None:
+                    if group is None:
+                        group = groups[index] = [key, [index]]
+                    group[1].append(owner)
+                    groups[owner] = group
+                elif group is None:
+                    group = groups[index] = other
+                    other[1].append(index)
+                    if key < other[0]:
+                        other[0] = key
+                elif other is not group:
+                    group[1].extend(other[1])
+                    for member in other[1]:
+                        groups[member] = group
+                    if other[0] < group[0]:
+                        group[0] = other[0]
+            runs.append(column_cells[x][start:end])
 
+        matches = []
+        for index, cells in enumerate(runs):
+            group = groups.get(index)
+            if group is None:
+                matches.append(MatchGroup(cells, grid[cells[0][1]][cells[0][0]].type))
+                continue
+            members = group[1]
+            if members is None:
+                continue
+            group[1] = None
+            members.sort()
+            cells = []
+            longest = 0
+            for member in members:
+                run_cells = runs[member]
+                cells += run_cells
+                if len(run_cells) > longest:
+                    longest = len(run_cells)
+            cells = list(dict.fromkeys(cells))
+            rank, y, x = group[0]
+            matches.append(MatchGroup(cells, grid[y][x].type, SHAPES_BY_RANK[-rank], longest,
+                                      (x, y)))
         return matches
-    
+
+    def has_match_at(self, x: int, y: int) -> bool:
+        grid = self.grid_manager.grid
+        jewel = grid[y][x]
+        if not jewel:
+            return False
+        row = grid[y]
+        left = x
+        while left > 0 and row[left - 1] and row[left - 1].type == jewel.type:
+            left -= 1
+        right = x
+        while right < self.grid_manager.width - 1 and row[right + 1] and row[right + 1].type == jewel.type:
+            right += 1
+        if right - left >= 2:
+            return True
+        top = y
+        while top > 0 and grid[top - 1][x] and grid[top - 1][x].type == jewel.type:
+            top -= 1
+        bottom = y
+        while bottom < self.grid_manager.height - 1 and grid[bottom + 1][x] and grid[bottom + 1][x].type == jewel.type:
+            bottom += 1
+        return bottom - top >= 2
+
+    def swap_creates_match(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        grid = self.grid_manager.grid
+        grid[y1][x1], grid[y2][x2] = grid[y2][x2], grid[y1][x1]
+        has_match = self.has_match_at(x1, y1) or self.has_match_at(x2, y2)
+        grid[y1][x1], grid[y2][x2] = grid[y2][x2], grid[y1][x1]
+        return has_match
+
     def has_possible_moves(self) -> bool:
         
         grid = self.grid_manager.grid
@@ -148,20 +298,11 @@ class MatchFinder:
         
         for y in range(height):
             for x in range(width):
-                for dx, dy in [(1, 0), (0, 1), (-1, 0), (0, -1)]:
+                for dx, dy in [(1, 0), (0, 1)]:
                     nx, ny = x + dx, y + dy
-                    if 0 <= nx < width and 0 <= ny < height:
-                        
-                        grid[y][x], grid[ny][nx] = grid[ny][nx], grid[y][x]
-                        
-                        
-                        temp_matches = self.find_matches()
-                        if temp_matches:
-                           
-                            grid[y][x], grid[ny][nx] = grid[ny][nx], grid[y][x]
+                    if nx < width and ny < height and grid[y][x] and grid[ny][nx]:
+                        if self.swap_creates_match(x, y, nx, ny):
                             return True
-                        
-                        grid[y][x], grid[ny][nx] = grid[ny][nx], grid[y][x]
         return False
 
 class GameRules:
@@ -170,93 +311,208 @@ class GameRules:
         self.grid_manager = grid_manager
         self.match_finder = match_finder
         self.audio = audio
+        self.last_swap: List[Tuple[int, int]] = []
+        self.last_specials: Dict[Tuple[int, int], str] = {}
     
     def is_valid_swap(self, x1: int, y1: int, x2: int, y2: int) -> bool:
         
         if not self.grid_manager.get_jewel_at(x1, y1) or not self.grid_manager.get_jewel_at(x2, y2):
             return False
 
-        
-        self.grid_manager.swap_jewels(x1, y1, x2, y2)
-        
-       
-        has_matches = bool(self.match_finder.find_matches())
-        
-      
-        self.grid_manager.swap_jewels(x1, y1, x2, y2)
-        
-        return has_matches
+        return self.match_finder.swap_creates_match(x1, y1, x2, y2)
     
-    def remove_matches(self, matches: List[List[Tuple[int, int]]]) -> Tuple[int, Dict]:
+    def remove_matches(self, matches: List[MatchGroup]) -> Tuple[int, Dict[int, int], List[Jewel]]:
        
         points = 0
-        jewels_to_remove = set()
         jewel_types_collected = {}
         grid = self.grid_manager.grid
-        
-        for match in matches:
-            for x, y in match:
-                if (x, y) not in jewels_to_remove:
-                    jewels_to_remove.add((x, y))
-                    jewel_type = grid[y][x].type
-                    jewel_types_collected[jewel_type] = jewel_types_collected.get(jewel_type, 0) + 1
+        created = self.plan_specials(matches)
+        self.last_specials = created
+        self.last_swap = []
+        matched = {cell for match in matches for cell in match}
+        cleared = self.expand_effects(matched - created.keys()) - created.keys()
+
         removed_jewels = []
-        for x, y in jewels_to_remove:
-            grid[y][x].start_destroy_animation()
-            removed_jewels.append(grid[y][x])
-            points += grid[y][x].points
-            grid[y][x] = None
+        for x, y in cleared:
+            jewel = self.grid_manager.clear_cell(x, y)
+            if jewel is None:
+                continue
+            removed_jewels.append(jewel)
+            points += jewel.points
+            jewel_types_collected[jewel.type] = jewel_types_collected.get(jewel.type, 0) + 1
+        for (x, y), effect in created.items():
+            grid[y][x].special = effect
         
-        return points, jewel_types_collected,removed_jewels
+        return points, jewel_types_collected, removed_jewels
+
+    def plan_specials(self, matches: List[MatchGroup]) -> Dict[Tuple[int, int], str]:
+        grid = self.grid_manager.grid
+        specials = {}
+        if not self.last_swap:
+            return specials
+        for group in matches:
+            if group.longest >= 5:
+                effect = EFFECT_COLOR
+            elif group.shape != SHAPE_LINE:
+                effect = EFFECT_BOMB
+            elif group.longest == 4:
+                effect = None
+            else:
+                continue
+            x, y = cell = self._special_cell(group)
+            if grid[y][x].special:
+                continue
+            if effect is None:
+                effect = grid[y][x].effect if grid[y][x].effect in EFFECTS else EFFECT_LINE
+            if effect == EFFECT_LINE:
+                effect = EFFECT_ROW if group.cells[0][1] == group.cells[-1][1] else EFFECT_COLUMN
+            specials[cell] = effect
+        return specials
+
+    def expand_effects(self, cells: Set[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        grid = self.grid_manager.grid
+        cleared = set(cells)
+        pending = [(x, y) for x, y in cleared if grid[y][x] and grid[y][x].special]
+        cells_by_type = None
+        while pending:
+            x, y = pending.pop()
+            jewel = grid[y][x]
+            if jewel.special == EFFECT_COLOR:
+                if cells_by_type is None:
+                    cells_by_type = self._cells_by_type()
+                area = cells_by_type.get(jewel.type, ())
+            else:
+                area = self._effect_area(jewel.special, x, y)
+            for cell in area:
+                if cell in cleared:
+                    continue
+                cleared.add(cell)
+                other = grid[cell[1]][cell[0]]
+                if other and other.special:
+                    pending.append(cell)
+        return cleared
+
+    def _special_cell(self, group: MatchGroup) -> Tuple[int, int]:
+        for cell in self.last_swap:
+            if cell in group:
+                return cell
+        if group.pivot:
+            return group.pivot
+        return group.cells[len(group.cells) // 2]
+
+    def _effect_area(self, effect: str, x: int, y: int) -> List[Tuple[int, int]]:
+        width, height = self.grid_manager.width, self.grid_manager.height
+        if effect == EFFECT_BOMB:
+            return [(cx, cy)
+                    for cy in range(max(0, y - BOMB_RADIUS), min(height, y + BOMB_RADIUS + 1))
+                    for cx in range(max(0, x - BOMB_RADIUS), min(width, x + BOMB_RADIUS + 1))]
+        if effect == EFFECT_COLUMN:
+            return [(x, cy) for cy in range(height)]
+        return [(cx, y) for cx in range(width)]
+
+    def _cells_by_type(self) -> Dict[int, List[Tuple[int, int]]]:
+        cells = {}
+        for y, row in enumerate(self.grid_manager.grid):
+            for x, jewel in enumerate(row):
+                if jewel:
+                    cells.setdefault(jewel.type, []).append((x, y))
+        return cells
 
 class BoardRenderer:
     
-    def __init__(self, grid_manager: GridManager):
+    def __init__(self, grid_manager: GridManager, layout: BoardLayout):
         self.grid_manager = grid_manager
+        self.layout = layout
     
-    def draw(self, screen: pygame.Surface):
-       
-        pygame.draw.rect(screen, BACKGROUND_COLOR,
-                         (GRID_OFFSET_X - 5, GRID_OFFSET_Y - 5,
-                          GRID_SIZE * CELL_SIZE + 10, GRID_SIZE * CELL_SIZE + 10))
+    def draw(self, screen: pygame.Surface, alpha: float = 1.0, overlay=()):
+        layout = self.layout
+        clip = screen.get_clip()
+        screen.set_clip(layout.viewport.inflate(10, 10).clip(clip))
 
-        for x in range(GRID_SIZE + 1):
-            pygame.draw.line(screen, GRAY,
-                             (GRID_OFFSET_X + x * CELL_SIZE, GRID_OFFSET_Y),
-                             (GRID_OFFSET_X + x * CELL_SIZE, GRID_OFFSET_Y + GRID_SIZE * CELL_SIZE), 2)
+        pygame.draw.rect(screen, BACKGROUND_COLOR, layout.board_rect.inflate(10, 10))
+        screen.set_clip(layout.viewport.clip(clip))
 
-        for y in range(GRID_SIZE + 1):
+        x0, y0, x1, y1 = layout.visible_cells()
+        origin_x, origin_y = layout.origin
+        cell = layout.cell
+        line_width = max(1, round(2 * layout.zoom))
+        top, bottom = origin_y + y0 * cell, origin_y + y1 * cell
+        for x in range(x0, x1 + 1):
             pygame.draw.line(screen, GRAY,
-                             (GRID_OFFSET_X, GRID_OFFSET_Y + y * CELL_SIZE),
-                             (GRID_OFFSET_X + GRID_SIZE * CELL_SIZE, GRID_OFFSET_Y + y * CELL_SIZE), 2)
-
+                             (origin_x + x * cell, top), (origin_x + x * cell, bottom), line_width)
+        left, right = origin_x + x0 * cell, origin_x + x1 * cell
+        for y in range(y0, y1 + 1):
+            pygame.draw.line(screen, GRAY,
+                             (left, origin_y + y * cell), (right, origin_y + y * cell), line_width)
 
-        for row in self.grid_manager.grid:
-            for jewel in row:
+        x0, y0, x1, y1 = layout.visible_cells(margin=1)
+        grid = self.grid_manager.grid
+        for y in range(y0, y1):
+            row = grid[y]
+            for x in range(x0, x1):
+                jewel = row[x]
                 if jewel:
-                    jewel.draw(screen)
+                    jewel.draw(screen, layout, alpha)
+        for jewel in overlay:
+            if layout.is_visible(jewel.screen_x, jewel.screen_y):
+                jewel.draw(screen, layout, alpha)
+
+        screen.set_clip(clip)
 
 class Board:
    
-    def __init__(self, width: int, height: int, jewel_factory: JewelFactory, audio: AudioManager):
+    def __init__(self, width: int, height: int, jewel_factory: JewelFactory, audio: AudioManager,
+                 layout: Optional[BoardLayout] = None, seed: Optional[int] = None,
+                 fill: bool = True, history_length: int = UNDO_HISTORY_LENGTH,
+                 animator: Optional[AnimationSystem] = None):
         self.width = width
         self.height = height
         self.jewel_factory = jewel_factory
         self.audio = audio
+        self.layout = layout or BoardLayout(width, height)
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.rng = random.Random(self.seed)
         self.selected_jewel = None
-        self.animations = []
-        self.is_moving = False
-        
+        self.move_count = 0
+        self.last_move: Optional[Tuple[int, int, int, int]] = None
+        self.checked_revision = -1
+        self.found_revision = -1
+        self.found_matches: List[MatchGroup] = []
+        self.resolve_count = 0
+        self.animator = animator or AnimationSystem(default_backend())
+        self.history = BoardHistory(history_length)
+        self.stream = None
+        self.events = EventBus()
+        self.cascade_waves = 0
+        self.cascade_points = 0
 
-        self.grid_manager = GridManager(width, height, jewel_factory)
+        self.grid_manager = GridManager(width, height, jewel_factory, self.animator, self.rng)
         self.match_finder = MatchFinder(self.grid_manager)
         self.game_rules = GameRules(self.grid_manager, self.match_finder, audio)
-        self.renderer = BoardRenderer(self.grid_manager)
+        self.renderer = BoardRenderer(self.grid_manager, self.layout)
         
 
-        self.grid_manager.fill_board(avoid_matches=True)
-        
-    
+        if fill:
+            self.grid_manager.fill_board(avoid_matches=True)
+
+    @property
+    def is_moving(self) -> bool:
+        return not self.animator.is_idle
+
+    @property
+    def revision(self) -> int:
+        return self.grid_manager.revision
+
+    @property
+    def settled(self) -> bool:
+        return not self.is_moving and self.revision == self.checked_revision
+
+    def type_bytes(self) -> bytes:
+        return bytes(jewel.type + 1 if jewel else 0
+                     for row in self.grid_manager.grid for jewel in row)
+
+    def state_hash(self) -> int:
+        return zlib.crc32(self.type_bytes())
   
     def fill_board(self, avoid_matches=True):
         self.grid_manager.fill_board(avoid_matches)
@@ -277,15 +533,13 @@ class Board:
         jewel2 = self.get_jewel_at(x2, y2)
 
         if jewel1 and jewel2:
-            
-            self.grid_manager.grid[y1][x1], self.grid_manager.grid[y2][x2] = self.grid_manager.grid[y2][x2], self.grid_manager.grid[y1][x1]
-
-            jewel1.x, jewel1.y = x2, y2
-            jewel2.x, jewel2.y = x1, y1
-
-            jewel1.move_to(x2, y2)
-            jewel2.move_to(x1, y1)
-            self.audio.play_sound('swap_success')  
+            if self.stream:
+                self.stream.swap(x1, y1, x2, y2)
+            self.grid_manager.swap_jewels(x1, y1, x2, y2)
+            self.game_rules.last_swap = [(x1, y1), (x2, y2)]
+            self.move_count += 1
+            self.last_move = (x1, y1, x2, y2)
+            self.events.publish(SWAP, SwapEvent(x1, y1, x2, y2, self.move_count))
             return True
 
         return False
@@ -319,8 +573,8 @@ class Board:
                     
                     invalid_pos = (self.selected_jewel.x, self.selected_jewel.y)
                     self.selected_jewel.selected = False
-                    self.selected_jewel.shake_animation()
-                    jewel.shake_animation()
+                    self.animator.shake(self.selected_jewel)
+                    self.animator.shake(jewel)
                     self.selected_jewel = None
                     return False, invalid_pos
             else:
@@ -343,43 +597,206 @@ class Board:
             self.selected_jewel.selected = False
             self.selected_jewel = None
     
-    def find_matches(self) -> List[List[Tuple[int, int]]]:
+    def find_matches(self) -> List[MatchGroup]:
         return self.match_finder.find_matches()
     
-    def remove_matches(self, matches: List[List[Tuple[int, int]]]) -> Tuple[int, Dict]:
+    def remove_matches(self, matches: List[MatchGroup]) -> Tuple[int, Dict[int, int]]:
         points, jewel_types, removed_jewels = self.game_rules.remove_matches(matches)
-        self.animations.extend(removed_jewels)  
+        if self.selected_jewel in removed_jewels:
+            self.deselect_jewel()
+        for jewel in removed_jewels:
+            self.animator.destroy(jewel, self.jewel_factory.release)
+        if self.stream:
+            self.stream.clear([(jewel.x, jewel.y) for jewel in removed_jewels])
+            self.stream.specials(self.game_rules.last_specials)
+            self.stream.points(points)
         return points, jewel_types
     
-    def collapse_columns(self):
-        moved_jewels = self.grid_manager.collapse_columns()
-        self.animations.extend(moved_jewels)  
+    def collapse_columns(self) -> Dict[int, List[Tuple[int, int]]]:
+        return self.grid_manager.collapse_columns()
+
+    def resolve(self) -> Optional[Tuple[int, Dict, bool]]:
+        if self.is_moving or self.revision == self.checked_revision:
+            return None
+        self.checked_revision = self.revision
+
+        if self.found_revision == self.revision:
+            matches = self.found_matches
+        else:
+            matches = self.find_matches()
+        if matches:
+            self._next_step()
+            self.cascade_waves += 1
+            self.events.publish(MATCH, MatchEvent(self.cascade_waves, matches))
+            points, collected_jewels = self.remove_matches(matches)
+            falls = self.collapse_columns()
+            spawns = self.refill_board()
+            if self.stream:
+                self.stream.falls(falls)
+                self.stream.spawns(spawns)
+            self.cascade_points += points
+            self.found_matches = self.find_matches()
+            self.found_revision = self.revision
+            self.events.publish(CASCADE_WAVE, CascadeWaveEvent(self.cascade_waves, points,
+                                                               collected_jewels))
+            if not self.found_matches:
+                self.events.publish(CASCADE_END, CascadeEndEvent(
+                    self.cascade_waves, self.cascade_points, self.move_count))
+                self.cascade_waves = 0
+                self.cascade_points = 0
+            return points, collected_jewels, False
+        if not self.match_finder.has_possible_moves():
+            self._next_step()
+            self.reshuffle()
+            return 0, {}, True
+        return None
+
+    def _next_step(self):
+        self.resolve_count += 1
+        self.rng.seed((self.resolve_count << 64) | self.seed)
+
+    def snapshot(self) -> BoardSnapshot:
+        specials = tuple((y * self.width + x, jewel.special)
+                         for y, row in enumerate(self.grid_manager.grid)
+                         for x, jewel in enumerate(row) if jewel and jewel.special)
+        return BoardSnapshot(self.width, self.height, self.type_bytes(), specials,
+                             self.seed, self.resolve_count, self.move_count)
+
+    def restore(self, snapshot: BoardSnapshot):
+        if (snapshot.width, snapshot.height) != (self.width, self.height):
+            raise ValueError(f"Snapshot is {snapshot.width}x{snapshot.height}, "
+                             f"board is {self.width}x{self.height}")
+        self.deselect_jewel()
+        self.animator.clear()
+        grid = self.grid_manager.grid
+        factory = self.jewel_factory
+        cells = snapshot.cells
+        self.grid_manager.dirty_columns.clear()
+        for y in range(self.height):
+            row = grid[y]
+            offset = y * self.width
+            for x in range(self.width):
+                if row[x]:
+                    factory.release(row[x])
+                cell = cells[offset + x]
+                if cell:
+                    row[x] = factory.create_jewel(cell - 1, x, y)
+                else:
+                    row[x] = None
+                    self.grid_manager.dirty_columns.add(x)
+        for index, effect in snapshot.specials:
+            jewel = grid[index // self.width][index % self.width]
+            if jewel:
+                jewel.special = effect
+        self.seed = snapshot.seed
+        self.rng.seed((snapshot.resolve_count << 64) | snapshot.seed)
+        self.resolve_count = snapshot.resolve_count
+        self.move_count = snapshot.move_count
+        self.last_move = None
+        self.game_rules.last_swap = []
+        self.cascade_waves = 0
+        self.cascade_points = 0
+        self.history.clear()
+        self.grid_manager.revision += 1
+        if self.stream:
+            self.stream.keyframe(reset=True)
+
+    def capture_state(self, score: int = 0, collected: Tuple[int, ...] = ()) -> BoardState:
+        grid = self.grid_manager.grid
+        columns = [tuple([row[x].type + 1 if row[x] else 0 for row in grid])
+                   for x in range(self.width)]
+        specials = tuple((x, y, jewel.special)
+                         for y, row in enumerate(grid)
+                         for x, jewel in enumerate(row) if jewel and jewel.special)
+        return BoardState(self.history.share(columns), specials, self.seed,
+                          self.resolve_count, self.move_count, score, collected)
+
+    def undo(self, score: int = 0, collected: Tuple[int, ...] = ()) -> Optional[BoardState]:
+        current = self.capture_state(score, collected)
+        state = self.history.undo(current)
+        if state is not None:
+            self.apply_state(state, current)
+        return state
+
+    def redo(self, score: int = 0, collected: Tuple[int, ...] = ()) -> Optional[BoardState]:
+        current = self.capture_state(score, collected)
+        state = self.history.redo(current)
+        if state is not None:
+            self.apply_state(state, current)
+        return state
+
+    def apply_state(self, state: BoardState, current: BoardState) -> int:
+        self.deselect_jewel()
+        grid = self.grid_manager.grid
+        factory = self.jewel_factory
+        changed = 0
+        for x, column in enumerate(state.columns):
+            if column is current.columns[x]:
+                continue
+            previous = current.columns[x]
+            for y, cell in enumerate(column):
+                if cell == previous[y]:
+                    continue
+                jewel = grid[y][x]
+                if jewel:
+                    self.animator.cancel(jewel)
+                    self.animator.destroy(jewel, factory.release)
+                if cell:
+                    jewel = factory.create_jewel(cell - 1, x, y)
+                    self.animator.spawn(jewel, y - 1)
+                    grid[y][x] = jewel
+                else:
+                    grid[y][x] = None
+                changed += 1
+        for x, y, _ in current.specials:
+            if grid[y][x]:
+                grid[y][x].special = None
+        for x, y, effect in state.specials:
+            if grid[y][x]:
+                grid[y][x].special = effect
+        self.history.columns = state.columns
+        self.seed = state.seed
+        self.rng.seed((state.resolve_count << 64) | state.seed)
+        self.resolve_count = state.resolve_count
+        self.move_count = state.move_count
+        self.last_move = None
+        self.game_rules.last_swap = []
+        self.cascade_waves = 0
+        self.cascade_points = 0
+        self.grid_manager.revision += 1
+        if self.stream:
+            self.stream.keyframe(reset=True)
+        return changed
+
+    def reshuffle(self):
+        grid_manager = self.grid_manager
+        jewels = [jewel for row in grid_manager.grid for jewel in row if jewel]
+        self.rng.shuffle(jewels)
+
+        index = 0
+        for y in range(self.height):
+            for x in range(self.width):
+                if index < len(jewels):
+                    self.animator.move(jewels[index], x, y)
+                    grid_manager.set_jewel(x, y, jewels[index])
+                    index += 1
+                else:
+                    grid_manager.set_jewel(x, y, None)
+
+        refilled = not self.match_finder.has_possible_moves()
+        if refilled:
+            self.fill_board(avoid_matches=True)
+        if self.stream:
+            self.stream.keyframe(reset=True)
+        self.events.publish(RESHUFFLE, ReshuffleEvent(refilled))
 
     
-    def refill_board(self):
-        self.grid_manager.refill_board()
+    def refill_board(self) -> Dict[int, List[int]]:
+        return self.grid_manager.refill_board()
     
   
     def update(self, dt: float):
-        
-        self.is_moving = False
-        
-        for row in self.grid_manager.grid:
-            for jewel in row:
-                if jewel:
-                    jewel.update(dt)
-                    if jewel.animating:
-                        self.is_moving = True
-        
-        
-        for anim in self.animations:
-            anim.update(dt)
-            if anim.animating:
-                self.is_moving = True
-        
-        self.animations = [anim for anim in self.animations 
-                        if not anim.is_destroy_animation_done()] 
-    def draw(self, screen: pygame.Surface):
-        self.renderer.draw(screen)
-        for animation in self.animations:
-            animation.draw(screen)
\ No newline at end of file
+        self.animator.update(dt)
+
+    def draw(self, screen: pygame.Surface, alpha: float = 1.0):
+        self.renderer.draw(screen, alpha, self.animator.jewels(DESTROY))
@@ -0,0 +1,59 @@
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Sequence, Tuple
+from ..constants import UNDO_HISTORY_LENGTH
+
+Column = Tuple[int, ...]
+
+
+class BoardState(NamedTuple):
+    columns: Tuple[Column, ...]
+    specials: Tuple[Tuple[int, int, str], ...]
+    seed: int
+    resolve_count: int
+    move_count: int
+    score: int = 0
+    collected: Tuple[int, ...] = ()
+
+
+class BoardHistory:
+    def __init__(self, length: int = UNDO_HISTORY_LENGTH):
+        self.length = length
+        self.undo_stack: Deque[BoardState] = deque(maxlen=length)
+        self.redo_stack: List[BoardState] = []
+        self.columns: Tuple[Column, ...] = ()
+
+    @property
+    def can_undo(self) -> bool:
+        return len(self.undo_stack) > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return len(self.redo_stack) > 0
+
+    def share(self, columns: Sequence[Column]) -> Tuple[Column, ...]:
+        previous = self.columns
+        if len(previous) == len(columns):
+            columns = [old if old == new else new for old, new in zip(previous, columns)]
+        self.columns = tuple(columns)
+        return self.columns
+
+    def push(self, state: BoardState):
+        self.undo_stack.append(state)
+        self.redo_stack.clear()
+
+    def undo(self, current: BoardState) -> Optional[BoardState]:
+        if not self.undo_stack:
+            return None
+        self.redo_stack.append(current)
+        return self.undo_stack.pop()
+
+    def redo(self, current: BoardState) -> Optional[BoardState]:
+        if not self.redo_stack:
+            return None
+        self.undo_stack.append(current)
+        return self.redo_stack.pop()
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.columns = ()
@@ -0,0 +1,103 @@
+import pygame
+from typing import Optional, Tuple
+from ..constants import CELL_SIZE, BOARD_VIEWPORT, MAX_ZOOM, MIN_START_ZOOM, ZOOM_STEP
+
+
+class BoardLayout:
+    def __init__(self, width: int, height: int, viewport=BOARD_VIEWPORT,
+                 cell_size: int = CELL_SIZE):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.viewport = pygame.Rect(viewport)
+        self.min_zoom = min(MAX_ZOOM,
+                            self.viewport.width / (width * cell_size),
+                            self.viewport.height / (height * cell_size))
+        self.zoom = max(self.min_zoom, MIN_START_ZOOM)
+        self.scroll_x = 0.0
+        self.scroll_y = 0.0
+        self._clamp()
+
+    @property
+    def cell(self) -> float:
+        return self.cell_size * self.zoom
+
+    @property
+    def board_rect(self) -> pygame.Rect:
+        x, y = self.to_screen(0, 0)
+        return pygame.Rect(round(x), round(y), round(self.width * self.cell),
+                           round(self.height * self.cell))
+
+    @property
+    def origin(self) -> Tuple[float, float]:
+        return self.to_screen(0, 0)
+
+    def to_screen(self, board_x: float, board_y: float) -> Tuple[float, float]:
+        return (self.viewport.x + board_x * self.zoom - self.scroll_x,
+                self.viewport.y + board_y * self.zoom - self.scroll_y)
+
+    def cell_origin(self, x: int, y: int) -> Tuple[float, float]:
+        return self.to_screen(x * self.cell_size, y * self.cell_size)
+
+    def cell_at(self, screen_x: int, screen_y: int) -> Optional[Tuple[int, int]]:
+        if not self.viewport.collidepoint(screen_x, screen_y):
+            return None
+        origin_x, origin_y = self.origin
+        x = int((screen_x - origin_x) // self.cell)
+        y = int((screen_y - origin_y) // self.cell)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return x, y
+        return None
+
+    def visible_cells(self, margin: int = 0) -> Tuple[int, int, int, int]:
+        origin_x, origin_y = self.origin
+        cell = self.cell
+        x0 = int((self.viewport.left - origin_x) // cell) - margin
+        y0 = int((self.viewport.top - origin_y) // cell) - margin
+        x1 = int((self.viewport.right - origin_x) // cell) + 1 + margin
+        y1 = int((self.viewport.bottom - origin_y) // cell) + 1 + margin
+        return (max(0, x0), max(0, y0), min(self.width, x1), min(self.height, y1))
+
+    def is_visible(self, board_x: float, board_y: float) -> bool:
+        x, y = self.to_screen(board_x, board_y)
+        cell = self.cell
+        return (x + cell > self.viewport.left and x < self.viewport.right
+                and y + cell > self.viewport.top and y < self.viewport.bottom)
+
+    def scroll(self, dx: float, dy: float):
+        self.scroll_x += dx
+        self.scroll_y += dy
+        self._clamp()
+
+    def scroll_cells(self, dx: int, dy: int):
+        self.scroll(dx * self.cell, dy * self.cell)
+
+    def set_zoom(self, zoom: float, anchor: Optional[Tuple[int, int]] = None):
+        zoom = max(self.min_zoom, min(MAX_ZOOM, zoom))
+        if zoom == self.zoom:
+            return
+        anchor_x, anchor_y = anchor or self.viewport.center
+        board_x = (anchor_x - self.viewport.x + self.scroll_x) / self.zoom
+        board_y = (anchor_y - self.viewport.y + self.scroll_y) / self.zoom
+        self.zoom = zoom
+        self.scroll_x = board_x * zoom - (anchor_x - self.viewport.x)
+        self.scroll_y = board_y * zoom - (anchor_y - self.viewport.y)
+        self._clamp()
+
+    def zoom_in(self, anchor: Optional[Tuple[int, int]] = None):
+        self.set_zoom(self.zoom * ZOOM_STEP, anchor)
+
+    def zoom_out(self, anchor: Optional[Tuple[int, int]] = None):
+        self.set_zoom(self.zoom / ZOOM_STEP, anchor)
+
+    def _clamp(self):
+        extra_x = self.width * self.cell - self.viewport.width
+        extra_y = self.height * self.cell - self.viewport.height
+        if extra_x <= 0:
+            self.scroll_x = extra_x / 2
+        else:
+            self.scroll_x = max(0.0, min(extra_x, self.scroll_x))
+        if extra_y <= 0:
+            self.scroll_y = extra_y / 2
+        else:
+            self.scroll_y = max(0.0, min(extra_y, self.scroll_y))
@@ -0,0 +1,71 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from .match_group import MatchGroup
+
+SWAP = "swap"
+MATCH = "match"
+CASCADE_WAVE = "cascade_wave"
+CASCADE_END = "cascade_end"
+RESHUFFLE = "reshuffle"
+LEVEL_COMPLETE = "level_complete"
+EVENTS = (SWAP, MATCH, CASCADE_WAVE, CASCADE_END, RESHUFFLE, LEVEL_COMPLETE)
+
+
+class SwapEvent(NamedTuple):
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+    move: int
+
+
+class MatchEvent(NamedTuple):
+    wave: int
+    groups: List[MatchGroup]
+
+
+class CascadeWaveEvent(NamedTuple):
+    wave: int
+    points: int
+    collected: Dict[int, int]
+
+
+class CascadeEndEvent(NamedTuple):
+    waves: int
+    points: int
+    move: int
+
+
+class ReshuffleEvent(NamedTuple):
+    refilled: bool
+
+
+class LevelCompleteEvent(NamedTuple):
+    level: int
+    score: int
+    elapsed: float
+    success: bool
+
+
+class EventBus:
+    def __init__(self):
+        self.handlers: Dict[str, List[Callable]] = {}
+
+    def subscribe(self, event: str, handler: Callable):
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event: {event}")
+        self.handlers.setdefault(event, []).append(handler)
+
+    def unsubscribe(self, event: str, handler: Callable):
+        handlers = self.handlers.get(event)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def has_subscribers(self, event: str) -> bool:
+        return bool(self.handlers.get(event))
+
+    def publish(self, event: str, payload: Optional[Tuple] = None):
+        for handler in tuple(self.handlers.get(event, ())):
+            handler(payload)
+
+    def clear(self):
+        self.handlers.clear()
@@ -1,15 +1,40 @@
 from typing import List, Dict, Tuple, Optional, Any
 from .jewel import *
+from .jewel_type import JewelType
 
 class JewelFactory:
-    def __init__(self, jewels_config: List[Dict]):
+    def __init__(self, jewels_config: List[Dict], pool_size: int = 1024):
         self.jewels_config = jewels_config
         self.type_count = len(jewels_config)
+        self.jewel_types = [JewelType.from_config(index, config)
+                            for index, config in enumerate(jewels_config)]
+        self.pool_size = pool_size
+        self.pool: List[Jewel] = []
+        self.pool_hits = 0
+        self.pool_misses = 0
 
     def create_jewel(self, jewel_type: int, x: int, y: int) -> Jewel:
         if not 0 <= jewel_type < self.type_count:
             raise ValueError(f"Invalid jewel type: {jewel_type}")
-        return Jewel(jewel_type, x, y, self.jewels_config[jewel_type])
+        if self.pool:
+            self.pool_hits += 1
+            jewel = self.pool.pop()
+            jewel.reset(self.jewel_types[jewel_type], x, y)
+            return jewel
+        self.pool_misses += 1
+        return Jewel(self.jewel_types[jewel_type], x, y)
 
-    def create_random_jewel(self, x: int, y: int) -> Jewel:
-        return self.create_jewel(random.randint(0, self.type_count - 1), x, y)
\ No newline at end of file
+    def create_random_jewel(self, x: int, y: int, rng: Optional[random.Random] = None) -> Jewel:
+        return self.create_jewel((rng or random).randint(0, self.type_count - 1), x, y)
+
+    def release(self, jewel: Jewel):
+        if len(self.pool) < self.pool_size:
+            jewel.selected = False
+            self.pool.append(jewel)
+
+    def pool_stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.pool_hits,
+            'misses': self.pool_misses,
+            'pooled': len(self.pool)
+        }
@@ -19,6 +19,15 @@ class JewelStats:
         if jewel_type in self.stats:
             self.stats[jewel_type] += 1
 
+    def add_jewels(self, counts: Dict[int, int]):
+        stats = self.stats
+        for jewel_type, count in counts.items():
+            if jewel_type in stats:
+                stats[jewel_type] += count
+
+    def on_cascade_wave(self, event):
+        self.add_jewels(event.collected)
+
     def reset(self):
         self.stats = {jewel['id']: 0 for jewel in self.jewels_config}
 
@@ -0,0 +1,59 @@
+import pygame
+from typing import Dict, NamedTuple, Optional, Tuple
+from ..constants import CELL_SIZE
+
+ANIMATION_PARAMETERS = {
+    'red': (0.5, 2.0, 0, 0.5),
+    'blue': (0.7, -1.5, 0, 0.5),
+    'green': (0.6, -1, 5, 0.6),
+    'yellow': (0.4, 1.2, 15, 0.4),
+    'purple': (0.3, 2.5, 0, 0.7)
+}
+DEFAULT_ANIMATION = (0.5, 1.0, 0, 0.5)
+
+FALLBACK_COLORS = {
+    'red': (255, 0, 0),
+    'blue': (0, 0, 255),
+    'green': (0, 255, 0),
+    'yellow': (255, 255, 0),
+    'purple': (128, 0, 128)
+}
+
+
+class JewelType(NamedTuple):
+    index: int
+    id: int
+    color: str
+    points: int
+    effect: Optional[str]
+    image: pygame.Surface
+    fade_speed: float
+    scale_speed: float
+    rotation_speed: float
+    animation_duration: float
+
+    @classmethod
+    def from_config(cls, index: int, config: Dict) -> 'JewelType':
+        color = config['color']
+        fade_speed, scale_speed, rotation_speed, duration = (
+            config.get('animation') or animation_parameters(color))
+        return cls(index, config['id'], color, config['points'],
+                   config.get('effect'), load_jewel_image(config['image'], color),
+                   fade_speed, scale_speed, rotation_speed, duration)
+
+
+def animation_parameters(color: str) -> Tuple[float, float, float, float]:
+    return ANIMATION_PARAMETERS.get(color.lower(), DEFAULT_ANIMATION)
+
+
+def load_jewel_image(image_path: str, color: str) -> pygame.Surface:
+    size = CELL_SIZE - 10
+    try:
+        image = pygame.image.load(image_path).convert_alpha()
+        return pygame.transform.scale(image, (size, size))
+    except (pygame.error, FileNotFoundError):
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        fill = FALLBACK_COLORS.get(color.lower(), (255, 255, 255))
+        pygame.draw.rect(surface, fill, (0, 0, size, size))
+        pygame.draw.rect(surface, (255, 255, 255), (0, 0, size, size), 2)
+        return surface
@@ -0,0 +1,36 @@
+from typing import Iterator, List, Optional, Tuple
+
+SHAPE_LINE = "line"
+SHAPE_L = "L"
+SHAPE_T = "T"
+SHAPE_CROSS = "cross"
+SHAPE_RANK = {SHAPE_LINE: 0, SHAPE_L: 1, SHAPE_T: 2, SHAPE_CROSS: 3}
+SHAPES_BY_RANK = {rank: shape for shape, rank in SHAPE_RANK.items()}
+
+
+class MatchGroup:
+    __slots__ = ('cells', 'type', 'shape', 'longest', 'pivot')
+
+    def __init__(self, cells: List[Tuple[int, int]], jewel_type: int, shape: str = SHAPE_LINE,
+                 longest: int = 0, pivot: Optional[Tuple[int, int]] = None):
+        self.cells = cells
+        self.type = jewel_type
+        self.shape = shape
+        self.longest = longest or len(cells)
+        self.pivot = pivot
+
+    @property
+    def size(self) -> int:
+        return len(self.cells)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self.cells)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __contains__(self, cell) -> bool:
+        return cell in self.cells
+
+    def __repr__(self) -> str:
+        return f"MatchGroup({self.shape}, type={self.type}, size={self.size})"
@@ -0,0 +1,194 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from .jewel import Jewel
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TweenArrays(ABC):
+    FIELDS = ()
+
+    def __init__(self, capacity: int = 256):
+        self.count = 0
+        self.capacity = capacity
+        self.jewels: List[Optional[Jewel]] = [None] * capacity
+        self.slots: Dict[Jewel, int] = {}
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+
+    def __contains__(self, jewel: Jewel) -> bool:
+        return jewel in self.slots
+
+    def add(self, jewel: Jewel):
+        slot = self.slots.get(jewel)
+        if slot is None:
+            if self.count == self.capacity:
+                self._grow()
+            slot = self.count
+            self.count += 1
+            self.jewels[slot] = jewel
+            self.slots[jewel] = slot
+        self.load(slot, jewel)
+
+    def discard(self, jewel: Jewel):
+        slot = self.slots.get(jewel)
+        if slot is not None:
+            self.store(slot, jewel)
+            self._remove(slot)
+
+    @abstractmethod
+    def load(self, slot: int, jewel: Jewel):
+        pass
+
+    def store(self, slot: int, jewel: Jewel):
+        jewel.elapsed = float(self.elapsed[slot])
+
+    @abstractmethod
+    def step(self, dt: float) -> List[Jewel]:
+        pass
+
+    def _finish(self, done) -> List[Jewel]:
+        finished = []
+        for slot in sorted(np.flatnonzero(done).tolist(), reverse=True):
+            finished.append(self.jewels[slot])
+            self._remove(slot)
+        return finished
+
+    def _remove(self, slot: int):
+        last = self.count - 1
+        jewel = self.jewels[slot]
+        del self.slots[jewel]
+        if slot != last:
+            moved = self.jewels[last]
+            self.jewels[slot] = moved
+            self.slots[moved] = slot
+            for name in self.FIELDS:
+                values = getattr(self, name)
+                values[slot] = values[last]
+        self.jewels[last] = None
+        self.count = last
+
+    def _grow(self):
+        self.capacity *= 2
+        self.jewels.extend([None] * (self.capacity - len(self.jewels)))
+        for name in self.FIELDS:
+            values = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=np.float64)
+            grown[:len(values)] = values
+            setattr(self, name, grown)
+
+
+class PositionTweens(TweenArrays):
+    FIELDS = ('start_x', 'start_y', 'target_x', 'target_y', 'elapsed', 'duration')
+
+    def load(self, slot: int, jewel: Jewel):
+        self.start_x[slot] = jewel.start_x
+        self.start_y[slot] = jewel.start_y
+        self.target_x[slot] = jewel.target_x
+        self.target_y[slot] = jewel.target_y
+        self.elapsed[slot] = jewel.elapsed
+        self.duration[slot] = jewel.animation_duration
+
+    def step(self, dt: float) -> List[Jewel]:
+        n = self.count
+        elapsed = self.elapsed[:n]
+        elapsed += dt
+        progress = np.minimum(elapsed / self.duration[:n], 1.0)
+        done = progress >= 1.0
+        progress = progress * progress * (3 - 2 * progress)
+        start_x = self.start_x[:n]
+        start_y = self.start_y[:n]
+        xs = (start_x + (self.target_x[:n] - start_x) * progress).tolist()
+        ys = (start_y + (self.target_y[:n] - start_y) * progress).tolist()
+        for jewel, x, y in zip(self.jewels, xs, ys):
+            jewel.screen_x = x
+            jewel.screen_y = y
+        if not done.any():
+            return []
+        finished = self._finish(done)
+        for jewel in finished:
+            jewel.animating = False
+            jewel.screen_x = jewel.target_x
+            jewel.screen_y = jewel.target_y
+        return finished
+
+
+class FadeTweens(TweenArrays):
+    FIELDS = ('start_alpha', 'scale_speed', 'rotation_speed', 'rotation',
+              'elapsed', 'duration')
+
+    def load(self, slot: int, jewel: Jewel):
+        self.start_alpha[slot] = jewel.start_alpha
+        self.scale_speed[slot] = jewel.kind.scale_speed
+        self.rotation_speed[slot] = jewel.kind.rotation_speed
+        self.rotation[slot] = jewel.rotation
+        self.elapsed[slot] = jewel.elapsed
+        self.duration[slot] = jewel.animation_duration
+
+    def store(self, slot: int, jewel: Jewel):
+        super().store(slot, jewel)
+        jewel.rotation = float(self.rotation[slot])
+
+    def step(self, dt: float) -> List[Jewel]:
+        n = self.count
+        elapsed = self.elapsed[:n]
+        elapsed += dt
+        progress = np.minimum(elapsed / self.duration[:n], 1.0)
+        scale_speed = self.scale_speed[:n]
+        scale = 1.5 + progress * scale_speed
+        scale = np.where(scale_speed > 0, scale, np.maximum(0.1, scale))
+        alpha = (self.start_alpha[:n] * (1 - progress)).astype(np.int32)
+        rotation = self.rotation[:n]
+        rotation += self.rotation_speed[:n] * dt * 60
+        rotation %= 360
+        for jewel, a, s, r in zip(self.jewels, alpha.tolist(), scale.tolist(),
+                                  rotation.tolist()):
+            jewel.alpha = a
+            jewel.scale = s
+            jewel.rotation = r
+        done = progress >= 1.0
+        if not done.any():
+            return []
+        finished = self._finish(done)
+        for jewel in finished:
+            jewel.destroying = False
+        return finished
+
+
+class NumpyTweenBackend:
+    def __init__(self, capacity: int = 256):
+        self.positions = PositionTweens(capacity)
+        self.fades = FadeTweens(capacity)
+
+    @property
+    def count(self) -> int:
+        return self.positions.count + self.fades.count
+
+    def add_position(self, jewel: Jewel):
+        self.fades.discard(jewel)
+        self.positions.add(jewel)
+
+    def add_fade(self, jewel: Jewel):
+        self.positions.discard(jewel)
+        self.fades.add(jewel)
+
+    def discard(self, jewel: Jewel):
+        self.positions.discard(jewel)
+        self.fades.discard(jewel)
+
+    def step(self, dt: float) -> List[Jewel]:
+        finished = []
+        if self.positions.count:
+            finished.extend(self.positions.step(dt))
+        if self.fades.count:
+            finished.extend(self.fades.step(dt))
+        return finished
+
+
+def default_backend() -> Optional[NumpyTweenBackend]:
+    if np is None:
+        return None
+    return NumpyTweenBackend()
@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterable, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from .constants import *
+from .headless import HeadlessGame
+from .states.playing_state import PlayingState
+from .utils.replay import Replay, ReplayError
+
+MAX_PLAYBACK_TIME = 24 * 60 * 60
+
+
+def play(replay: Replay, game: HeadlessGame, frames: Iterable[int] = (),
+         output_dir: Optional[str] = None) -> Dict:
+    frames = set(frames)
+    if frames and output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    state = PlayingState(game, replay.mode, replay.level, seed=replay.seed, record=False)
+    game.set_state(state)
+    board = state.board
+    swaps = replay.swaps
+    index = 0
+    frame = 0
+    started = time.perf_counter()
+    while not state.finished and state.level_manager.elapsed < MAX_PLAYBACK_TIME:
+        if index < len(swaps):
+            swap = swaps[index]
+            if board.settled and state.level_manager.elapsed * 1000 >= swap.time_ms:
+                board.swap_jewels(swap.x1, swap.y1, swap.x2, swap.y2)
+                index += 1
+        elif board.resolve_count >= replay.steps:
+            break
+        state.update(FIXED_DT)
+        if frame in frames and output_dir:
+            state.draw(game.screen)
+            pygame.image.save(game.screen, os.path.join(output_dir, f"frame_{frame:06d}.png"))
+        frame += 1
+    wall_time = time.perf_counter() - started
+    board_hash = board.state_hash()
+    return {
+        'frames': frame,
+        'swaps': index,
+        'steps': board.resolve_count,
+        'score': state.score,
+        'board_hash': board_hash,
+        'ok': state.score == replay.score and board_hash == replay.board_hash,
+        'wall_time': wall_time,
+        'speedup': frame * FIXED_DT / wall_time if wall_time else 0.0
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Play back a Jewel Quest replay headlessly.")
+    parser.add_argument('replay')
+    parser.add_argument('--frames', default="",
+                        help="comma-separated frame numbers to render to PNG")
+    parser.add_argument('--output', default="replay_frames")
+    parser.add_argument('--levels', default="levels.xml")
+    parser.add_argument('--jewels', default="jewels.xml")
+    args = parser.parse_args(argv)
+
+    try:
+        replay = Replay.load(args.replay)
+    except ReplayError as e:
+        print(e, file=sys.stderr)
+        return 2
+    frames = [int(frame) for frame in args.frames.split(',') if frame.strip()]
+    result = play(replay, HeadlessGame(args.levels, args.jewels), frames, args.output)
+    print(f"{args.replay}: {MODE_NAMES[replay.mode]} level {replay.level}, "
+          f"{result['swaps']}/{len(replay.swaps)} swaps, {result['steps']}/{replay.steps} steps, "
+          f"{result['frames']} frames in {result['wall_time']:.2f}s ({result['speedup']:.0f}x)")
+    print(f"score {result['score']} (recorded {replay.score}), "
+          f"board {result['board_hash']:08x} (recorded {replay.board_hash:08x}): "
+          f"{'OK' if result['ok'] else 'MISMATCH'}")
+    return 0 if result['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
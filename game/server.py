@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+from .constants import *
+from .models.animation import InstantAnimationSystem
+from .models.board import Board
+from .headless import HeadlessGame
+from .states.playing_state import LevelManager
+from .utils.board_stream import BoardStream
+from .utils.replay import MODE_CODES
+
+MAX_LINE = 64 * 1024
+MAX_SESSIONS_PER_CLIENT = 64
+MAX_SESSIONS = 4096
+MAX_CASCADE_STEPS = 1000
+SETTLE_CHUNK = 25
+WATCH_QUEUE = 64
+MAX_DELTA_CHUNK = 64 * 1024
+OPS = ('create', 'swap', 'state', 'close', 'watch')
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class GameSession:
+    def __init__(self, session_id: int, game: HeadlessGame, mode: str, level: int,
+                 seed: Optional[int], now: float):
+        if mode not in MODE_CODES:
+            raise ProtocolError(f"unknown mode {mode!r}")
+        if not 1 <= level <= len(game.levels_config):
+            raise ProtocolError(f"unknown level {level}")
+        self.id = session_id
+        self.mode = mode
+        self.level = level
+        self.score = 0
+        self.collected = [0] * game.jewel_factory.type_count
+        self.level_manager = LevelManager(game, mode, level)
+        config = self.level_manager.level_config
+        self.board = Board(config['width'], config['height'], game.jewel_factory, game.audio,
+                           seed=seed, fill=False, history_length=0,
+                           animator=InstantAnimationSystem())
+        self.board.fill_board(self.level_manager.avoid_matches)
+        self.level_manager.load_board_config(self.board)
+        self.level_manager.fix_initial_matches(self.board)
+        self.settle()
+        self.clock = now
+        self.time_up = False
+        self.watchers: List[asyncio.Queue] = []
+        self.dropped = 0
+
+    def watch(self, queue: asyncio.Queue):
+        if self.board.stream is None:
+            self.board.stream = BoardStream(self.board, self.score)
+            self.board.stream.flush()
+        queue.put_nowait(self.board.stream.encode_keyframe())
+        self.watchers.append(queue)
+
+    def unwatch(self, queue: asyncio.Queue):
+        if queue in self.watchers:
+            self.watchers.remove(queue)
+
+    def publish(self):
+        stream = self.board.stream
+        if stream is None:
+            return
+        chunk = stream.flush()
+        if not chunk:
+            return
+        if len(chunk) > MAX_DELTA_CHUNK:
+            chunk = stream.encode_keyframe(reset=True)
+        keyframe = None
+        for queue in self.watchers:
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                if keyframe is None:
+                    keyframe = stream.encode_keyframe(reset=True)
+                queue.put_nowait(keyframe)
+                self.dropped += 1
+            else:
+                queue.put_nowait(chunk)
+
+    def end(self):
+        for queue in self.watchers:
+            while queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+        self.watchers.clear()
+
+    @property
+    def finished(self) -> bool:
+        return self.time_up or self.level_manager.check_level_complete(self.score)
+
+    def tick(self, now: float):
+        if self.finished:
+            return
+        if not self.level_manager.update_time(now - self.clock):
+            self.time_up = True
+        self.clock = now
+
+    def settle(self, max_steps: int = MAX_CASCADE_STEPS) -> Dict:
+        board = self.board
+        points = 0
+        waves = 0
+        reshuffles = 0
+        for _ in range(max_steps):
+            result = board.resolve()
+            if result is None:
+                break
+            wave_points, collected, reshuffled = result
+            points += wave_points
+            for jewel_type, count in collected.items():
+                self.collected[jewel_type] += count
+            if reshuffled:
+                reshuffles += 1
+            else:
+                waves += 1
+        self.score += points
+        return {'points': points, 'cascades': waves, 'reshuffles': reshuffles}
+
+    async def settle_async(self) -> Dict:
+        totals = {'points': 0, 'cascades': 0, 'reshuffles': 0}
+        for _ in range(0, MAX_CASCADE_STEPS, SETTLE_CHUNK):
+            for key, value in self.settle(SETTLE_CHUNK).items():
+                totals[key] += value
+            if self.board.settled:
+                break
+            await asyncio.sleep(0)
+        return totals
+
+    async def swap(self, x1: int, y1: int, x2: int, y2: int) -> Dict:
+        if self.finished:
+            raise ProtocolError("session finished")
+        if abs(x1 - x2) + abs(y1 - y2) != 1:
+            raise ProtocolError("cells are not adjacent")
+        if not self.board.swap_jewels(x1, y1, x2, y2):
+            return {'valid': False, 'points': 0, 'cascades': 0, 'reshuffles': 0}
+        result = await self.settle_async()
+        result['valid'] = True
+        self.publish()
+        return result
+
+    def state(self) -> Dict:
+        board = self.board
+        return {
+            'session': self.id,
+            'mode': self.mode,
+            'level': self.level,
+            'width': board.width,
+            'height': board.height,
+            'cells': board.type_bytes().hex(),
+            'specials': [[index % board.width, index // board.width, effect]
+                         for index, effect in board.snapshot().specials],
+            'score': self.score,
+            'target_score': self.level_manager.target_score,
+            'time_left': self.level_manager.time_left,
+            'elapsed': round(self.level_manager.elapsed, 3),
+            'moves': board.move_count,
+            'collected': self.collected,
+            'finished': self.finished,
+            'complete': self.level_manager.check_level_complete(self.score)
+        }
+
+
+class GameServer:
+    def __init__(self, game: HeadlessGame, max_sessions: int = MAX_SESSIONS,
+                 sessions_per_client: int = MAX_SESSIONS_PER_CLIENT):
+        self.game = game
+        self.max_sessions = max_sessions
+        self.sessions_per_client = sessions_per_client
+        self.sessions: Dict[int, GameSession] = {}
+        self.ids = itertools.count(1)
+        self.clients = 0
+        self.requests = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = SERVER_PORT,
+                    path: Optional[str] = None) -> asyncio.AbstractServer:
+        if path:
+            return await asyncio.start_unix_server(self.handle_client, path, limit=MAX_LINE)
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        owned: Dict[int, GameSession] = {}
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(self.encode({'ok': False, 'error': "request too long"}))
+                    break
+                if not line:
+                    break
+                response = await self.handle_line(line, owned)
+                writer.write(self.encode(response))
+                await writer.drain()
+                if response.get('ok') and 'watching' in response:
+                    session = self.sessions.get(response['watching'])
+                    if session is not None:
+                        await self.stream_to(session, reader, writer)
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.clients -= 1
+            for session_id, session in owned.items():
+                self.sessions.pop(session_id, None)
+                session.end()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def stream_to(self, session: GameSession, reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter):
+        queue = asyncio.Queue(WATCH_QUEUE)
+        session.watch(queue)
+        get = None
+        read = asyncio.ensure_future(reader.read(MAX_LINE))
+        try:
+            while True:
+                if get is None:
+                    get = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait((get, read), return_when=asyncio.FIRST_COMPLETED)
+                if read in done:
+                    if not read.result():
+                        break
+                    read = asyncio.ensure_future(reader.read(MAX_LINE))
+                if get in done:
+                    chunk = get.result()
+                    get = None
+                    if chunk is None:
+                        break
+                    writer.write(chunk)
+                    await writer.drain()
+        finally:
+            for task in (get, read):
+                if task is not None:
+                    task.cancel()
+            session.unwatch(queue)
+
+    async def handle_line(self, line: bytes, owned: Dict[int, GameSession]) -> Dict:
+        self.requests += 1
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("request must be an object")
+            request_id = request.get('id')
+            response = await self.dispatch(request, owned, asyncio.get_running_loop().time())
+            response['ok'] = True
+        except (ProtocolError, ValueError, TypeError, KeyError) as e:
+            response = {'ok': False, 'error': str(e)}
+        if request_id is not None:
+            response['id'] = request_id
+        return response
+
+    async def dispatch(self, request: Dict, owned: Dict[int, GameSession], now: float) -> Dict:
+        op = request.get('op')
+        if op not in OPS:
+            raise ProtocolError(f"unknown op {op!r}")
+        if op == 'create':
+            if len(owned) >= self.sessions_per_client or len(self.sessions) >= self.max_sessions:
+                raise ProtocolError("too many sessions")
+            seed = request.get('seed')
+            session = GameSession(next(self.ids), self.game, request.get('mode', TIME_ATTACK),
+                                  int(request.get('level', 1)),
+                                  None if seed is None else int(seed), now)
+            owned[session.id] = session
+            self.sessions[session.id] = session
+            return {'state': session.state()}
+        if op == 'watch':
+            session_id = request.get('session')
+            if session_id is None and self.sessions:
+                session_id = max(self.sessions)
+            if session_id not in self.sessions:
+                raise ProtocolError(f"unknown session {session_id!r}")
+            return {'watching': session_id}
+        session = owned.get(request.get('session'))
+        if session is None:
+            raise ProtocolError(f"unknown session {request.get('session')!r}")
+        session.tick(now)
+        if op == 'swap':
+            result = await session.swap(int(request['x1']), int(request['y1']),
+                                        int(request['x2']), int(request['y2']))
+            result.update(score=session.score, finished=session.finished)
+            if request.get('state'):
+                result['state'] = session.state()
+            return result
+        if op == 'close':
+            del owned[session.id]
+            del self.sessions[session.id]
+            session.end()
+        return {'state': session.state()}
+
+    @staticmethod
+    def encode(response: Dict) -> bytes:
+        return json.dumps(response, separators=(',', ':')).encode() + b'\n'
+
+
+async def serve(args) -> None:
+    server = GameServer(HeadlessGame(args.levels, args.jewels, display=False),
+                        args.max_sessions, args.sessions_per_client)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Jewel Quest server listening on {where}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Host headless Jewel Quest sessions.")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--unix', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS)
+    parser.add_argument('--sessions-per-client', type=int, default=MAX_SESSIONS_PER_CLIENT)
+    parser.add_argument('--levels', default="levels.xml")
+    parser.add_argument('--jewels', default="jewels.xml")
+    args = parser.parse_args(argv)
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
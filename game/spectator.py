@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import pygame
+from .constants import *
+from .models.board import Board
+from .models.jewel_factory import JewelFactory
+from .utils.audio_manager import AudioManager
+from .utils.board_stream import (FRAME, OP_CLEAR, OP_FALL, OP_KEYFRAME, OP_POINTS, OP_SPAWN,
+                                 OP_SPECIAL, OP_SWAP, StreamError, StreamEvent, decode)
+from .utils.config_cache import ConfigCache
+from .utils.snapshot import BoardSnapshot
+
+WAVE_OPS = (OP_KEYFRAME, OP_SWAP, OP_CLEAR)
+MAX_BACKLOG = 256
+
+
+class BoardMirror:
+    def __init__(self, jewel_factory: JewelFactory, audio: AudioManager, animate: bool = True):
+        self.jewel_factory = jewel_factory
+        self.audio = audio
+        self.animate = animate
+        self.board: Optional[Board] = None
+        self.score = 0
+        self.sequence: Optional[int] = None
+        self.pending: Deque[StreamEvent] = deque()
+        self.resyncing = False
+        self.stats = {'events': 0, 'keyframes': 0, 'gaps': 0, 'desyncs': 0}
+
+    @property
+    def synced(self) -> bool:
+        return self.sequence is not None
+
+    def feed(self, event: StreamEvent):
+        self.stats['events'] += 1
+        if event.op == OP_KEYFRAME:
+            self.sequence = event.sequence
+        elif self.sequence is None:
+            return
+        elif event.sequence != self.sequence + 1:
+            self.stats['gaps'] += 1
+            self.sequence = None
+            self.resyncing = True
+            return
+        else:
+            self.sequence = event.sequence
+        self.pending.append(event)
+
+    def update(self, dt: float):
+        board = self.board
+        if board is not None:
+            board.update(dt)
+        while self.pending:
+            event = self.pending[0]
+            if (self.animate and board is not None and board.is_moving
+                    and event.op in WAVE_OPS and len(self.pending) < MAX_BACKLOG):
+                break
+            self.apply(self.pending.popleft())
+            board = self.board
+
+    def lose_sync(self):
+        self.stats['desyncs'] += 1
+        self.sequence = None
+        self.resyncing = True
+        self.pending.clear()
+
+    def apply(self, event: StreamEvent):
+        board = self.board
+        data = event.data
+        if event.op == OP_KEYFRAME:
+            self.apply_keyframe(data)
+            return
+        grid_manager = board.grid_manager
+        grid = grid_manager.grid
+        width = board.width
+        if event.op == OP_SWAP:
+            if not grid_manager.swap_jewels(*data):
+                self.lose_sync()
+                return
+        elif event.op == OP_CLEAR:
+            for index in data:
+                jewel = grid_manager.clear_cell(index % width, index // width)
+                if jewel:
+                    board.animator.destroy(jewel, self.jewel_factory.release)
+        elif event.op == OP_SPECIAL:
+            for index, effect in data:
+                jewel = grid[index // width][index % width]
+                if jewel:
+                    jewel.special = effect
+        elif event.op == OP_FALL:
+            for x, moves in data:
+                for from_y, to_y in moves:
+                    jewel = grid[from_y][x]
+                    if jewel is None:
+                        self.lose_sync()
+                        return
+                    grid[to_y][x] = jewel
+                    grid[from_y][x] = None
+                    board.animator.fall(jewel, x, to_y)
+        elif event.op == OP_SPAWN:
+            for x, types in data:
+                for y, jewel_type in enumerate(types):
+                    jewel = self.jewel_factory.create_jewel(jewel_type, x, y)
+                    board.animator.spawn(jewel)
+                    grid[y][x] = jewel
+            grid_manager.dirty_columns.clear()
+        elif event.op == OP_POINTS:
+            self.score += data
+        grid_manager.revision += 1
+
+    def apply_keyframe(self, keyframe):
+        self.stats['keyframes'] += 1
+        board = self.board
+        if board is not None and (board.width, board.height) == (keyframe.width, keyframe.height):
+            if board.type_bytes() == keyframe.cells and self.score == keyframe.score:
+                self.resyncing = False
+                return
+            if not keyframe.reset and not self.resyncing:
+                self.stats['desyncs'] += 1
+        else:
+            board = self.board = Board(keyframe.width, keyframe.height, self.jewel_factory,
+                                       self.audio, seed=0, fill=False, history_length=0)
+        board.restore(BoardSnapshot(keyframe.width, keyframe.height, keyframe.cells,
+                                    keyframe.specials, 0, 0, 0))
+        self.score = keyframe.score
+        self.resyncing = False
+
+
+async def receive(reader: asyncio.StreamReader, mirror: BoardMirror, totals: Dict):
+    while True:
+        try:
+            header = await reader.readexactly(FRAME.size)
+        except asyncio.IncompleteReadError:
+            return
+        length, sequence, op = FRAME.unpack(header)
+        payload = await reader.readexactly(length)
+        totals['bytes'] += FRAME.size + length
+        mirror.feed(decode(sequence, op, payload))
+
+
+async def spectate(args) -> Dict:
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    request = {'op': 'watch'}
+    if args.session is not None:
+        request['session'] = args.session
+    writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    if not response.get('ok'):
+        raise StreamError(response.get('error', "watch refused"))
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"Jewel Quest - watching session {response['watching']}")
+    _, jewels_config = ConfigCache().load(args.levels, args.jewels)
+    audio = AudioManager(load=False)
+    audio.set_mute(True)
+    mirror = BoardMirror(JewelFactory(jewels_config), audio, animate=not args.headless)
+    font = pygame.font.SysFont('Arial', 36)
+    totals = {'bytes': 0}
+    receiver = asyncio.create_task(receive(reader, mirror, totals))
+    started = time.perf_counter()
+    running = True
+    while running and not receiver.done():
+        if args.duration and time.perf_counter() - started >= args.duration:
+            break
+        mirror.update(FIXED_DT)
+        if not args.headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                                 and event.key == pygame.K_ESCAPE):
+                    running = False
+            screen.fill(BACKGROUND_COLOR)
+            if mirror.board is not None:
+                mirror.board.draw(screen)
+            screen.blit(font.render(f"Score: {mirror.score}", True, WHITE), (20, 20))
+            pygame.display.flip()
+        await asyncio.sleep(FIXED_DT)
+    receiver.cancel()
+    writer.close()
+    mirror.update(0)
+    result = dict(mirror.stats, bytes=totals['bytes'], score=mirror.score,
+                  board_hash=mirror.board.state_hash() if mirror.board else 0)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Watch a live Jewel Quest server session.")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--unix', help="connect to a Unix socket instead of TCP")
+    parser.add_argument('--session', type=int, help="session id (default: newest)")
+    parser.add_argument('--duration', type=float, default=0.0,
+                        help="stop after this many seconds (default: until the session ends)")
+    parser.add_argument('--headless', action='store_true',
+                        help="apply the stream without a window or animations")
+    parser.add_argument('--levels', default="levels.xml")
+    parser.add_argument('--jewels', default="jewels.xml")
+    args = parser.parse_args(argv)
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+        result = asyncio.run(spectate(args))
+    except (OSError, StreamError, ValueError) as e:
+        print(f"Spectator failed: {e}", file=sys.stderr)
+        return 1
+    print(f"{result['events']} events, {result['keyframes']} keyframes, {result['bytes']} bytes, "
+          f"score {result['score']}, board {result['board_hash']:08x}, "
+          f"{result['gaps']} gaps, {result['desyncs']} desyncs")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,5 +3,6 @@ from .playing_state import PlayingState
 from .high_scores_state import HighScoresState
 from .help_state import HelpState
 from .name_input_state import NameInputState
+from .loading_state import LoadingState
 
-__all__ = ['MenuState', 'PlayingState', 'HighScoresState', 'HelpState', 'NameInputState']
\ No newline at end of file
+__all__ = ['MenuState', 'PlayingState', 'HighScoresState', 'HelpState', 'NameInputState', 'LoadingState']
\ No newline at end of file
@@ -4,6 +4,8 @@ import pygame
 from typing import List
 
 class GameState(ABC):
+    render_alpha = 1.0
+
     def __init__(self, game):
         self.game = game
 
@@ -19,11 +21,20 @@ class GameState(ABC):
     def draw(self, screen):
         pass
 
+    def is_idle(self) -> bool:
+        return True
+
+    def is_static(self) -> bool:
+        return self.is_idle()
+
 class BackgroundState(GameState):
     def __init__(self, game, bg_key: str):
         super().__init__(game)
         self.bg_key = bg_key
-        self.bg_image = self.game.backgrounds.get(bg_key)
+
+    @property
+    def bg_image(self):
+        return self.game.backgrounds.get(self.bg_key)
 
     def draw_background(self, screen):
         from ..constants import SCREEN_WIDTH, SCREEN_HEIGHT
@@ -16,6 +16,7 @@ class HelpState(BackgroundState):
             "Game Modes:",
             "- Time Attack: Reach the target score before time runs out",
             "- Score Challenge: Reach the target score as quickly as possible",
+            "- Casual: No timer; press Z to undo a move and Y to redo it",
             "",
             "How to Play:",
             "1. Click on a jewel to select it",
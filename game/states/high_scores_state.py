@@ -1,12 +1,12 @@
 import pygame
-import os
 from .base import BackgroundState
 from .menu_state import MenuState
-from ..utils.config_loader import ConfigLoader
+from ..utils.score_store import MODE_NAMES
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 WHITE = (255, 255, 255)
+PAGE_SIZE = 10
 
 
 class HighScoresState(BackgroundState):
@@ -15,12 +15,54 @@ class HighScoresState(BackgroundState):
         self.font_large = pygame.font.SysFont('Arial', 48)
         self.font_medium = pygame.font.SysFont('Arial', 36)
         self.font_small = pygame.font.SysFont('Arial', 24)
-        self.high_scores = ConfigLoader.load_high_scores("high_scores.xml")
+        self.modes = [None] + list(MODE_NAMES)
+        self.mode_index = 0
+        self.level_filter = None
+        self.page = 0
+        self.load_page()
+
+    @property
+    def mode(self):
+        return self.modes[self.mode_index]
+
+    def load_page(self):
+        store = self.game.scores
+        self.total = store.count(self.mode, self.level_filter)
+        self.page_count = max(1, (self.total + PAGE_SIZE - 1) // PAGE_SIZE)
+        self.page = min(self.page, self.page_count - 1)
+        self.high_scores = store.top_scores(
+            self.mode, self.level_filter, PAGE_SIZE, self.page * PAGE_SIZE)
+
+    def next_level_filter(self):
+        levels = self.game.scores.levels(self.mode)
+        if self.level_filter is None:
+            self.level_filter = levels[0] if levels else None
+        else:
+            later = [level for level in levels if level > self.level_filter]
+            self.level_filter = later[0] if later else None
 
     def handle_events(self, events):
         for event in events:
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_ESCAPE:
                 self.game.set_state(MenuState(self.game))
+                return
+            elif event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                step = 1 if event.key == pygame.K_RIGHT else -1
+                self.mode_index = (self.mode_index + step) % len(self.modes)
+                self.level_filter = None
+                self.page = 0
+            elif event.key == pygame.K_TAB:
+                self.next_level_filter()
+                self.page = 0
+            elif event.key in (pygame.K_DOWN, pygame.K_PAGEDOWN):
+                self.page = min(self.page + 1, self.page_count - 1)
+            elif event.key in (pygame.K_UP, pygame.K_PAGEUP):
+                self.page = max(self.page - 1, 0)
+            else:
+                continue
+            self.load_page()
 
     def update(self, dt):
         pass
@@ -28,7 +70,14 @@ class HighScoresState(BackgroundState):
     def draw(self, screen):
         self.draw_background(screen)
         title = self.font_large.render("High Scores", True, WHITE)
-        screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 50))
+        screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 30))
+        mode_name = MODE_NAMES.get(self.mode, "All Modes")
+        level_name = f"Level {self.level_filter}" if self.level_filter else "All Levels"
+        filter_text = self.font_small.render(
+            f"< {mode_name} >  {level_name}  (page {self.page + 1}/{self.page_count})",
+            True, WHITE)
+        screen.blit(filter_text,
+                    (SCREEN_WIDTH // 2 - filter_text.get_width() // 2, 90))
         if not self.high_scores:
             no_scores = self.font_medium.render(
                 "No high scores yet!", True, WHITE)
@@ -40,15 +89,11 @@ class HighScoresState(BackgroundState):
                  2,
                  150))
         else:
-            for i, score in enumerate(self.high_scores[:10]):
-                score_text = self.font_medium.render(
-                    f"{
-                        i +
-                        1}. {
-                        score['name']}: {
-                        score['points']} ({
-                        score['level']}, {
-                        score['mode']})",
+            first_rank = self.page * PAGE_SIZE + 1
+            for i, score in enumerate(self.high_scores):
+                score_text = self.font_small.render(
+                    f"{first_rank + i}. {score['name']}: {score['points']} "
+                    f"(Level {score['level']}, {score['mode_name']}, {score['date']})",
                     True, WHITE
                 )
                 screen.blit(
@@ -57,15 +102,15 @@ class HighScoresState(BackgroundState):
                      2 -
                      score_text.get_width() //
                      2,
-                     150 +
+                     140 +
                      i *
-                     40))
+                     36))
         back_text = self.font_small.render(
-            "Press ESC to return to menu", True, WHITE)
+            "Arrows: mode/page  TAB: level  ESC: menu", True, WHITE)
         screen.blit(
             back_text,
             (SCREEN_WIDTH //
              2 -
              back_text.get_width() //
              2,
-             SCREEN_HEIGHT - 50))
\ No newline at end of file
+             SCREEN_HEIGHT - 50))
@@ -0,0 +1,33 @@
+import pygame
+from .base import GameState
+from .menu_state import MenuState
+from ..constants import *
+
+
+class LoadingState(GameState):
+    def __init__(self, game):
+        super().__init__(game)
+        self.font = pygame.font.SysFont('Arial', 36)
+
+    def handle_events(self, events):
+        pass
+
+    def update(self, dt):
+        if self.game.assets.is_loaded('background:menu'):
+            self.game.set_state(MenuState(self.game))
+
+    def is_idle(self) -> bool:
+        return False
+
+    def draw(self, screen):
+        screen.fill(BACKGROUND_COLOR)
+        title = self.font.render("Loading...", True, WHITE)
+        screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2,
+                            SCREEN_HEIGHT // 2 - 60))
+        bar = pygame.Rect(SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2, 400, 30)
+        pygame.draw.rect(screen, BUTTON_PRESSED, bar, border_radius=8)
+        fill = bar.copy()
+        fill.width = int(bar.width * self.game.assets.progress)
+        if fill.width:
+            pygame.draw.rect(screen, BUTTON_HOVER, fill, border_radius=8)
+        pygame.draw.rect(screen, BUTTON_BORDER, bar, 2, border_radius=8)
@@ -1,11 +1,14 @@
+import os
 import pygame
 from .base import BackgroundState
 from ..constants import *
+from ..utils.snapshot import SessionSnapshot, SnapshotError, SAVE_FILE
 
 
 class MenuState(BackgroundState):
     def __init__(self, game):
         super().__init__(game, "menu")
+        self.game.audio.play_music()
         self.font_large = pygame.font.SysFont('Arial', 48)
         self.font_medium = pygame.font.SysFont('Arial', 36)
         self.selected_option = 0
@@ -13,8 +16,11 @@ class MenuState(BackgroundState):
         self.mode_options = [
             {"text": "Time Attack", "mode": TIME_ATTACK},
             {"text": "Score Challenge", "mode": SCORE_CHALLENGE},
+            {"text": "Casual", "mode": CASUAL},
             {"text": "Back", "action": self.back_to_main}
         ]
+        if os.path.exists(SAVE_FILE):
+            self.mode_options.insert(0, {"text": "Continue", "action": self.continue_game})
         self.mode_selected_option = 0
         self.options = [
             {"text": "Start Game", "action": self.show_mode_selection},
@@ -31,10 +37,30 @@ class MenuState(BackgroundState):
     def back_to_main(self):
         self.mode_selection = False
 
+    def mode_option_rect(self, index: int) -> pygame.Rect:
+        top = min(300, SCREEN_HEIGHT - 40 - len(self.mode_options) * 70)
+        return pygame.Rect(SCREEN_WIDTH // 2 - 180, top + index * 70, 360, 60)
+
     def start_game(self, mode: str):
         from .playing_state import PlayingState
         self.game.set_state(PlayingState(self.game, mode, 1))
 
+    def continue_game(self):
+        from .playing_state import PlayingState
+        try:
+            snapshot = SessionSnapshot.load(SAVE_FILE)
+            state = PlayingState(self.game, snapshot.mode, snapshot.level, snapshot=snapshot)
+        except (SnapshotError, ValueError, IndexError) as e:
+            print(f"Could not resume game: {e}")
+            self.mode_options = [option for option in self.mode_options
+                                 if option.get("action") != self.continue_game]
+            self.mode_selected_option = 0
+            return
+        finally:
+            if os.path.exists(SAVE_FILE):
+                os.remove(SAVE_FILE)
+        self.game.set_state(state)
+
     def show_high_scores(self):
         from .high_scores_state import HighScoresState
         self.game.set_state(HighScoresState(self.game))
@@ -79,9 +105,7 @@ class MenuState(BackgroundState):
                 mouse_pos = pygame.mouse.get_pos()
                 if self.mode_selection:
                     for i, option in enumerate(self.mode_options):
-                        option_rect = pygame.Rect(
-                            SCREEN_WIDTH // 2 - 150, 300 + i * 60, 300, 50)
-                        if option_rect.collidepoint(mouse_pos):
+                        if self.mode_option_rect(i).collidepoint(mouse_pos):
                             self.mode_selected_option = i
                             if "action" in option:
                                 option["action"]()
@@ -109,8 +133,7 @@ class MenuState(BackgroundState):
                 title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 150))
 
             for i, option in enumerate(self.mode_options):
-                button_rect = pygame.Rect(
-                    SCREEN_WIDTH // 2 - 180, 300 + i * 70, 360, 60)
+                button_rect = self.mode_option_rect(i)
 
                 if i == self.mode_selected_option:
                     color = (80, 120, 200)
@@ -5,16 +5,27 @@ from typing import List, Tuple, Optional
 from .base import BackgroundState
 from .menu_state import MenuState
 from ..models.board import Board
+from ..models.event_bus import (SWAP, MATCH, CASCADE_WAVE, RESHUFFLE, LEVEL_COMPLETE,
+                                LevelCompleteEvent)
 from ..models.jewel_stats import JewelStats
 from ..models.jewel_factory import JewelFactory
+from ..utils.replay import Replay
+from ..utils.snapshot import SessionSnapshot, SAVE_FILE
+from ..utils.telemetry import OUTCOME_ABANDONED
+from ..constants import CASUAL
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-GRID_SIZE = 8
-CELL_SIZE = 60
 WHITE = (255, 255, 255)
 TIME_ATTACK = "time"
 SCORE_CHALLENGE = "score"
+TARGET_MODES = (SCORE_CHALLENGE, CASUAL)
+SCROLL_KEYS = {
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1)
+}
 
 class LevelManager:
    
@@ -25,18 +36,18 @@ class LevelManager:
         self.level_config = self.game.levels_config[level - 1]
         self.time_left = self.level_config['time_limit'] if mode == TIME_ATTACK else 0
         self.target_score = self.level_config['target_score']
-        self.start_time = time.time()
+        self.elapsed = 0.0
         self.avoid_matches = True
     
-    def update_time(self):
+    def update_time(self, dt: float):
+        self.elapsed += dt
         if self.mode == TIME_ATTACK:
-            elapsed = time.time() - self.start_time
-            self.time_left = max(0, self.level_config['time_limit'] - int(elapsed))
+            self.time_left = max(0, self.level_config['time_limit'] - int(self.elapsed))
             return self.time_left > 0
         return True
     
     def check_level_complete(self, score: int) -> bool:
-        if self.mode == SCORE_CHALLENGE and score >= self.target_score:
+        if self.mode in TARGET_MODES and score >= self.target_score:
             return True
         return False
     
@@ -50,7 +61,8 @@ class LevelManager:
             for x in range(min(len(config_board[y]), board.width)):
                 jewel_type = config_board[y][x]
                 if 0 <= jewel_type < len(self.game.jewels_config):
-                    board.grid_manager.grid[y][x] = self.game.jewel_factory.create_jewel(jewel_type, x, y)
+                    self.game.jewel_factory.release(board.grid_manager.grid[y][x])
+                    board.grid_manager.set_jewel(x, y, self.game.jewel_factory.create_jewel(jewel_type, x, y))
         
         self.fix_initial_matches(board)
     
@@ -65,8 +77,9 @@ class LevelManager:
                 for x, y in match:
                     bad_type = board.grid_manager.grid[y][x].type
                     possible_types = [t for t in range(self.game.jewel_factory.type_count) if t != bad_type]
-                    new_type = random.choice(possible_types)
-                    board.grid_manager.grid[y][x] = self.game.jewel_factory.create_jewel(new_type, x, y)
+                    new_type = board.rng.choice(possible_types)
+                    self.game.jewel_factory.release(board.grid_manager.grid[y][x])
+                    board.grid_manager.set_jewel(x, y, self.game.jewel_factory.create_jewel(new_type, x, y))
 
             matches = board.find_matches()
             attempts += 1
@@ -104,6 +117,10 @@ class GameUI:
         else:
             target_text = self.font_small.render(f"Target: {target_score}", True, WHITE)
             screen.blit(target_text, (SCREEN_WIDTH - 150, 60))
+
+    def draw_undo_info(self, screen: pygame.Surface, undo_count: int, redo_count: int):
+        undo_text = self.font_small.render(f"Undo (Z): {undo_count}  Redo (Y): {redo_count}", True, WHITE)
+        screen.blit(undo_text, (20, 65))
     
     def draw_message(self, screen: pygame.Surface, title: str, subtitle: str):
         
@@ -137,12 +154,13 @@ class GameUI:
                 self.timer_blink_state = not self.timer_blink_state
                 self.last_blink_time = current_time
                 if self.timer_blink_state:
-                    self.game.audio.play_sound('select')
+                    self.game.audio.play_sound('select', 'timer')
         else:
             self.timer_blink_state = False
  
 class PlayingState(BackgroundState):
-    def __init__(self, game, mode: str, level: int, score: int = 0):
+    def __init__(self, game, mode: str, level: int, score: int = 0, seed: Optional[int] = None,
+                 record: bool = True, snapshot: Optional[SessionSnapshot] = None):
         super().__init__(game, "game")
         self.mode = mode
         self.level = level
@@ -156,90 +174,179 @@ class PlayingState(BackgroundState):
         self.invalid_move_animation = False
         self.invalid_move_time = 0
         self.invalid_move_positions = []
+        if snapshot or mode == CASUAL:
+            record = False
+        if snapshot:
+            seed = snapshot.board.seed
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.record = record
+        self.replay = Replay(self.seed, level, mode)
+        self.replay_saved = not record
         
         self.level_manager = LevelManager(game, mode, level)
         self.ui = GameUI(game)
+        self.game.audio.play_level_music(level)
         
        
         stats_x, stats_y = 10, SCREEN_HEIGHT - 300
         self.jewel_stats = JewelStats(self.game.jewels_config, stats_x, stats_y)
         
-        global GRID_OFFSET_X, GRID_OFFSET_Y
-        GRID_OFFSET_X = (SCREEN_WIDTH - GRID_SIZE * CELL_SIZE) // 2 + 30
-        GRID_OFFSET_Y = 100 - 10
-        
-        self.board = Board(GRID_SIZE, GRID_SIZE, self.game.jewel_factory, self.game.audio)
+        level_config = self.level_manager.level_config
+        self.board = Board(level_config['width'], level_config['height'],
+                           self.game.jewel_factory, self.game.audio, seed=self.seed, fill=False,
+                           history_length=level_config['undo'] if mode == CASUAL else 0)
+        self.layout = self.board.layout
+        events = self.board.events
+        events.subscribe(CASCADE_WAVE, self.on_cascade_wave)
+        events.subscribe(CASCADE_WAVE, self.jewel_stats.on_cascade_wave)
+        events.subscribe(RESHUFFLE, self.on_reshuffle)
+        events.subscribe(SWAP, self.game.audio.on_swap)
+        events.subscribe(MATCH, self.game.audio.on_match)
         
+        if snapshot:
+            self.resume(snapshot)
+            self.initial_snapshot = None
+            self.start_telemetry(resumed=True)
+            return
         
+        self.board.fill_board(self.level_manager.avoid_matches)
         self.level_manager.load_board_config(self.board)
-        if not self.level_manager.level_config.get('board'):
-            self.board.fill_board(self.level_manager.avoid_matches)
         
         self.level_manager.fix_initial_matches(self.board)
+        self.initial_snapshot = self.snapshot()
+        self.start_telemetry()
+
+    def start_telemetry(self, resumed: bool = False):
+        if self.game.telemetry:
+            self.game.telemetry.start_session(self.board.events, self.mode, self.level, self.seed,
+                                              self.board.width, self.board.height, self.score,
+                                              resumed)
+
+    def collected(self) -> Tuple[int, ...]:
+        return tuple(self.jewel_stats.stats.get(jewel['id'], 0)
+                     for jewel in self.game.jewels_config)
+
+    def snapshot(self) -> SessionSnapshot:
+        return SessionSnapshot(self.mode, self.level, self.score, self.level_manager.elapsed,
+                               self.collected(), self.board.snapshot())
+
+    def resume(self, snapshot: SessionSnapshot):
+        self.board.restore(snapshot.board)
+        self.level_manager.elapsed = 0.0
+        self.level_manager.update_time(snapshot.elapsed)
+        self.restore_progress(snapshot.score, snapshot.collected)
+        self.no_moves = False
+        self.game_over = False
+        self.level_complete = False
+        self.goal_achieved = False
+        self.invalid_move_animation = False
+
+    def restore_progress(self, score: int, collected: Tuple[int, ...]):
+        self.score = score
+        for jewel, count in zip(self.game.jewels_config, collected):
+            self.jewel_stats.stats[jewel['id']] = count
+
+    def undo(self):
+        if self.finished or not self.board.settled:
+            return
+        state = self.board.undo(self.score, self.collected())
+        if state is not None:
+            self.restore_progress(state.score, state.collected)
+            self.no_moves = False
+
+    def redo(self):
+        if self.finished or not self.board.settled:
+            return
+        state = self.board.redo(self.score, self.collected())
+        if state is not None:
+            self.restore_progress(state.score, state.collected)
+            self.no_moves = False
+
+    def restart(self):
+        if self.initial_snapshot is None:
+            self.__init__(self.game, self.mode, self.level, 0, seed=self.seed)
+            return
+        self.resume(self.initial_snapshot)
+        self.replay = Replay(self.seed, self.level, self.mode)
+        self.replay_saved = not self.record
+        self.start_telemetry()
+
+    def suspend(self):
+        if self.finished:
+            return
+        try:
+            self.snapshot().save(SAVE_FILE)
+        except OSError as e:
+            print(f"Could not save game: {e}")
 
     def reshuffle_board(self):
-        
-        jewels = [jewel for row in self.board.grid_manager.grid for jewel in row if jewel]
-        random.shuffle(jewels)
+        self.board.reshuffle()
 
-        index = 0
-        for y in range(self.board.height):
-            for x in range(self.board.width):
-                if index < len(jewels):
-                    jewels[index].move_to(x, y)
-                    self.board.grid_manager.grid[y][x] = jewels[index]
-                    index += 1
-                else:
-                    self.board.grid_manager.grid[y][x] = None
+    def on_cascade_wave(self, event):
+        self.score += event.points
 
-        if not self.board.match_finder.has_possible_moves():
-            self.board.fill_board(avoid_matches=True)
+    def on_reshuffle(self, event):
+        self.no_moves = True
+        self.no_moves_message_time = time.time()
+
+    def complete_level(self, success: bool):
+        self.board.events.publish(LEVEL_COMPLETE, LevelCompleteEvent(
+            self.level, self.score, self.level_manager.elapsed, success))
+        self.save_replay()
 
     def update(self, dt):
         if self.game_over or self.level_complete or self.goal_achieved:
             return
 
-       
-        if not self.board.match_finder.has_possible_moves():
-            if not self.no_moves:
-                self.no_moves = True
-                self.no_moves_message_time = time.time()
-                self.reshuffle_board()
-            elif time.time() - self.no_moves_message_time > 2.0:
-                self.no_moves = False
-
     
+        if not self.level_manager.update_time(dt):
+            self.game_over = True
+            self.complete_level(False)
+            if self.game.is_high_score(self.score, self.mode):
+                from .name_input_state import NameInputState
+                self.game.set_state(NameInputState(self.game, self.mode, self.level, self.score,self.level_manager.time_left))
+            return
         if self.mode == TIME_ATTACK:
-            if not self.level_manager.update_time():
-                self.game_over = True
-                if self.game.is_high_score(self.score):
-                    from .name_input_state import NameInputState
-                    self.game.set_state(NameInputState(self.game, self.mode, self.level, self.score,self.level_manager.time_left))
-            
             self.ui.update_blink_state(self.level_manager.time_left)
 
-     
-        if self.mode == SCORE_CHALLENGE and self.score >= self.level_manager.target_score:
+        self.board.update(dt)
+
+        if self.no_moves and time.time() - self.no_moves_message_time > 2.0:
+            self.no_moves = False
+        
+        self.board.resolve()
+
+        if (self.mode in TARGET_MODES and self.board.settled
+                and self.score >= self.level_manager.target_score):
             self.level_complete = True
             self.goal_achieved = True
+            self.complete_level(True)
+
+    def save_replay(self):
+        if self.replay_saved:
+            return
+        self.replay_saved = True
+        self.replay.finish(self.level_manager.elapsed, self.score, self.board.state_hash(),
+                           self.board.resolve_count)
+        try:
+            self.replay.save()
+        except OSError as e:
+            print(f"Could not save replay: {e}")
+
+    @property
+    def finished(self) -> bool:
+        return self.game_over or self.level_complete or self.goal_achieved
+
+    def is_idle(self) -> bool:
+        return not self.board.is_moving
+
+    def is_static(self) -> bool:
+        if self.mode == TIME_ATTACK and not self.game_over:
+            return False
+        return (self.is_idle() and not self.invalid_move_animation
+                and not self.no_moves
+                and self.board.settled)
 
-        
-        self.board.update(dt)
-        
-        if not self.board.is_moving:
-            matches = self.board.find_matches()
-            if matches:
-                points, collected_jewels = self.board.remove_matches(matches)
-                self.score += points
-                for jewel_type, count in collected_jewels.items():
-                    for _ in range(count):
-                        self.jewel_stats.add_jewel(jewel_type)
-                self.board.grid_manager.collapse_columns()
-                self.board.grid_manager.refill_board()
-                if not any(jewel.animating for row in self.board.grid_manager.grid for jewel in row if jewel):
-                    if self.score >= self.target_score and self.mode == SCORE_CHALLENGE:
-                        self.level_complete = True
-                    
     def draw(self, screen: pygame.Surface):
         self.draw_background(screen)
         
@@ -252,8 +359,11 @@ class PlayingState(BackgroundState):
         )
         
        
-        self.board.draw(screen)
+        self.board.draw(screen, self.render_alpha)
         self.jewel_stats.draw(screen)
+        if self.mode == CASUAL:
+            self.ui.draw_undo_info(screen, len(self.board.history.undo_stack),
+                                   len(self.board.history.redo_stack))
         
        
         if self.invalid_move_animation:
@@ -264,9 +374,12 @@ class PlayingState(BackgroundState):
                 for pos in self.invalid_move_positions:
                     if pos:
                         x, y = pos
-                        overlay = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+                        if not self.layout.is_visible(x * self.layout.cell_size, y * self.layout.cell_size):
+                            continue
+                        cell = round(self.layout.cell)
+                        overlay = pygame.Surface((cell, cell), pygame.SRCALPHA)
                         overlay.fill((255, 0, 0, alpha))
-                        screen.blit(overlay, (GRID_OFFSET_X + x * CELL_SIZE +5, GRID_OFFSET_Y + y * CELL_SIZE +5))
+                        screen.blit(overlay, self.layout.cell_origin(x, y))
             else:
                 self.invalid_move_animation = False
         
@@ -289,23 +402,56 @@ class PlayingState(BackgroundState):
         for event in events:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
+                    self.save_replay()
+                    self.suspend()
+                    if self.game.telemetry:
+                        self.game.telemetry.end_session(OUTCOME_ABANDONED, self.score,
+                                                        self.level_manager.elapsed)
                     self.game.set_state(MenuState(self.game))
                 elif event.key == pygame.K_r and self.no_moves:
-                    self.__init__(self.game, self.mode, self.level, 0)
+                    self.restart()
                     return
                 elif event.key == pygame.K_RETURN and (self.goal_achieved or self.level_complete or self.game_over):
-                    if self.level < len(self.game.levels_config):
+                    if self.mode == SCORE_CHALLENGE and self.game.is_high_score(self.score, self.mode):
+                        from .name_input_state import NameInputState
+                        self.game.set_state(NameInputState(self.game, self.mode, self.level, self.score))
+                    elif self.level < len(self.game.levels_config):
                         self.game.set_state(PlayingState(self.game, self.mode, self.level + 1, 0))
                     else:
                         self.game.set_state(MenuState(self.game))
+                elif event.key == pygame.K_z and self.mode == CASUAL:
+                    if event.mod & pygame.KMOD_SHIFT:
+                        self.redo()
+                    else:
+                        self.undo()
+                elif event.key == pygame.K_y and self.mode == CASUAL:
+                    self.redo()
+                elif event.key in SCROLL_KEYS:
+                    self.layout.scroll_cells(*SCROLL_KEYS[event.key])
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self.layout.zoom_in()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.layout.zoom_out()
+            elif event.type == pygame.MOUSEWHEEL:
+                anchor = pygame.mouse.get_pos()
+                if event.y > 0:
+                    self.layout.zoom_in(anchor)
+                elif event.y < 0:
+                    self.layout.zoom_out(anchor)
             
             if not self.game_over and not self.level_complete and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                mouse_x, mouse_y = event.pos
-                grid_x = (mouse_x - GRID_OFFSET_X) // CELL_SIZE
-                grid_y = (mouse_y - GRID_OFFSET_Y) // CELL_SIZE
-                
-                if 0 <= grid_x < GRID_SIZE and 0 <= grid_y < GRID_SIZE:
+                cell = self.layout.cell_at(*event.pos)
+                if cell and self.board.settled:
+                    grid_x, grid_y = cell
+                    move_count = self.board.move_count
+                    before = None
+                    if self.board.history.length and self.board.selected_jewel:
+                        before = self.board.capture_state(self.score, self.collected())
                     success, invalid_pos = self.board.select_jewel(grid_x, grid_y)
+                    if self.board.move_count != move_count:
+                        self.replay.record_swap(self.level_manager.elapsed, *self.board.last_move)
+                        if before is not None:
+                            self.board.history.push(before)
                     if not success and invalid_pos:
                         self.invalid_move_animation = True
                         self.invalid_move_time = time.time()
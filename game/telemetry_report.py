@@ -0,0 +1,249 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .utils.config_loader import ConfigLoader, ConfigError
+from .utils.sketch import QuantileSketch
+from .utils.telemetry import (TELEMETRY_PREFIX, TELEMETRY_SUFFIX, OUTCOME_COMPLETE,
+                              OUTCOME_FAILED, OUTCOME_ABANDONED)
+
+SCORE_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+TIME_QUANTILES = (0.5, 0.9, 0.99)
+FRAME_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LevelStats:
+    def __init__(self):
+        self.started = 0
+        self.resumed = 0
+        self.outcomes: Counter = Counter()
+        self.scores = QuantileSketch()
+        self.elapsed = QuantileSketch()
+        self.moves = QuantileSketch()
+        self.depths: Counter = Counter()
+        self.points = QuantileSketch()
+        self.think = QuantileSketch()
+        self.resolve = QuantileSketch()
+        self.reshuffles = 0
+        self.frames = QuantileSketch()
+
+    def merge(self, other: 'LevelStats'):
+        self.started += other.started
+        self.resumed += other.resumed
+        self.outcomes.update(other.outcomes)
+        self.depths.update(other.depths)
+        self.reshuffles += other.reshuffles
+        for name in ('scores', 'elapsed', 'moves', 'points', 'think', 'resolve', 'frames'):
+            getattr(self, name).merge(getattr(other, name))
+
+    def summary(self) -> Dict:
+        ended = sum(self.outcomes.values())
+        return {
+            'sessions': self.started,
+            'resumed': self.resumed,
+            'ended': ended,
+            'outcomes': {outcome: self.outcomes[outcome] for outcome in
+                         (OUTCOME_COMPLETE, OUTCOME_FAILED, OUTCOME_ABANDONED)},
+            'completion_rate': round(self.outcomes[OUTCOME_COMPLETE] / ended, 4) if ended else None,
+            'score': self.scores.summary(SCORE_QUANTILES),
+            'elapsed_s': self.elapsed.summary(SCORE_QUANTILES),
+            'moves_per_session': self.moves.summary(SCORE_QUANTILES),
+            'points_per_move': self.points.summary(SCORE_QUANTILES),
+            'cascade_depth': {str(depth): count for depth, count in sorted(self.depths.items())},
+            'think_ms': self.think.summary(TIME_QUANTILES),
+            'resolve_ms': self.resolve.summary(TIME_QUANTILES),
+            'reshuffles': self.reshuffles,
+            'frame_ms': self.frames.summary(FRAME_QUANTILES)
+        }
+
+
+class Aggregate:
+    def __init__(self):
+        self.files = 0
+        self.records = 0
+        self.errors = 0
+        self.dropped = 0
+        self.levels: Dict[Tuple[str, int], LevelStats] = {}
+        self.frames = QuantileSketch()
+
+    def level(self, record: Dict) -> Optional[LevelStats]:
+        if 'session' not in record:
+            return None
+        key = (record['mode'], record['level'])
+        stats = self.levels.get(key)
+        if stats is None:
+            stats = self.levels[key] = LevelStats()
+        return stats
+
+    def add(self, record: Dict):
+        self.records += 1
+        kind = record.get('type')
+        stats = self.level(record)
+        if kind == 'frames':
+            bucket_ms = record['bucket_ms']
+            for bucket, count in record['histogram']:
+                value = (bucket + 0.5) * bucket_ms
+                self.frames.add(value, count)
+                if stats:
+                    stats.frames.add(value, count)
+        elif stats is None:
+            return
+        elif kind == 'move':
+            stats.depths[record['depth']] += 1
+            stats.points.add(record['points'])
+            stats.think.add(record['think_ms'])
+            stats.resolve.add(record['resolve_ms'])
+        elif kind == 'session_start':
+            stats.started += 1
+            if record.get('resumed'):
+                stats.resumed += 1
+        elif kind == 'session_end':
+            stats.outcomes[record['outcome']] += 1
+            stats.scores.add(record['score'])
+            stats.elapsed.add(record['elapsed'])
+            stats.moves.add(record['moves'])
+            self.dropped += record.get('dropped', 0)
+        elif kind == 'reshuffle':
+            stats.reshuffles += 1
+
+    def merge(self, other: 'Aggregate'):
+        self.files += other.files
+        self.records += other.records
+        self.errors += other.errors
+        self.dropped += other.dropped
+        self.frames.merge(other.frames)
+        for key, stats in other.levels.items():
+            if key in self.levels:
+                self.levels[key].merge(stats)
+            else:
+                self.levels[key] = stats
+
+    def summary(self, levels_config: Optional[List[Dict]] = None) -> Dict:
+        levels = []
+        for (mode, level), stats in sorted(self.levels.items(), key=lambda item: (item[0][1],
+                                                                                  item[0][0])):
+            entry = {'level': level, 'mode': mode}
+            if levels_config and 1 <= level <= len(levels_config):
+                config = levels_config[level - 1]
+                entry['config'] = {'target_score': config['target_score'],
+                                   'time_limit': config['time_limit'],
+                                   'width': config['width'], 'height': config['height']}
+            entry.update(stats.summary())
+            levels.append(entry)
+        return {
+            'files': self.files,
+            'records': self.records,
+            'errors': self.errors,
+            'dropped': self.dropped,
+            'frame_ms': self.frames.summary(FRAME_QUANTILES),
+            'levels': levels
+        }
+
+
+def read_lines(path: str) -> Iterator[str]:
+    with open(path, encoding='utf-8', errors='replace') as file:
+        yield from file
+
+
+def parse_records(lines: Iterable[str], errors: Counter) -> Iterator[Dict]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            errors['errors'] += 1
+            continue
+        if isinstance(record, dict):
+            yield record
+        else:
+            errors['errors'] += 1
+
+
+def summarize_file(path: str) -> Aggregate:
+    aggregate = Aggregate()
+    errors: Counter = Counter()
+    try:
+        for record in parse_records(read_lines(path), errors):
+            try:
+                aggregate.add(record)
+            except (KeyError, TypeError, ValueError):
+                errors['errors'] += 1
+        aggregate.files = 1
+    except OSError as e:
+        print(f"Could not read {path}: {e}", file=sys.stderr)
+        errors['errors'] += 1
+    aggregate.errors = errors['errors']
+    return aggregate
+
+
+def find_files(paths: Iterable[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.startswith(TELEMETRY_PREFIX)
+                                and name.endswith(TELEMETRY_SUFFIX)))
+        elif os.path.exists(path):
+            files.append(path)
+        else:
+            print(f"Could not find {path}", file=sys.stderr)
+    return files
+
+
+def aggregate_files(files: List[str], jobs: int = 0) -> Aggregate:
+    total = Aggregate()
+    jobs = min(jobs or os.cpu_count() or 1, len(files))
+    if jobs <= 1:
+        for path in files:
+            total.merge(summarize_file(path))
+        return total
+    with multiprocessing.Pool(jobs) as pool:
+        for aggregate in pool.imap_unordered(summarize_file, files):
+            total.merge(aggregate)
+    return total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize Jewel Quest telemetry for level tuning.")
+    parser.add_argument('paths', nargs='+', help="telemetry files or directories of them")
+    parser.add_argument('--jobs', type=int, default=0, help="worker processes (default: all CPUs)")
+    parser.add_argument('--levels', help="levels.xml to include current level settings")
+    parser.add_argument('--output', help="write the summary here instead of stdout")
+    args = parser.parse_args(argv)
+    files = find_files(args.paths)
+    if not files:
+        print("No telemetry files found", file=sys.stderr)
+        return 1
+    levels_config = None
+    if args.levels:
+        try:
+            levels_config = ConfigLoader.load_levels_config(args.levels)
+        except ConfigError as e:
+            print(e, file=sys.stderr)
+            return 1
+    total = aggregate_files(files, args.jobs)
+    if not total.files:
+        print("No telemetry files could be read", file=sys.stderr)
+        return 1
+    summary = total.summary(levels_config)
+    text = json.dumps(summary, indent=2)
+    if args.output:
+        try:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                file.write(text + '\n')
+        except OSError as e:
+            print(f"Could not write {args.output}: {e}", file=sys.stderr)
+            return 1
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+class AssetLoader:
+    def __init__(self, workers: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix="asset-loader")
+        self.pending: List[Tuple[str, Future, Callable, Optional[Callable]]] = []
+        self.total = 0
+        self.completed = 0
+        self.ready: Set[str] = set()
+        self.failed: Dict[str, Exception] = {}
+
+    def submit(self, key: str, load: Callable[[], Any],
+               on_ready: Callable[[Any], None],
+               on_error: Optional[Callable[[Exception], None]] = None):
+        self.total += 1
+        self.pending.append((key, self.executor.submit(load), on_ready, on_error))
+
+    def poll(self) -> int:
+        if not self.pending:
+            return 0
+        finished = 0
+        remaining = []
+        for entry in self.pending:
+            key, future, on_ready, on_error = entry
+            if not future.done():
+                remaining.append(entry)
+                continue
+            try:
+                on_ready(future.result())
+                self.ready.add(key)
+            except Exception as e:
+                self.failed[key] = e
+                print(f"Could not load asset {key}: {e}")
+                if on_error:
+                    on_error(e)
+            self.completed += 1
+            finished += 1
+        self.pending = remaining
+        return finished
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self.ready or key in self.failed
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    @property
+    def progress(self) -> float:
+        if not self.total:
+            return 1.0
+        return self.completed / self.total
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
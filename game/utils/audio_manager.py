@@ -1,50 +1,200 @@
+import os
 import pygame
+from functools import partial
+from typing import Dict, List, Optional
+
+MUSIC_FILE = 'assets/sounds/background.mp3'
+LEVEL_MUSIC_FILE = 'assets/sounds/level_{level}.mp3'
+SOUND_FILES = {
+    'select': 'assets/sounds/select.mp3',
+    'swap_success': 'assets/sounds/swap_success.mp3',
+    'swap_fail': 'assets/sounds/swap_fail.mp3',
+    'match': 'assets/sounds/match.mp3'
+}
+MUSIC_END = pygame.USEREVENT + 1
+CROSSFADE_TIME = 1.0
+SOUND_CATEGORIES = {
+    'select': 'ui',
+    'swap_success': 'board',
+    'swap_fail': 'board',
+    'match': 'board'
+}
+CHANNEL_GROUPS = {'ui': 2, 'board': 4, 'timer': 1}
+MAX_VOICES = {'match': 3}
+DEFAULT_MAX_VOICES = 2
+MERGE_WINDOW = 0.05
 
 
 class AudioManager:
-    def __init__(self):
+    def __init__(self, load: bool = True):
         pygame.mixer.init()
-        self.sounds = {}
-        self.music = None
+        self.sounds = {name: None for name in SOUND_FILES}
         self.music_volume = 0.5
         self.sound_volume = 0.7
-        self._load_assets()
+        self.muted = False
+        self.playlist: List[str] = []
+        self.loop = True
+        self.track_index = 0
+        self.current_track: Optional[str] = None
+        self.next_playlist: Optional[List[str]] = None
+        self.fade_remaining = 0.0
+        self.crossfade_time = CROSSFADE_TIME
+        self.merge_window = MERGE_WINDOW
+        self.clock = 0.0
+        self.last_played: Dict[str, float] = {}
+        self.applied_volume: Dict[str, float] = {}
+        self.merged = 0
+        self.dropped = 0
+        self.channels = self._reserve_channels()
+        pygame.mixer.music.set_endevent(MUSIC_END)
+        if load:
+            self._load_assets()
 
     def set_mute(self, mute: bool):
+        self.muted = mute
         self.music_volume = 0.0 if mute else 0.5
         self.sound_volume = 0.0 if mute else 0.7
-        if self.music:
-            self.music.set_volume(self.music_volume)
+        pygame.mixer.music.set_volume(self.music_volume)
+
+    def set_music_volume(self, volume: float):
+        self.music_volume = volume
+        if not self.muted and not self.fade_remaining:
+            pygame.mixer.music.set_volume(volume)
 
     def _load_assets(self):
-        try:
-            self.music = pygame.mixer.Sound('assets/sounds/background.mp3')
-            self.sounds = {
-                'select': pygame.mixer.Sound('assets/sounds/select.mp3'),
-                'swap_success': pygame.mixer.Sound('assets/sounds/swap_success.mp3'),
-                'swap_fail': pygame.mixer.Sound('assets/sounds/swap_fail.mp3'),
-                'match': pygame.mixer.Sound('assets/sounds/match.mp3')
-            }
-        except Exception as e:
-            print(f"Could not load audio: {e}")
-            self.music = None
-            self.sounds = {
-                'select': None,
-                'swap_success': None,
-                'swap_fail': None,
-                'match': None
-            }
+        for name, path in SOUND_FILES.items():
+            try:
+                self.sounds[name] = pygame.mixer.Sound(path)
+            except Exception as e:
+                print(f"Could not load audio: {e}")
+
+    def load_async(self, loader):
+        for name, path in SOUND_FILES.items():
+            loader.submit(f"sound:{name}", partial(pygame.mixer.Sound, path),
+                          partial(self.sounds.__setitem__, name))
 
     def play_music(self, loop=True):
-        if self.music:
-            self.music.set_volume(self.music_volume)
-            self.music.play(-1 if loop else 0)
+        self.play_playlist([MUSIC_FILE], loop)
+
+    def play_level_music(self, level: int):
+        track = LEVEL_MUSIC_FILE.format(level=level)
+        self.play_playlist([track if os.path.exists(track) else MUSIC_FILE])
+
+    def play_playlist(self, tracks: List[str], loop=True):
+        tracks = list(tracks)
+        if tracks == self.playlist and not self.next_playlist:
+            return
+        self.loop = loop
+        if self.current_track and pygame.mixer.music.get_busy():
+            self.next_playlist = tracks
+            if not self.fade_remaining:
+                self.fade_remaining = self.crossfade_time
+            return
+        self._start_playlist(tracks)
 
     def stop_music(self):
-        if self.music:
-            self.music.stop()
+        self.playlist = []
+        self.next_playlist = None
+        self.current_track = None
+        self.fade_remaining = 0.0
+        pygame.mixer.music.stop()
+
+    def update(self, dt: float):
+        self.clock += dt
+        if not self.fade_remaining:
+            return
+        self.fade_remaining = max(0.0, self.fade_remaining - dt)
+        pygame.mixer.music.set_volume(
+            self.music_volume * self.fade_remaining / self.crossfade_time)
+        if not self.fade_remaining:
+            tracks, self.next_playlist = self.next_playlist, None
+            self._start_playlist(tracks)
+
+    def handle_event(self, event):
+        if event.type != MUSIC_END or not self.playlist or self.fade_remaining:
+            return
+        next_index = self.track_index + 1
+        if next_index >= len(self.playlist):
+            if not self.loop:
+                self.current_track = None
+                return
+            next_index = 0
+        self._play_track(next_index, fade_ms=0)
+
+    def _start_playlist(self, tracks: List[str]):
+        self.playlist = tracks
+        self._play_track(0, fade_ms=int(self.crossfade_time * 1000))
+
+    def _play_track(self, index: int, fade_ms: int):
+        self.track_index = index
+        track = self.playlist[index]
+        try:
+            pygame.mixer.music.load(track)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Could not load audio: {e}")
+            self.current_track = None
+            return
+        self.current_track = track
+        pygame.mixer.music.set_volume(self.music_volume)
+        loops = -1 if self.loop and len(self.playlist) == 1 else 0
+        pygame.mixer.music.play(loops, fade_ms=fade_ms)
+
+    def play_sound(self, sound_name, category: Optional[str] = None):
+        sound = self.sounds.get(sound_name)
+        if not sound or not self.sound_volume:
+            return
+        key = (sound_name, category)
+        last = self.last_played.get(key)
+        if last is not None and self.clock - last < self.merge_window:
+            self.merged += 1
+            return
+        channel = self._find_channel(sound, category or SOUND_CATEGORIES.get(sound_name, 'ui'),
+                                     MAX_VOICES.get(sound_name, DEFAULT_MAX_VOICES))
+        if channel is None:
+            self.dropped += 1
+            return
+        if self.applied_volume.get(sound_name) != self.sound_volume:
+            sound.set_volume(self.sound_volume)
+            self.applied_volume[sound_name] = self.sound_volume
+        channel.play(sound)
+        self.last_played[key] = self.clock
+
+    def on_swap(self, event):
+        self.play_sound('swap_success')
+
+    def on_match(self, event):
+        self.play_sound('match')
+
+    def voice_stats(self) -> Dict[str, int]:
+        return {
+            'busy': sum(channel.get_busy() for group in self.channels.values()
+                        for channel in group),
+            'merged': self.merged,
+            'dropped': self.dropped
+        }
+
+    def _reserve_channels(self) -> Dict[str, List[pygame.mixer.Channel]]:
+        total = sum(CHANNEL_GROUPS.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        channels = {}
+        next_id = 0
+        for group, size in CHANNEL_GROUPS.items():
+            channels[group] = [pygame.mixer.Channel(i) for i in range(next_id, next_id + size)]
+            next_id += size
+        return channels
 
-    def play_sound(self, sound_name):
-        if sound_name in self.sounds and self.sounds[sound_name]:
-            self.sounds[sound_name].set_volume(self.sound_volume)
-            self.sounds[sound_name].play()
+    def _find_channel(self, sound, group: str,
+                      max_voices: int) -> Optional[pygame.mixer.Channel]:
+        free = None
+        voices = 0
+        for channel in self.channels.get(group, ()):
+            if not channel.get_busy():
+                if free is None:
+                    free = channel
+            elif channel.get_sound() is sound:
+                voices += 1
+        if voices >= max_voices:
+            return None
+        return free
@@ -0,0 +1,184 @@
+import struct
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+from .snapshot import EFFECT_CODES, EFFECTS
+
+KEYFRAME_INTERVAL = 32
+FRAME = struct.Struct('<HIB')
+KEYFRAME = struct.Struct('<BBIHB')
+SWAP = struct.Struct('<BBBB')
+COUNT = struct.Struct('<H')
+CELL = struct.Struct('<H')
+SPECIAL = struct.Struct('<HB')
+COLUMN = struct.Struct('<BB')
+POINTS = struct.Struct('<I')
+
+OP_KEYFRAME = 0
+OP_SWAP = 1
+OP_CLEAR = 2
+OP_SPECIAL = 3
+OP_FALL = 4
+OP_SPAWN = 5
+OP_POINTS = 6
+
+KEYFRAME_RESET = 1
+
+
+class StreamError(Exception):
+    pass
+
+
+class StreamEvent(NamedTuple):
+    sequence: int
+    op: int
+    data: object
+
+
+class Keyframe(NamedTuple):
+    width: int
+    height: int
+    score: int
+    cells: bytes
+    specials: Tuple[Tuple[int, str], ...]
+    reset: bool = False
+
+
+class BoardStream:
+    def __init__(self, board, score: int = 0, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.board = board
+        self.score = score
+        self.keyframe_interval = keyframe_interval
+        self.sequence = 0
+        self.moves_since_keyframe = 0
+        self.pending: List[bytes] = []
+        self.keyframe()
+
+    def _emit(self, op: int, payload: bytes):
+        self.sequence += 1
+        self.pending.append(FRAME.pack(len(payload), self.sequence, op) + payload)
+
+    def encode_keyframe(self, reset: bool = False) -> bytes:
+        snapshot = self.board.snapshot()
+        payload = (KEYFRAME.pack(snapshot.width, snapshot.height, self.score,
+                                 len(snapshot.specials), KEYFRAME_RESET if reset else 0) +
+                   snapshot.cells +
+                   b''.join(SPECIAL.pack(index, EFFECT_CODES[effect])
+                            for index, effect in snapshot.specials))
+        return FRAME.pack(len(payload), self.sequence, OP_KEYFRAME) + payload
+
+    def keyframe(self, reset: bool = False):
+        self.pending.append(self.encode_keyframe(reset))
+        self.moves_since_keyframe = 0
+
+    def swap(self, x1: int, y1: int, x2: int, y2: int):
+        if self.moves_since_keyframe >= self.keyframe_interval:
+            self.keyframe()
+        self.moves_since_keyframe += 1
+        self._emit(OP_SWAP, SWAP.pack(x1, y1, x2, y2))
+
+    def clear(self, cells: Sequence[Tuple[int, int]]):
+        width = self.board.width
+        self._emit(OP_CLEAR, COUNT.pack(len(cells)) +
+                   b''.join(CELL.pack(y * width + x) for x, y in cells))
+
+    def specials(self, specials: Dict[Tuple[int, int], str]):
+        if not specials:
+            return
+        width = self.board.width
+        self._emit(OP_SPECIAL, COUNT.pack(len(specials)) +
+                   b''.join(SPECIAL.pack(y * width + x, EFFECT_CODES[effect])
+                            for (x, y), effect in specials.items()))
+
+    def falls(self, falls: Dict[int, List[Tuple[int, int]]]):
+        if not falls:
+            return
+        payload = [COUNT.pack(len(falls))]
+        for x, moves in falls.items():
+            payload.append(COLUMN.pack(x, len(moves)))
+            payload.append(bytes(row for move in moves for row in move))
+        self._emit(OP_FALL, b''.join(payload))
+
+    def spawns(self, spawns: Dict[int, List[int]]):
+        if not spawns:
+            return
+        payload = [COUNT.pack(len(spawns))]
+        for x, types in spawns.items():
+            payload.append(COLUMN.pack(x, len(types)))
+            payload.append(bytes(types))
+        self._emit(OP_SPAWN, b''.join(payload))
+
+    def points(self, points: int):
+        self.score += points
+        self._emit(OP_POINTS, POINTS.pack(points))
+
+    def flush(self) -> bytes:
+        data = b''.join(self.pending)
+        self.pending.clear()
+        return data
+
+
+def split_frames(data: bytes, offset: int = 0) -> Tuple[List[Tuple[int, int, bytes]], int]:
+    frames = []
+    while len(data) - offset >= FRAME.size:
+        length, sequence, op = FRAME.unpack_from(data, offset)
+        end = offset + FRAME.size + length
+        if end > len(data):
+            break
+        frames.append((sequence, op, data[offset + FRAME.size:end]))
+        offset = end
+    return frames, offset
+
+
+def decode(sequence: int, op: int, payload: bytes) -> StreamEvent:
+    try:
+        if op == OP_KEYFRAME:
+            width, height, score, special_count, flags = KEYFRAME.unpack_from(payload)
+            offset = KEYFRAME.size
+            cells = bytes(payload[offset:offset + width * height])
+            if len(cells) != width * height:
+                raise StreamError("Truncated keyframe")
+            offset += len(cells)
+            specials = tuple((index, EFFECTS[code]) for index, code in
+                             (SPECIAL.unpack_from(payload, offset + i * SPECIAL.size)
+                              for i in range(special_count)))
+            return StreamEvent(sequence, op, Keyframe(width, height, score, cells, specials,
+                                                      bool(flags & KEYFRAME_RESET)))
+        if op == OP_SWAP:
+            return StreamEvent(sequence, op, SWAP.unpack(payload))
+        if op == OP_CLEAR:
+            count, = COUNT.unpack_from(payload)
+            return StreamEvent(sequence, op, struct.unpack_from(f'<{count}H', payload, COUNT.size))
+        if op == OP_SPECIAL:
+            count, = COUNT.unpack_from(payload)
+            return StreamEvent(sequence, op, tuple(
+                (index, EFFECTS[code]) for index, code in
+                (SPECIAL.unpack_from(payload, COUNT.size + i * SPECIAL.size)
+                 for i in range(count))))
+        if op in (OP_FALL, OP_SPAWN):
+            count, = COUNT.unpack_from(payload)
+            offset = COUNT.size
+            columns = []
+            for _ in range(count):
+                x, n = COLUMN.unpack_from(payload, offset)
+                offset += COLUMN.size
+                size = n * 2 if op == OP_FALL else n
+                values = payload[offset:offset + size]
+                if len(values) != size:
+                    raise StreamError("Truncated column")
+                offset += size
+                if op == OP_FALL:
+                    values = tuple(zip(values[::2], values[1::2]))
+                columns.append((x, tuple(values)))
+            return StreamEvent(sequence, op, tuple(columns))
+        if op == OP_POINTS:
+            return StreamEvent(sequence, op, POINTS.unpack(payload)[0])
+    except (struct.error, KeyError) as e:
+        raise StreamError(f"Invalid {op} frame: {e}") from e
+    raise StreamError(f"Unknown stream op {op}")
+
+
+def events(data: bytes) -> Iterator[StreamEvent]:
+    frames, offset = split_frames(data)
+    if offset != len(data):
+        raise StreamError("Trailing partial frame")
+    for sequence, op, payload in frames:
+        yield decode(sequence, op, payload)
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import marshal
+from typing import Dict, List, Optional, Tuple
+from .config_loader import ConfigLoader
+from .level_store import LevelStore
+from ..models.jewel_type import animation_parameters
+
+CACHE_VERSION = 4
+DEFAULT_CACHE_FILE = ".jewel_quest_config.cache"
+
+
+class ConfigCache:
+    def __init__(self, cache_file: Optional[str] = None):
+        self.cache_file = cache_file
+        self.rebuilt = False
+
+    def load(self, levels_file: str, jewels_file: str) -> Tuple[LevelStore, List[Dict]]:
+        if self.cache_file is None:
+            self.cache_file = os.path.join(os.path.dirname(os.path.abspath(levels_file)),
+                                           DEFAULT_CACHE_FILE)
+        snapshot = self._read_snapshot()
+        sources = {'levels': levels_file, 'jewels': jewels_file}
+        if snapshot is not None:
+            keys = self._validate(snapshot, sources)
+            if keys is not None:
+                if keys != snapshot['sources']:
+                    snapshot['sources'] = keys
+                    self._write_snapshot(snapshot)
+                return LevelStore(levels_file, snapshot['level_index']), snapshot['jewels']
+
+        snapshot = self.build(levels_file, jewels_file)
+        self._write_snapshot(snapshot)
+        self.rebuilt = True
+        return LevelStore(levels_file, snapshot['level_index']), snapshot['jewels']
+
+    def build(self, levels_file: str, jewels_file: str) -> Dict:
+        level_index = LevelStore.build_index(levels_file)
+        jewels = ConfigLoader.load_jewels_config(jewels_file)
+        for jewel in jewels:
+            jewel['animation'] = animation_parameters(jewel['color'])
+        return {
+            'version': CACHE_VERSION,
+            'sources': {
+                'levels': _source_key(levels_file),
+                'jewels': _source_key(jewels_file)
+            },
+            'level_index': level_index,
+            'jewels': jewels
+        }
+
+    def _validate(self, snapshot: Dict, sources: Dict[str, str]) -> Optional[Dict]:
+        if (snapshot.get('version') != CACHE_VERSION
+                or not isinstance(snapshot.get('sources'), dict)
+                or not isinstance(snapshot.get('level_index'), list)
+                or not isinstance(snapshot.get('jewels'), list)):
+            return None
+        keys = {}
+        for name, filename in sources.items():
+            cached = snapshot['sources'].get(name)
+            if not isinstance(cached, dict) or cached.get('path') != os.path.abspath(filename):
+                return None
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                return None
+            if stat.st_mtime_ns == cached.get('mtime_ns') and stat.st_size == cached.get('size'):
+                keys[name] = cached
+                continue
+            key = _source_key(filename)
+            if key['sha1'] != cached.get('sha1'):
+                return None
+            keys[name] = key
+        return keys
+
+    def _read_snapshot(self) -> Optional[Dict]:
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = f.read()
+            snapshot = marshal.loads(data)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return snapshot if isinstance(snapshot, dict) else None
+
+    def _write_snapshot(self, snapshot: Dict):
+        temp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(marshal.dumps(snapshot))
+            os.replace(temp_file, self.cache_file)
+        except OSError as e:
+            print(f"Could not write config cache: {e}")
+
+
+def _source_key(filename: str) -> Dict:
+    with open(filename, 'rb') as f:
+        data = f.read()
+    stat = os.stat(filename)
+    return {
+        'path': os.path.abspath(filename),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha1': hashlib.sha1(data).hexdigest()
+    }
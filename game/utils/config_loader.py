@@ -1,5 +1,11 @@
+import os
 import xml.etree.ElementTree as ET
 from typing import List, Dict
+from ..constants import GRID_SIZE, MIN_BOARD_SIZE, MAX_BOARD_SIZE, UNDO_HISTORY_LENGTH
+
+
+class ConfigError(Exception):
+    pass
 
 
 class ConfigLoader:
@@ -16,24 +22,37 @@ class ConfigLoader:
         try:
             tree = ConfigLoader.load_config(filename)
             root = tree.getroot()
-            levels = []
-            for level in root.findall('level'):
-                level_data = {
-                    'id': int(level.get('id')),
-                    'target_score': int(level.find('target_score').text),
-                    'time_limit': int(level.find('time_limit').text),
-                    'board': []
-                }
-                board_element = level.find('board')
-                if board_element is not None:
-                    for row in board_element.findall('row'):
-                        level_data['board'].append(
-                            [int(cell) for cell in row.text.split()])
-                levels.append(level_data)
-            return levels
-        except Exception as e:
-            
-            return []
+            levels = [ConfigLoader.parse_level(level) for level in root.findall('level')]
+        except (OSError, ET.ParseError, AttributeError, TypeError, ValueError) as e:
+            raise ConfigError(f"Invalid levels config {filename}: {e}") from e
+        if not levels:
+            raise ConfigError(f"Invalid levels config {filename}: no levels defined")
+        return levels
+
+    @staticmethod
+    def parse_level(level: ET.Element) -> Dict:
+        level_data = {
+            'id': int(level.get('id')),
+            'target_score': int(level.find('target_score').text),
+            'time_limit': int(level.find('time_limit').text),
+            'width': int(level.findtext('width', GRID_SIZE)),
+            'height': int(level.findtext('height', GRID_SIZE)),
+            'undo': int(level.findtext('undo', UNDO_HISTORY_LENGTH)),
+            'board': []
+        }
+        for key in ('width', 'height'):
+            if not MIN_BOARD_SIZE <= level_data[key] <= MAX_BOARD_SIZE:
+                raise ValueError(
+                    f"level {level_data['id']} {key} must be between "
+                    f"{MIN_BOARD_SIZE} and {MAX_BOARD_SIZE}")
+        if level_data['undo'] < 0:
+            raise ValueError(f"level {level_data['id']} undo must not be negative")
+        board_element = level.find('board')
+        if board_element is not None:
+            for row in board_element.findall('row'):
+                level_data['board'].append(
+                    [int(cell) for cell in row.text.split()])
+        return level_data
 
     @staticmethod
     def load_jewels_config(filename: str) -> List[Dict]:
@@ -50,10 +69,11 @@ class ConfigLoader:
                     'image': jewel.find('image').text
                 }
                 jewels.append(jewel_data)
-            return jewels
-        except Exception as e:
-            
-            return []
+        except (OSError, ET.ParseError, AttributeError, TypeError, ValueError) as e:
+            raise ConfigError(f"Invalid jewels config {filename}: {e}") from e
+        if not jewels:
+            raise ConfigError(f"Invalid jewels config {filename}: no jewels defined")
+        return jewels
 
     @staticmethod
     def load_high_scores(filename: str) -> List[Dict]:
@@ -84,6 +104,11 @@ class ConfigLoader:
             ET.SubElement(score_elem, 'points').text = str(score['points'])
             ET.SubElement(score_elem, 'level').text = str(score['level'])
             ET.SubElement(score_elem, 'mode').text = score['mode']
-            ET.SubElement(score_elem, 'date').text
+            ET.SubElement(score_elem, 'date').text = score.get('date') or ""
         tree = ET.ElementTree(root)
-        tree.write(filename)
\ No newline at end of file
+        temp_file = f"{filename}.tmp"
+        with open(temp_file, 'wb') as f:
+            tree.write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, filename)
\ No newline at end of file
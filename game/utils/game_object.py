@@ -3,6 +3,8 @@ import pygame
 
 
 class GameObject(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def update(self, dt: float):
         pass
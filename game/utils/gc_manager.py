@@ -0,0 +1,101 @@
+import gc
+import time
+from collections import deque
+from typing import Dict, Tuple
+
+GC_DEFAULT = "default"
+GC_FREEZE = "freeze"
+GC_IDLE = "idle"
+
+HITCH_THRESHOLD = 0.002
+
+
+class GCManager:
+    def __init__(self, mode: str = GC_DEFAULT,
+                 thresholds: Tuple[int, int, int] = (20000, 50, 1000),
+                 busy_limit: int = 200000, history: int = 256):
+        if mode not in (GC_DEFAULT, GC_FREEZE, GC_IDLE):
+            raise ValueError(f"Unknown GC mode: {mode}")
+        self.mode = mode
+        self.thresholds = thresholds
+        self.busy_limit = busy_limit
+        self.original_thresholds = gc.get_threshold()
+        self.pauses = deque(maxlen=history)
+        self.pause_count = 0
+        self.total_pause = 0.0
+        self.max_pause = 0.0
+        self.hitches = 0
+        self.idle_collections = 0
+        self.frozen_objects = 0
+        self._idle_frame = False
+        self._pause_start = 0.0
+        self._installed = mode != GC_DEFAULT
+        if self._installed:
+            gc.callbacks.append(self._on_gc)
+
+    def freeze_startup_heap(self):
+        if self.mode == GC_DEFAULT:
+            return
+        self._idle_frame = True
+        gc.collect()
+        gc.freeze()
+        self.frozen_objects = gc.get_freeze_count()
+        gc.set_threshold(*self.thresholds)
+        if self.mode == GC_IDLE:
+            gc.disable()
+
+    def on_frame(self, idle: bool):
+        self._idle_frame = idle
+        if self.mode != GC_IDLE:
+            return
+        young, middle, old = gc.get_count()
+        if idle:
+            if old >= self.thresholds[2]:
+                gc.collect(2)
+                self.idle_collections += 1
+            elif young >= self.thresholds[0] or middle >= self.thresholds[1]:
+                gc.collect(1)
+                self.idle_collections += 1
+        elif young >= self.busy_limit:
+            gc.collect(0)
+
+    def restore(self):
+        if self._installed:
+            gc.callbacks.remove(self._on_gc)
+            self._installed = False
+        if self.mode == GC_DEFAULT:
+            return
+        gc.enable()
+        gc.unfreeze()
+        gc.set_threshold(*self.original_thresholds)
+
+    def _on_gc(self, phase: str, info: Dict):
+        if phase == "start":
+            self._pause_start = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._pause_start
+        self.pause_count += 1
+        self.total_pause += pause
+        self.max_pause = max(self.max_pause, pause)
+        if pause >= HITCH_THRESHOLD and not self._idle_frame:
+            self.hitches += 1
+        self.pauses.append((info.get('generation'), pause, self._idle_frame))
+
+    def report(self) -> Dict:
+        recent = sorted(pause for _, pause, _ in self.pauses)
+        return {
+            'mode': self.mode,
+            'frozen_objects': self.frozen_objects,
+            'collections': self.pause_count,
+            'idle_collections': self.idle_collections,
+            'total_pause_ms': self.total_pause * 1000,
+            'max_pause_ms': self.max_pause * 1000,
+            'p99_pause_ms': _percentile(recent, 0.99) * 1000,
+            'hitches': self.hitches
+        }
+
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
@@ -0,0 +1,106 @@
+import xml.etree.ElementTree as ET
+import xml.parsers.expat
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from .config_loader import ConfigError, ConfigLoader
+
+CHUNK_SIZE = 64 * 1024
+
+
+class LevelStore:
+    def __init__(self, filename: str, index: Optional[List[Tuple[int, int, int]]] = None,
+                 cache_size: int = 16):
+        self.filename = filename
+        self.index = index if index is not None else LevelStore.build_index(filename)
+        self.positions = {level_id: position
+                          for position, (level_id, _, _) in enumerate(self.index)}
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[int, Dict]' = OrderedDict()
+
+    @staticmethod
+    def build_index(filename: str) -> List[Tuple[int, int, int]]:
+        parser = xml.parsers.expat.ParserCreate()
+        index = []
+        depth = 0
+        current = None
+        builder = None
+
+        def start_element(name, attrs):
+            nonlocal depth, current, builder
+            depth += 1
+            if depth == 2 and name == 'level':
+                current = (int(attrs['id']), parser.CurrentByteIndex)
+                builder = ET.TreeBuilder()
+            if builder is not None:
+                builder.start(name, attrs)
+
+        def end_element(name):
+            nonlocal depth, current, builder
+            if builder is not None:
+                builder.end(name)
+            if depth == 2 and name == 'level':
+                level_id, start = current
+                try:
+                    ConfigLoader.parse_level(builder.close())
+                except (AttributeError, TypeError, ValueError) as e:
+                    if str(e).startswith(f"level {level_id} "):
+                        raise
+                    raise ValueError(f"level {level_id}: {e}") from e
+                index.append((level_id, start, parser.CurrentByteIndex))
+                current = None
+                builder = None
+            depth -= 1
+
+        def character_data(data):
+            if builder is not None:
+                builder.data(data)
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = character_data
+        try:
+            with open(filename, 'rb') as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    parser.Parse(chunk, not chunk)
+                    if not chunk:
+                        break
+        except (OSError, xml.parsers.expat.ExpatError, KeyError, ValueError) as e:
+            raise ConfigError(f"Invalid levels config {filename}: {e}") from e
+        if not index:
+            raise ConfigError(f"Invalid levels config {filename}: no levels defined")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, position: int) -> Dict:
+        if position < 0:
+            position += len(self.index)
+        if not 0 <= position < len(self.index):
+            raise IndexError(f"Level position out of range: {position}")
+        level = self.cache.get(position)
+        if level is not None:
+            self.cache.move_to_end(position)
+            return level
+        level = self._load(position)
+        self.cache[position] = level
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return level
+
+    def get_by_id(self, level_id: int) -> Dict:
+        return self[self.positions[level_id]]
+
+    def _load(self, position: int) -> Dict:
+        _, start, end = self.index[position]
+        try:
+            with open(self.filename, 'rb') as f:
+                f.seek(start)
+                data = f.read(end - start)
+            if end > start:
+                data += b'</level>'
+            return ConfigLoader.parse_level(ET.fromstring(data))
+        except (OSError, ET.ParseError, AttributeError, TypeError, ValueError) as e:
+            raise ConfigError(
+                f"Invalid level at position {position} in {self.filename}: {e}") from e
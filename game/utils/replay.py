@@ -0,0 +1,86 @@
+import os
+import struct
+import time
+from typing import List, NamedTuple, Optional
+from ..constants import TIME_ATTACK, SCORE_CHALLENGE, CASUAL
+
+REPLAY_DIR = "replays"
+REPLAY_MAGIC = b'JQR'
+REPLAY_VERSION = 2
+HEADER = struct.Struct('<3sBBHQIIIII')
+SWAP = struct.Struct('<IBBBB')
+MODE_CODES = {TIME_ATTACK: 0, SCORE_CHALLENGE: 1, CASUAL: 2}
+MODES = {code: mode for mode, code in MODE_CODES.items()}
+
+
+class ReplayError(Exception):
+    pass
+
+
+class Swap(NamedTuple):
+    time_ms: int
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+
+
+class Replay:
+    def __init__(self, seed: int, level: int, mode: str, swaps: Optional[List[Swap]] = None,
+                 duration_ms: int = 0, score: int = 0, board_hash: int = 0, steps: int = 0):
+        self.seed = seed
+        self.level = level
+        self.mode = mode
+        self.swaps = swaps or []
+        self.duration_ms = duration_ms
+        self.score = score
+        self.board_hash = board_hash
+        self.steps = steps
+
+    def record_swap(self, elapsed: float, x1: int, y1: int, x2: int, y2: int):
+        self.swaps.append(Swap(int(elapsed * 1000), x1, y1, x2, y2))
+
+    def finish(self, elapsed: float, score: int, board_hash: int, steps: int):
+        self.duration_ms = int(elapsed * 1000)
+        self.score = score
+        self.board_hash = board_hash
+        self.steps = steps
+
+    def to_bytes(self) -> bytes:
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, MODE_CODES[self.mode], self.level,
+                             self.seed, self.duration_ms, self.score, self.board_hash,
+                             self.steps, len(self.swaps))
+        return header + b''.join(SWAP.pack(*swap) for swap in self.swaps)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'Replay':
+        try:
+            (magic, version, mode, level, seed, duration_ms, score, board_hash,
+             steps, count) = HEADER.unpack_from(data)
+            if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+                raise ReplayError(f"Unsupported replay format {magic!r} v{version}")
+            swaps = [Swap(*SWAP.unpack_from(data, HEADER.size + i * SWAP.size))
+                     for i in range(count)]
+            return Replay(seed, level, MODES[mode], swaps, duration_ms, score, board_hash, steps)
+        except (struct.error, KeyError) as e:
+            raise ReplayError(f"Invalid replay: {e}") from e
+
+    def save(self, filename: Optional[str] = None) -> str:
+        if filename is None:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            filename = os.path.join(
+                REPLAY_DIR,
+                f"{time.strftime('%Y%m%d-%H%M%S')}_{self.mode}_{self.level}_{self.seed:x}.jqr")
+        temp_file = f"{filename}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(self.to_bytes())
+        os.replace(temp_file, filename)
+        return filename
+
+    @staticmethod
+    def load(filename: str) -> 'Replay':
+        try:
+            with open(filename, 'rb') as f:
+                return Replay.from_bytes(f.read())
+        except OSError as e:
+            raise ReplayError(f"Could not read replay {filename}: {e}") from e
@@ -0,0 +1,184 @@
+import heapq
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from .config_loader import ConfigLoader
+from .score_writer import ScoreWriter
+from ..constants import TIME_ATTACK, MODE_NAMES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scores_points ON scores (points DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_mode ON scores (mode, points DESC);
+CREATE INDEX IF NOT EXISTS idx_scores_mode_level ON scores (mode, level, points DESC);
+"""
+
+
+class ScoreStore:
+    def __init__(self, filename: str = "high_scores.db",
+                 legacy_file: Optional[str] = "high_scores.xml", top_k: int = 10):
+        self.filename = filename
+        self.top_k = top_k
+        is_new = not os.path.exists(filename)
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        if is_new and legacy_file and os.path.exists(legacy_file):
+            self.import_xml(legacy_file)
+        self.pending: List[Dict] = []
+        self.pending_lock = threading.Lock()
+        self.visible_id = self.connection.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM scores").fetchone()[0]
+        self.writer = ScoreWriter(filename, legacy_file, top_k, on_written=self._on_written)
+        self.top: Dict[str, List[int]] = {mode: [] for mode in MODE_NAMES}
+        for mode, heap in self.top.items():
+            heap.extend(row[0] for row in self.connection.execute(
+                "SELECT points FROM scores WHERE mode = ? ORDER BY points DESC LIMIT ?",
+                (mode, top_k)))
+            heapq.heapify(heap)
+
+    def is_high_score(self, mode: str, points: int) -> bool:
+        heap = self.top.get(mode)
+        if heap is None or points <= 0:
+            return False
+        return len(heap) < self.top_k or points > heap[0]
+
+    def add(self, name: str, points: int, level: int, mode: str,
+            date: Optional[str] = None):
+        record = {
+            'name': name,
+            'points': points,
+            'level': level,
+            'mode': mode,
+            'date': date or time.strftime("%Y-%m-%d")
+        }
+        with self.pending_lock:
+            self.pending.append(record)
+            if not self.writer.submit(record):
+                self.pending.remove(record)
+                return
+        self._push_top(mode, points)
+
+    def top_scores(self, mode: Optional[str] = None, level: Optional[int] = None,
+                   limit: int = 10, offset: int = 0) -> List[Dict]:
+        with self.pending_lock:
+            return self._top_scores(mode, level, limit, offset)
+
+    def _top_scores(self, mode: Optional[str], level: Optional[int],
+                    limit: int, offset: int) -> List[Dict]:
+        where, params = self._filter(mode, level)
+        pending = self._pending(mode, level)
+        if pending:
+            params += [offset + limit, 0]
+        else:
+            params += [limit, offset]
+        rows = self.connection.execute(
+            f"SELECT name, points, level, mode, date FROM scores{where} "
+            "ORDER BY points DESC, id LIMIT ? OFFSET ?", params)
+        records = [{
+            'name': name,
+            'points': points,
+            'level': level,
+            'mode': mode,
+            'date': date
+        } for name, points, level, mode, date in rows]
+        if pending:
+            records = sorted(records + pending, key=lambda x: x['points'], reverse=True)
+            records = records[offset:]
+        records = records[:limit]
+        for record in records:
+            record['mode_name'] = MODE_NAMES.get(record['mode'], record['mode'])
+        return records
+
+    def count(self, mode: Optional[str] = None, level: Optional[int] = None) -> int:
+        with self.pending_lock:
+            where, params = self._filter(mode, level)
+            return self.connection.execute(
+                f"SELECT COUNT(*) FROM scores{where}", params).fetchone()[0] + len(
+                self._pending(mode, level))
+
+    def levels(self, mode: Optional[str] = None) -> List[int]:
+        with self.pending_lock:
+            where, params = self._filter(mode, None)
+            levels = {row[0] for row in self.connection.execute(
+                f"SELECT DISTINCT level FROM scores{where}", params)}
+            levels.update(record['level'] for record in self._pending(mode, None))
+        return sorted(levels)
+
+    def import_xml(self, filename: str) -> int:
+        records = ConfigLoader.load_high_scores(filename)
+        with self.connection:
+            for record in records:
+                self._insert({
+                    'name': record['name'] or "",
+                    'points': int(record['points']),
+                    'level': _parse_level(record['level']),
+                    'mode': _parse_mode(record['mode']),
+                    'date': record['date']
+                })
+        return len(records)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+        self.connection.close()
+
+    def _pending(self, mode: Optional[str], level: Optional[int]) -> List[Dict]:
+        return [dict(record) for record in self.pending
+                if (mode is None or record['mode'] == mode)
+                and (level is None or record['level'] == level)]
+
+    def _on_written(self, records: List[Dict], last_id: int):
+        with self.pending_lock:
+            for record in records:
+                self.pending.remove(record)
+            self.visible_id = last_id
+
+    def _insert(self, record: Dict):
+        self.connection.execute(
+            "INSERT INTO scores (name, points, level, mode, date) VALUES (?, ?, ?, ?, ?)",
+            (record['name'], record['points'], record['level'],
+             record['mode'], record['date']))
+
+    def _push_top(self, mode: str, points: int):
+        heap = self.top.setdefault(mode, [])
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, points)
+        elif points > heap[0]:
+            heapq.heapreplace(heap, points)
+
+    def _filter(self, mode: Optional[str], level: Optional[int]):
+        clauses = ["id <= ?"]
+        params = [self.visible_id]
+        if mode is not None:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if level is not None:
+            clauses.append("level = ?")
+            params.append(level)
+        where = f" WHERE {' AND '.join(clauses)}"
+        return where, params
+
+
+def _parse_level(value) -> int:
+    match = re.search(r'\d+', str(value or ""))
+    return int(match.group()) if match else 0
+
+
+def _parse_mode(value: Optional[str]) -> str:
+    for mode, name in MODE_NAMES.items():
+        if value in (mode, name):
+            return mode
+    return TIME_ATTACK
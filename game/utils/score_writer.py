@@ -0,0 +1,86 @@
+import queue
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional
+from .config_loader import ConfigLoader
+from ..constants import MODE_NAMES
+
+_STOP = object()
+
+
+class ScoreWriter:
+    def __init__(self, filename: str, export_file: Optional[str] = None,
+                 export_limit: int = 10, max_pending: int = 256,
+                 on_written: Optional[Callable[[List[Dict], int], None]] = None):
+        self.filename = filename
+        self.export_file = export_file
+        self.export_limit = export_limit
+        self.on_written = on_written
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.batches = 0
+        self.error: Optional[Exception] = None
+        self.thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, record: Dict) -> bool:
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self):
+        connection = sqlite3.connect(self.filename)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while True:
+                batch = [self.queue.get()]
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = _STOP in batch
+                records = [record for record in batch if record is not _STOP]
+                if records:
+                    self._write(connection, records)
+                for _ in batch:
+                    self.queue.task_done()
+                if stop:
+                    break
+        finally:
+            connection.close()
+
+    def _write(self, connection: sqlite3.Connection, records: List[Dict]):
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO scores (name, points, level, mode, date) "
+                    "VALUES (:name, :points, :level, :mode, :date)", records)
+            if self.on_written:
+                last_id = connection.execute("SELECT MAX(id) FROM scores").fetchone()[0]
+                self.on_written(records, last_id)
+            if self.export_file:
+                rows = connection.execute(
+                    "SELECT name, points, level, mode, date FROM scores "
+                    "ORDER BY points DESC, id LIMIT ?", (self.export_limit,))
+                ConfigLoader.save_high_scores(self.export_file, [{
+                    'name': name,
+                    'points': points,
+                    'level': f"Level: {level}",
+                    'mode': MODE_NAMES.get(mode, mode),
+                    'date': date
+                } for name, points, level, mode, date in rows])
+            self.batches += 1
+        except (sqlite3.Error, OSError) as e:
+            self.error = e
+            print(f"Could not save high scores: {e}")
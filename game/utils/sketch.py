@@ -0,0 +1,87 @@
+import math
+from typing import Dict, Iterable, Sequence
+
+RELATIVE_ACCURACY = 0.01
+MAX_BINS = 2048
+MIN_VALUE = 1e-9
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, max_bins: int = MAX_BINS):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"Relative accuracy must be in (0, 1): {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1):
+        if value < 0:
+            raise ValueError(f"Sketch values must not be negative: {value}")
+        if value < MIN_VALUE:
+            self.zeros += weight
+        else:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += weight
+        self.total += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'QuantileSketch'):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        bins = self.bins
+        for index, weight in other.bins.items():
+            bins[index] = bins.get(index, 0) + weight
+        if len(bins) > self.max_bins:
+            self._collapse()
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _collapse(self):
+        indices = sorted(self.bins)
+        excess = indices[:len(indices) - self.max_bins + 1]
+        target = excess[-1]
+        self.bins[target] += sum(self.bins.pop(index) for index in excess[:-1])
+
+    def quantile(self, fraction: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = fraction * (self.count - 1)
+        seen = self.zeros
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantiles(self, fractions: Iterable[float]) -> Dict[str, float]:
+        return {f"p{round(fraction * 100):02d}": round(self.quantile(fraction), 3)
+                for fraction in fractions}
+
+    def summary(self, fractions: Sequence[float]) -> Dict:
+        if not self.count:
+            return {'count': 0}
+        result = {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3),
+            'min': round(self.min, 3),
+            'max': round(self.max, 3)
+        }
+        result.update(self.quantiles(fractions))
+        return result
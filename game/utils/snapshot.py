@@ -0,0 +1,90 @@
+import os
+import struct
+from typing import NamedTuple, Tuple
+from ..constants import EFFECT_LINE, EFFECT_BOMB, EFFECT_COLOR, EFFECT_ROW, EFFECT_COLUMN
+from .replay import MODE_CODES, MODES
+
+SAVE_FILE = "savegame.jqs"
+SNAPSHOT_MAGIC = b'JQS'
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct('<3sBBHBBIIQIIHB')
+SPECIAL = struct.Struct('<HB')
+EFFECT_CODES = {EFFECT_LINE: 1, EFFECT_BOMB: 2, EFFECT_COLOR: 3, EFFECT_ROW: 4, EFFECT_COLUMN: 5}
+EFFECTS = {code: effect for effect, code in EFFECT_CODES.items()}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class BoardSnapshot(NamedTuple):
+    width: int
+    height: int
+    cells: bytes
+    specials: Tuple[Tuple[int, str], ...]
+    seed: int
+    resolve_count: int
+    move_count: int
+
+    def type_at(self, x: int, y: int) -> int:
+        return self.cells[y * self.width + x] - 1
+
+
+class SessionSnapshot(NamedTuple):
+    mode: str
+    level: int
+    score: int
+    elapsed: float
+    collected: Tuple[int, ...]
+    board: BoardSnapshot
+
+    def to_bytes(self) -> bytes:
+        board = self.board
+        header = HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, MODE_CODES[self.mode], self.level,
+                             board.width, board.height, self.score, int(self.elapsed * 1000),
+                             board.seed, board.resolve_count, board.move_count,
+                             len(board.specials), len(self.collected))
+        specials = b''.join(SPECIAL.pack(index, EFFECT_CODES[effect])
+                            for index, effect in board.specials)
+        collected = struct.pack(f'<{len(self.collected)}I', *self.collected)
+        return header + board.cells + specials + collected
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'SessionSnapshot':
+        try:
+            (magic, version, mode, level, width, height, score, elapsed_ms, seed,
+             resolve_count, move_count, special_count, type_count) = HEADER.unpack_from(data)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"Unsupported snapshot format {magic!r} v{version}")
+            offset = HEADER.size
+            cells = bytes(data[offset:offset + width * height])
+            if len(cells) != width * height:
+                raise SnapshotError("Truncated snapshot")
+            offset += len(cells)
+            specials = []
+            for _ in range(special_count):
+                index, code = SPECIAL.unpack_from(data, offset)
+                specials.append((index, EFFECTS[code]))
+                offset += SPECIAL.size
+            collected = struct.unpack_from(f'<{type_count}I', data, offset)
+            board = BoardSnapshot(width, height, cells, tuple(specials), seed,
+                                  resolve_count, move_count)
+            return SessionSnapshot(MODES[mode], level, score, elapsed_ms / 1000, collected, board)
+        except (struct.error, KeyError) as e:
+            raise SnapshotError(f"Invalid snapshot: {e}") from e
+
+    def save(self, filename: str = SAVE_FILE):
+        temp_file = f"{filename}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(self.to_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, filename)
+
+    @staticmethod
+    def load(filename: str = SAVE_FILE) -> 'SessionSnapshot':
+        try:
+            with open(filename, 'rb') as f:
+                return SessionSnapshot.from_bytes(f.read())
+        except OSError as e:
+            raise SnapshotError(f"Could not read snapshot {filename}: {e}") from e
@@ -0,0 +1,262 @@
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, TextIO
+
+from ..models.event_bus import (SWAP, CASCADE_END, RESHUFFLE, LEVEL_COMPLETE, EventBus)
+
+TELEMETRY_VERSION = 1
+TELEMETRY_PREFIX = "telemetry-"
+TELEMETRY_SUFFIX = ".jsonl"
+MAX_FILE_BYTES = 4 * 1024 * 1024
+MAX_FILES = 32
+MAX_PENDING = 4096
+FRAME_WINDOW = 600
+FRAME_BUCKET_MS = 0.5
+
+OUTCOME_COMPLETE = "complete"
+OUTCOME_FAILED = "failed"
+OUTCOME_ABANDONED = "abandoned"
+
+_STOP = object()
+
+
+class TelemetryWriter:
+    def __init__(self, directory: str, max_bytes: int = MAX_FILE_BYTES,
+                 max_files: int = MAX_FILES, max_pending: int = MAX_PENDING):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.name = f"{TELEMETRY_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.written = 0
+        self.files = 0
+        self.error: Optional[Exception] = None
+        self.file: Optional[TextIO] = None
+        self.size = 0
+        self.thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, record: Dict) -> bool:
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self):
+        try:
+            while True:
+                batch = [self.queue.get()]
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = _STOP in batch
+                records = [record for record in batch if record is not _STOP]
+                if records:
+                    self._write(records)
+                for _ in batch:
+                    self.queue.task_done()
+                if stop:
+                    break
+        finally:
+            if self.file:
+                self.file.close()
+
+    def _write(self, records: List[Dict]):
+        try:
+            lines = [json.dumps(record, separators=(',', ':')) + '\n' for record in records]
+            for line in lines:
+                if self.file is None or self.size + len(line) > self.max_bytes:
+                    self._rotate()
+                self.file.write(line)
+                self.size += len(line)
+            self.file.flush()
+            self.written += len(records)
+        except (OSError, TypeError, ValueError) as e:
+            if self.error is None:
+                print(f"Could not write telemetry: {e}")
+            self.error = e
+
+    def _rotate(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+        os.makedirs(self.directory, exist_ok=True)
+        self.files += 1
+        path = os.path.join(self.directory, f"{self.name}-{self.files:04d}{TELEMETRY_SUFFIX}")
+        self.file = open(path, 'w', encoding='utf-8')
+        self.size = 0
+        self._prune()
+
+    def _prune(self):
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(TELEMETRY_PREFIX) and name.endswith(TELEMETRY_SUFFIX))
+        for name in names[:max(0, len(names) - self.max_files)]:
+            os.remove(os.path.join(self.directory, name))
+
+
+class FrameWindow:
+    def __init__(self, bucket_ms: float = FRAME_BUCKET_MS):
+        self.bucket_ms = bucket_ms
+        self.reset()
+
+    def reset(self):
+        self.histogram: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, frame_time: float):
+        ms = frame_time * 1000
+        bucket = int(ms / self.bucket_ms)
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, fraction: float) -> float:
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= rank:
+                return (bucket + 1) * self.bucket_ms
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'frames': self.count,
+            'mean_ms': round(self.total / self.count, 3),
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max, 3),
+            'bucket_ms': self.bucket_ms,
+            'histogram': sorted(self.histogram.items())
+        }
+
+
+class Telemetry:
+    def __init__(self, writer: TelemetryWriter, source: Optional[str] = None,
+                 frame_window: int = FRAME_WINDOW):
+        self.writer = writer
+        self.source = source or socket.gethostname()
+        self.frame_window = frame_window
+        self.frames = FrameWindow()
+        self.session: Optional[str] = None
+        self.mode = ""
+        self.level = 0
+        self.events: Optional[EventBus] = None
+        self.score = 0
+        self.moves = 0
+        self.reshuffles = 0
+        self.dropped = 0
+        self.started = 0.0
+        self.ready_time = 0.0
+        self.swap_time = 0.0
+        self.swap: Optional[List[int]] = None
+
+    def record(self, kind: str, **fields):
+        fields['type'] = kind
+        fields['ts'] = round(time.time(), 3)
+        fields['source'] = self.source
+        if self.session:
+            fields['session'] = self.session
+            fields['mode'] = self.mode
+            fields['level'] = self.level
+        self.writer.submit(fields)
+
+    def start_session(self, events: EventBus, mode: str, level: int, seed: int,
+                      width: int, height: int, score: int = 0, resumed: bool = False):
+        self.end_session(OUTCOME_ABANDONED)
+        self.session = uuid.uuid4().hex[:16]
+        self.mode = mode
+        self.level = level
+        self.score = score
+        self.moves = 0
+        self.reshuffles = 0
+        self.dropped = self.writer.dropped
+        self.started = self.ready_time = time.perf_counter()
+        self.swap = None
+        self.events = events
+        events.subscribe(SWAP, self.on_swap)
+        events.subscribe(CASCADE_END, self.on_cascade_end)
+        events.subscribe(RESHUFFLE, self.on_reshuffle)
+        events.subscribe(LEVEL_COMPLETE, self.on_level_complete)
+        self.record('session_start', v=TELEMETRY_VERSION, seed=seed,
+                    width=width, height=height, score=score, resumed=resumed)
+
+    def end_session(self, outcome: str, score: Optional[int] = None,
+                    elapsed: Optional[float] = None):
+        if self.session is None:
+            return
+        if elapsed is None:
+            elapsed = time.perf_counter() - self.started
+        self.flush_frames()
+        self.record('session_end', outcome=outcome,
+                    score=self.score if score is None else score, elapsed=round(elapsed, 3),
+                    moves=self.moves, reshuffles=self.reshuffles,
+                    dropped=self.writer.dropped - self.dropped)
+        events = self.events
+        events.unsubscribe(SWAP, self.on_swap)
+        events.unsubscribe(CASCADE_END, self.on_cascade_end)
+        events.unsubscribe(RESHUFFLE, self.on_reshuffle)
+        events.unsubscribe(LEVEL_COMPLETE, self.on_level_complete)
+        self.events = None
+        self.session = None
+
+    def on_swap(self, event):
+        self.swap_time = time.perf_counter()
+        self.swap = [event.x1, event.y1, event.x2, event.y2]
+
+    def on_cascade_end(self, event):
+        now = time.perf_counter()
+        self.moves += 1
+        self.score += event.points
+        self.record('move', move=event.move, cells=self.swap, depth=event.waves,
+                    points=event.points,
+                    think_ms=round((self.swap_time - self.ready_time) * 1000, 1),
+                    resolve_ms=round((now - self.swap_time) * 1000, 1))
+        self.ready_time = now
+        self.swap = None
+
+    def on_reshuffle(self, event):
+        self.reshuffles += 1
+        self.record('reshuffle', refilled=event.refilled)
+
+    def on_level_complete(self, event):
+        self.end_session(OUTCOME_COMPLETE if event.success else OUTCOME_FAILED,
+                         event.score, event.elapsed)
+
+    def frame(self, frame_time: float):
+        frames = self.frames
+        frames.add(frame_time)
+        if frames.count >= self.frame_window:
+            self.flush_frames()
+
+    def flush_frames(self):
+        if self.frames.count:
+            self.record('frames', **self.frames.summary())
+            self.frames.reset()
+
+    def close(self):
+        self.end_session(OUTCOME_ABANDONED)
+        self.flush_frames()
+        self.writer.close()
@@ -0,0 +1,47 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+from game.headless import HeadlessGame
+
+LEVELS_XML = """<levels>
+  <level id="1"><target_score>99999</target_score><time_limit>600</time_limit></level>
+  <level id="2"><target_score>99999</target_score><time_limit>600</time_limit><width>10</width><height>10</height><undo>30</undo></level>
+  <level id="3"><target_score>99999</target_score><time_limit>600</time_limit><width>32</width><height>32</height></level>
+</levels>
+"""
+JEWELS_XML = """<jewels>
+  <jewel id="0"><color>Red</color><points>10</points><image>assets/jewels/red.png</image></jewel>
+  <jewel id="1"><color>Blue</color><points>15</points><image>assets/jewels/blue.png</image></jewel>
+  <jewel id="2"><color>Green</color><points>20</points><effect>line</effect><image>assets/jewels/green.png</image></jewel>
+  <jewel id="3"><color>Yellow</color><points>25</points><image>assets/jewels/yellow.png</image></jewel>
+  <jewel id="4"><color>Purple</color><points>30</points><effect>bomb</effect><image>assets/jewels/purple.png</image></jewel>
+</jewels>
+"""
+
+
+def write_config(path):
+    levels = path / "levels.xml"
+    jewels = path / "jewels.xml"
+    levels.write_text(LEVELS_XML)
+    jewels.write_text(JEWELS_XML)
+    return str(levels), str(jewels)
+
+
+@pytest.fixture
+def config_files(tmp_path):
+    return write_config(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def game(tmp_path_factory):
+    path = tmp_path_factory.mktemp("config")
+    levels, jewels = write_config(path)
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield HeadlessGame(levels, jewels, display=False)
+    finally:
+        os.chdir(cwd)
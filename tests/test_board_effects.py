@@ -0,0 +1,84 @@
+import asyncio
+
+from game.constants import (EFFECT_BOMB, EFFECT_COLOR, EFFECT_COLUMN, EFFECT_ROW,
+                            SCORE_CHALLENGE)
+from game.load_client import find_moves
+from game.models.board import Board
+from game.models.event_bus import CASCADE_WAVE
+from game.server import GameSession
+from game.utils.snapshot import BoardSnapshot
+
+SIZE = 6
+MAX_WAVES = 20
+MAX_CLEARED = 32 * 32
+
+
+def make_board(game, cells=None, specials=()):
+    board = Board(SIZE, SIZE, game.jewel_factory, game.audio, seed=0, fill=False,
+                  history_length=0)
+    types = [(x + 2 * y) % 5 for y in range(SIZE) for x in range(SIZE)]
+    for (x, y), jewel_type in (cells or {}).items():
+        types[y * SIZE + x] = jewel_type
+    specials = tuple((y * SIZE + x, effect) for (x, y), effect in specials)
+    board.restore(BoardSnapshot(SIZE, SIZE, bytes(t + 1 for t in types), specials, 0, 0, 0))
+    return board
+
+
+def test_line_special_follows_match_orientation(game):
+    for cells, swap, effect in (({(x, 2): 0 for x in range(4)}, (1, 2), EFFECT_ROW),
+                                ({(2, y): 0 for y in range(1, 5)}, (2, 3), EFFECT_COLUMN)):
+        board = make_board(game, cells)
+        board.game_rules.last_swap = [swap]
+        board.remove_matches(board.find_matches())
+        assert board.game_rules.last_specials == {swap: effect}
+        assert board.get_jewel_at(*swap).special == effect
+
+
+def test_cascades_create_no_specials(game):
+    board = make_board(game, {(x, 2): 0 for x in range(4)})
+    board.remove_matches(board.find_matches())
+    assert board.game_rules.last_specials == {}
+
+
+def test_effect_chain_expands_once(game):
+    board = make_board(game, specials=(((0, 2), EFFECT_ROW), ((4, 2), EFFECT_COLUMN),
+                                       ((4, 5), EFFECT_BOMB)))
+    cleared = board.game_rules.expand_effects({(0, 2)})
+    expected = ({(x, 2) for x in range(SIZE)} | {(4, y) for y in range(SIZE)} |
+                {(x, y) for x in range(3, 6) for y in range(4, 6)})
+    assert cleared == expected
+
+
+def test_matched_special_clears_its_chain(game):
+    board = make_board(game, {(x, 2): 0 for x in range(3)},
+                       specials=(((1, 2), EFFECT_ROW), ((4, 2), EFFECT_COLUMN)))
+    _, collected = board.remove_matches(board.find_matches())
+    expected = {(x, 2) for x in range(SIZE)} | {(4, y) for y in range(SIZE)}
+    assert sum(collected.values()) == len(expected)
+    assert {(x, y) for y in range(SIZE) for x in range(SIZE)
+            if board.get_jewel_at(x, y) is None} == expected
+    assert board.game_rules.last_specials == {}
+
+
+def test_color_special_clears_its_type(game):
+    board = make_board(game, specials=(((1, 1), EFFECT_COLOR),))
+    jewel_type = board.get_jewel_at(1, 1).type
+    cleared = board.game_rules.expand_effects({(1, 1)})
+    assert cleared == {(x, y) for y in range(SIZE) for x in range(SIZE)
+                       if board.get_jewel_at(x, y).type == jewel_type}
+
+
+def test_large_board_cascades_stay_bounded(game):
+    session = GameSession(1, game, SCORE_CHALLENGE, 3, 6, 0.0)
+    session.level_manager.target_score = float('inf')
+    board = session.board
+    cleared = []
+    board.events.subscribe(CASCADE_WAVE,
+                           lambda event: cleared.append(sum(event.collected.values())))
+    for _ in range(20):
+        cleared.clear()
+        moves = find_moves(board.type_bytes(), board.width, board.height)
+        result = asyncio.run(session.swap(*moves[len(moves) // 2]))
+        assert result['valid']
+        assert result['cascades'] <= MAX_WAVES
+        assert sum(cleared) <= MAX_CLEARED
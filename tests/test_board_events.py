@@ -0,0 +1,29 @@
+from game.constants import FIXED_DT, SCORE_CHALLENGE
+from game.load_client import find_moves
+from game.models.event_bus import CASCADE_END, CASCADE_WAVE, LEVEL_COMPLETE, SWAP
+from game.states.playing_state import PlayingState
+
+MAX_FRAMES = 20000
+TARGET_SCORE = 300
+
+
+def test_every_move_ends_before_the_level_completes(game):
+    playing = PlayingState(game, SCORE_CHALLENGE, 1, seed=3, record=False)
+    playing.level_manager.target_score = TARGET_SCORE
+    board = playing.board
+    published = []
+    for name in (SWAP, CASCADE_WAVE, CASCADE_END, LEVEL_COMPLETE):
+        board.events.subscribe(name, lambda event, name=name: published.append((name, event)))
+    for _ in range(MAX_FRAMES):
+        if playing.finished:
+            break
+        if board.settled:
+            board.swap_jewels(*find_moves(board.type_bytes(), board.width, board.height)[0])
+        playing.update(FIXED_DT)
+    assert playing.level_complete
+    names = [name for name, _ in published]
+    assert names[-2:] == [CASCADE_END, LEVEL_COMPLETE]
+    assert names.count(SWAP) == names.count(CASCADE_END) == board.move_count
+    ends = [event for name, event in published if name == CASCADE_END]
+    assert sum(event.points for event in ends) == playing.score
+    assert board.cascade_waves == 0
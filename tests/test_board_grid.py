@@ -0,0 +1,54 @@
+from game.models.animation import InstantAnimationSystem
+from game.models.board import Board
+from game.utils.snapshot import BoardSnapshot
+
+SIZE = 6
+
+
+def make_board(game):
+    board = Board(SIZE, SIZE, game.jewel_factory, game.audio, seed=5, fill=False,
+                  history_length=0, animator=InstantAnimationSystem())
+    types = [(x + 2 * y) % 4 for y in range(SIZE) for x in range(SIZE)]
+    board.restore(BoardSnapshot(SIZE, SIZE, bytes(t + 1 for t in types), (), 5, 0, 0))
+    return board
+
+
+def column_types(board, x):
+    return [jewel.type if jewel else None for jewel in
+            (board.grid_manager.grid[y][x] for y in range(SIZE))]
+
+
+def test_collapse_only_moves_dirty_columns(game):
+    board = make_board(game)
+    grid_manager = board.grid_manager
+    grid = grid_manager.grid
+    before = [row[:] for row in grid]
+    above = column_types(board, 1)[:3]
+    grid_manager.clear_cell(1, 3)
+    grid_manager.clear_cell(1, 4)
+    grid_manager.clear_cell(4, 0)
+    assert grid_manager.dirty_columns == {1, 4}
+    falls = grid_manager.collapse_columns()
+    assert falls == {1: [(2, 4), (1, 3), (0, 2)]}
+    assert column_types(board, 1) == [None, None] + above + [before[5][1].type]
+    assert grid[0][4] is None
+    for x in (0, 2, 3, 5):
+        assert [grid[y][x] for y in range(SIZE)] == [before[y][x] for y in range(SIZE)]
+
+
+def test_refill_fills_dirty_columns_and_resets_them(game):
+    board = make_board(game)
+    grid_manager = board.grid_manager
+    for y in (2, 3, 4):
+        grid_manager.clear_cell(2, y)
+    grid_manager.collapse_columns()
+    revision = grid_manager.revision
+    spawns = grid_manager.refill_board()
+    assert list(spawns) == [2]
+    assert len(spawns[2]) == 3
+    assert column_types(board, 2)[:3] == spawns[2]
+    assert all(jewel for row in grid_manager.grid for jewel in row)
+    assert not grid_manager.dirty_columns
+    assert grid_manager.revision > revision
+    assert grid_manager.collapse_columns() == {}
+    assert grid_manager.refill_board() == {}
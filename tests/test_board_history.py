@@ -0,0 +1,102 @@
+import pygame
+from game.constants import CASUAL, FIXED_DT, TIME_ATTACK
+from game.load_client import find_moves
+from game.models.board_history import BoardHistory, BoardState
+from game.states.playing_state import PlayingState
+
+MAX_FRAMES = 3000
+
+
+def state(columns, move_count=0):
+    return BoardState(columns, (), 1, 0, move_count)
+
+
+def settle(playing):
+    for _ in range(MAX_FRAMES):
+        playing.update(FIXED_DT)
+        if playing.board.settled:
+            return
+
+
+def click(playing, x, y):
+    left, top = playing.layout.cell_origin(x, y)
+    half = playing.layout.cell / 2
+    playing.handle_events([pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1,
+                                              pos=(int(left + half), int(top + half)))])
+
+
+def press(playing, key, mod=0):
+    playing.handle_events([pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod, unicode='')])
+
+
+def move(playing):
+    board = playing.board
+    move_count = board.move_count
+    x1, y1, x2, y2 = find_moves(board.type_bytes(), board.width, board.height)[0]
+    click(playing, x1, y1)
+    click(playing, x2, y2)
+    assert board.move_count == move_count + 1
+    settle(playing)
+
+
+def progress(playing):
+    return playing.board.snapshot(), playing.score, playing.collected()
+
+
+def test_undo_redo_stacks():
+    history = BoardHistory(2)
+    first, second, third, current = (state(((i,),), i) for i in range(4))
+    for pushed in (first, second, third):
+        history.push(pushed)
+    assert list(history.undo_stack) == [second, third]
+    assert history.undo(current) == third
+    assert history.can_redo
+    assert history.redo(third) == current
+    assert not history.can_redo
+    history.push(first)
+    assert history.redo(current) is None
+    history.clear()
+    assert not history.can_undo and not history.can_redo
+
+
+def test_share_reuses_unchanged_columns():
+    history = BoardHistory()
+    first = history.share([(1, 2), (3, 4)])
+    second = history.share([(1, 2), (3, 5)])
+    assert second[0] is first[0]
+    assert second[1] == (3, 5)
+
+
+def test_undo_and_redo_restore_progress(game):
+    playing = PlayingState(game, CASUAL, 2, seed=7)
+    settle(playing)
+    states = [progress(playing)]
+    for _ in range(4):
+        move(playing)
+        states.append(progress(playing))
+    for expected in reversed(states[:-1]):
+        press(playing, pygame.K_z)
+        settle(playing)
+        assert progress(playing) == expected
+    for expected in states[1:]:
+        press(playing, pygame.K_y)
+        settle(playing)
+        assert progress(playing) == expected
+
+
+def test_new_move_clears_redo(game):
+    playing = PlayingState(game, CASUAL, 2, seed=7)
+    settle(playing)
+    move(playing)
+    press(playing, pygame.K_z)
+    settle(playing)
+    assert playing.board.history.can_redo
+    move(playing)
+    assert not playing.board.history.can_redo
+
+
+def test_history_only_in_casual_mode(game):
+    playing = PlayingState(game, TIME_ATTACK, 2, seed=7, record=False)
+    settle(playing)
+    move(playing)
+    assert not playing.board.history.can_undo
@@ -0,0 +1,64 @@
+import pytest
+from game.models.board import Board
+from game.models.match_group import SHAPE_CROSS, SHAPE_L, SHAPE_LINE, SHAPE_T
+from game.utils.snapshot import BoardSnapshot
+
+SIZE = 7
+
+
+def row(x1, x2, y):
+    return [(x, y) for x in range(x1, x2 + 1)]
+
+
+def column(x, y1, y2):
+    return [(x, y) for y in range(y1, y2 + 1)]
+
+
+def find(game, *runs):
+    board = Board(SIZE, SIZE, game.jewel_factory, game.audio, seed=0, fill=False,
+                  history_length=0)
+    types = [(x + 2 * y) % 4 + 1 for y in range(SIZE) for x in range(SIZE)]
+    for run in runs:
+        for x, y in run:
+            types[y * SIZE + x] = 0
+    board.restore(BoardSnapshot(SIZE, SIZE, bytes(t + 1 for t in types), (), 0, 0, 0))
+    return board.find_matches()
+
+
+def test_base_board_has_no_matches(game):
+    assert find(game) == []
+
+
+@pytest.mark.parametrize('runs, shape, pivot, longest', [
+    ((row(0, 2, 0), column(0, 0, 2)), SHAPE_L, (0, 0), 3),
+    ((row(2, 4, 4), column(4, 2, 4)), SHAPE_L, (4, 4), 3),
+    ((row(0, 2, 0), column(1, 0, 2)), SHAPE_T, (1, 0), 3),
+    ((row(1, 3, 3), column(3, 1, 5)), SHAPE_T, (3, 3), 5),
+    ((row(1, 3, 2), column(2, 1, 3)), SHAPE_CROSS, (2, 2), 3),
+    ((row(0, 4, 3), column(2, 1, 5)), SHAPE_CROSS, (2, 3), 5),
+    ((row(0, 3, 6), column(0, 3, 6)), SHAPE_L, (0, 6), 4),
+])
+def test_crossing_runs_form_one_group(game, runs, shape, pivot, longest):
+    group, = find(game, *runs)
+    cells = {cell for run in runs for cell in run}
+    assert sorted(group.cells) == sorted(cells)
+    assert len(group.cells) == len(cells)
+    assert group.type == 0
+    assert (group.shape, group.pivot, group.longest) == (shape, pivot, longest)
+
+
+def test_one_row_joins_two_columns(game):
+    runs = (row(0, 4, 3), column(0, 1, 3), column(4, 3, 5))
+    group, = find(game, *runs)
+    assert sorted(group.cells) == sorted({cell for run in runs for cell in run})
+    assert group.longest == 5
+    assert group.shape == SHAPE_L
+
+
+def test_separate_runs_stay_lines(game):
+    groups = find(game, row(0, 2, 0), row(4, 6, 0), column(3, 3, 6))
+    assert sorted(sorted(group.cells) for group in groups) == sorted(
+        [row(0, 2, 0), row(4, 6, 0), column(3, 3, 6)])
+    for group in groups:
+        assert (group.shape, group.pivot) == (SHAPE_LINE, None)
+        assert group.longest == len(group.cells)
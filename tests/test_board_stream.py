@@ -0,0 +1,184 @@
+import asyncio
+import json
+
+from game.constants import CASUAL, EFFECT_BOMB
+from game.load_client import find_moves
+from game.server import GameServer, GameSession
+from game.spectator import BoardMirror
+from game.utils.board_stream import (OP_FALL, OP_KEYFRAME, OP_SWAP, BoardStream, Keyframe,
+                                     StreamEvent, events)
+
+SETTLE_TIME = 60
+
+
+def make_session(game, level=1, seed=7):
+    return GameSession(1, game, CASUAL, level, seed, 0.0)
+
+
+def make_mirror(game):
+    return BoardMirror(game.jewel_factory, game.audio, animate=False)
+
+
+def watch(session, game, maxsize=0):
+    queue = asyncio.Queue(maxsize)
+    session.watch(queue)
+    mirror = make_mirror(game)
+    drain(queue, mirror)
+    return queue, mirror
+
+
+def drain(queue, mirror):
+    while not queue.empty():
+        for event in events(queue.get_nowait()):
+            mirror.feed(event)
+    mirror.update(SETTLE_TIME)
+
+
+def swap(session, moves=1):
+    board = session.board
+    for _ in range(moves):
+        move = find_moves(board.type_bytes(), board.width, board.height)[0]
+        assert asyncio.run(session.swap(*move))['valid']
+
+
+def assert_synced(session, mirror):
+    assert mirror.board.type_bytes() == session.board.type_bytes()
+    assert mirror.board.snapshot().specials == session.board.snapshot().specials
+    assert mirror.score == session.score
+
+
+def test_keyframe_round_trip(game):
+    board = make_session(game).board
+    stream = BoardStream(board, 120)
+    snapshot = board.snapshot()
+    for reset in (False, True):
+        event, = events(stream.encode_keyframe(reset))
+        assert event.op == OP_KEYFRAME
+        assert event.data == Keyframe(snapshot.width, snapshot.height, 120, snapshot.cells,
+                                      snapshot.specials, reset)
+
+
+def test_delta_round_trip(game):
+    board = make_session(game).board
+    stream = BoardStream(board)
+    stream.flush()
+    stream.swap(1, 2, 2, 2)
+    stream.clear([(0, 0), (3, 4)])
+    stream.specials({(3, 4): EFFECT_BOMB})
+    stream.falls({0: [(0, 1), (2, 3)]})
+    stream.spawns({0: [4, 2]})
+    stream.points(150)
+    decoded = list(events(stream.flush()))
+    width = board.width
+    assert [event.sequence for event in decoded] == list(range(1, 7))
+    assert [event.data for event in decoded] == [
+        (1, 2, 2, 2), (0, 4 * width + 3), ((4 * width + 3, EFFECT_BOMB),),
+        ((0, ((0, 1), (2, 3))),), ((0, (4, 2)),), 150]
+    assert stream.score == 150
+
+
+def test_mirror_follows_session(game):
+    session = make_session(game)
+    queue, mirror = watch(session, game)
+    for _ in range(40):
+        swap(session)
+        drain(queue, mirror)
+        assert_synced(session, mirror)
+    assert mirror.stats['keyframes'] > 1
+    assert mirror.stats['gaps'] == mirror.stats['desyncs'] == 0
+
+
+def test_reset_keyframe_is_not_a_desync(game):
+    session = make_session(game)
+    queue, mirror = watch(session, game)
+    swap(session, 3)
+    drain(queue, mirror)
+    session.board.reshuffle()
+    session.settle()
+    session.publish()
+    drain(queue, mirror)
+    assert_synced(session, mirror)
+    assert mirror.stats['desyncs'] == 0
+
+
+def test_dropped_chunks_resync_without_desync(game):
+    session = make_session(game)
+    queue, mirror = watch(session, game, maxsize=1)
+    swap(session, 3)
+    drain(queue, mirror)
+    assert session.dropped == 2
+    assert_synced(session, mirror)
+    assert mirror.stats['desyncs'] == 0
+
+
+def test_stale_keyframe_is_a_desync(game):
+    session = make_session(game)
+    queue, mirror = watch(session, game)
+    mirror.board.grid_manager.swap_jewels(0, 0, 1, 0)
+    mirror.board.grid_manager.swap_jewels(0, 0, 0, 1)
+    session.board.stream.keyframe()
+    session.publish()
+    drain(queue, mirror)
+    assert mirror.stats['desyncs'] == 1
+    assert_synced(session, mirror)
+
+
+def keyframe_with_hole(width=8, height=8):
+    cells = bytearray(index % 5 + 1 for index in range(width * height))
+    cells[0] = 0
+    return StreamEvent(1, OP_KEYFRAME, Keyframe(width, height, 0, bytes(cells), ()))
+
+
+def test_fall_from_empty_cell_loses_sync(game):
+    mirror = make_mirror(game)
+    mirror.feed(keyframe_with_hole())
+    mirror.feed(StreamEvent(2, OP_FALL, ((0, ((0, 1),)),)))
+    mirror.feed(StreamEvent(3, OP_SWAP, (2, 2, 3, 2)))
+    mirror.update(0)
+    assert not mirror.synced
+    assert mirror.stats['desyncs'] == 1
+    assert not mirror.pending
+    mirror.feed(StreamEvent(4, OP_SWAP, (2, 2, 3, 2)))
+    assert not mirror.pending
+
+
+def test_swap_with_empty_cell_loses_sync(game):
+    mirror = make_mirror(game)
+    mirror.feed(keyframe_with_hole())
+    mirror.feed(StreamEvent(2, OP_SWAP, (0, 0, 1, 0)))
+    mirror.update(0)
+    assert not mirror.synced
+    assert mirror.stats['desyncs'] == 1
+    mirror.feed(keyframe_with_hole())
+    mirror.update(0)
+    assert mirror.synced
+    assert mirror.stats['desyncs'] == 1
+
+
+def test_watcher_disconnect_ends_stream(game):
+    async def run():
+        server = GameServer(game)
+        listener = await server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        player = await asyncio.open_connection("127.0.0.1", port)
+        watcher = await asyncio.open_connection("127.0.0.1", port)
+        for (reader, writer), request in ((player, {'op': 'create', 'mode': CASUAL, 'seed': 7}),
+                                          (watcher, {'op': 'watch'})):
+            writer.write(json.dumps(request).encode() + b'\n')
+            assert json.loads(await reader.readline())['ok']
+        session, = server.sessions.values()
+        while not session.watchers:
+            await asyncio.sleep(0)
+        watcher[1].close()
+        await asyncio.wait_for(watcher[1].wait_closed(), 5)
+        for _ in range(100):
+            if server.clients == 1:
+                break
+            await asyncio.sleep(0.01)
+        assert server.clients == 1
+        assert session.watchers == []
+        player[1].close()
+        listener.close()
+        await listener.wait_closed()
+
+    asyncio.run(run())
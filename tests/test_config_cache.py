@@ -0,0 +1,37 @@
+import marshal
+import os
+
+import pytest
+from game.utils.config_cache import DEFAULT_CACHE_FILE, ConfigCache
+
+
+def test_cache_is_stored_next_to_levels(config_files, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path.parent)
+    cache = ConfigCache()
+    levels, jewels = cache.load(*config_files)
+    assert cache.rebuilt
+    assert cache.cache_file == os.path.join(str(tmp_path), DEFAULT_CACHE_FILE)
+    assert os.path.exists(cache.cache_file)
+    cache = ConfigCache()
+    cached_levels, cached_jewels = cache.load(*config_files)
+    assert not cache.rebuilt
+    assert cached_jewels == jewels
+    assert len(cached_levels) == len(levels)
+
+
+@pytest.mark.parametrize('payload', [
+    b'',
+    b'\x00garbage',
+    b'cos\nsystem\n(S"true"\ntR.',
+    marshal.dumps([1, 2, 3]),
+    marshal.dumps({'version': 4, 'config_files': [], 'level_index': [], 'jewels': []}),
+    marshal.dumps({'version': 4, 'config_files': {'levels': 'x'}, 'level_index': [], 'jewels': []}),
+])
+def test_bad_cache_is_rebuilt(config_files, tmp_path, payload):
+    cache_file = tmp_path / DEFAULT_CACHE_FILE
+    cache_file.write_bytes(payload)
+    cache = ConfigCache()
+    levels, jewels = cache.load(*config_files)
+    assert cache.rebuilt
+    assert len(jewels) == 5
+    assert levels[0]['id'] == 1
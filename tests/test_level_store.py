@@ -0,0 +1,62 @@
+import pytest
+from game.constants import GRID_SIZE
+from game.utils.config_loader import ConfigError
+from game.utils.level_store import LevelStore
+
+LEVEL = ('<level id="{id}"><target_score>{score}</target_score><time_limit>60</time_limit>'
+         '{extra}</level>')
+
+
+def write_levels(tmp_path, *levels):
+    path = tmp_path / "levels.xml"
+    path.write_text("<levels>\n" + "\n".join(levels) + "\n</levels>\n")
+    return str(path)
+
+
+def level(level_id, extra=""):
+    return LEVEL.format(id=level_id, score=level_id * 100, extra=extra)
+
+
+def test_index_and_lookup(tmp_path):
+    filename = write_levels(tmp_path, level(1), level(7, "<width>10</width><height>12</height>"),
+                            level(3, "<board><row>0 1 2</row></board>"))
+    store = LevelStore(filename)
+    assert [level_id for level_id, _, _ in store.index] == [1, 7, 3]
+    assert len(store) == 3
+    assert store[0]['target_score'] == 100
+    assert (store[0]['width'], store[0]['height']) == (GRID_SIZE, GRID_SIZE)
+    assert (store[1]['width'], store[1]['height']) == (10, 12)
+    assert store[-1]['board'] == [[0, 1, 2]]
+    assert store.get_by_id(7) is store[1]
+    with pytest.raises(IndexError):
+        store[3]
+    assert list(store) == [store[0], store[1], store[2]]
+
+
+def test_cache_keeps_recent_levels(tmp_path, monkeypatch):
+    store = LevelStore(write_levels(tmp_path, level(1), level(2), level(3)), cache_size=2)
+    loads = []
+    load = store._load
+    monkeypatch.setattr(store, '_load', lambda position: loads.append(position) or load(position))
+    for position in (0, 1, 0, 2, 0, 1):
+        store[position]
+    assert loads == [0, 1, 2, 1]
+    assert list(store.cache) == [0, 1]
+
+
+@pytest.mark.parametrize('levels, message', [
+    ((level(1), level(2, "<width>99</width>")), "level 2 width"),
+    ((level(1), level(4, "<undo>-1</undo>")), "level 4 undo"),
+    ((level(1), '<level id="5"><time_limit>60</time_limit></level>'), "level 5"),
+    ((level(1), '<level id="x"><target_score>1</target_score></level>'), "invalid literal"),
+    ((), "no levels defined"),
+    ((level(1), "<level"), "Invalid levels config"),
+])
+def test_invalid_levels_are_rejected(tmp_path, levels, message):
+    with pytest.raises(ConfigError, match=message):
+        LevelStore(write_levels(tmp_path, *levels))
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(ConfigError):
+        LevelStore(str(tmp_path / "missing.xml"))
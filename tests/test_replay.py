@@ -0,0 +1,62 @@
+import pytest
+from game.constants import FIXED_DT, SCORE_CHALLENGE
+from game.load_client import find_moves
+from game.replay_player import play
+from game.states.playing_state import PlayingState
+from game.utils.replay import Replay, ReplayError, Swap
+
+MAX_FRAMES = 3000
+
+
+def settle(playing):
+    for _ in range(MAX_FRAMES):
+        playing.update(FIXED_DT)
+        if playing.board.settled:
+            return
+
+
+def record(game, moves, seed=9):
+    playing = PlayingState(game, SCORE_CHALLENGE, 1, seed=seed, record=False)
+    board = playing.board
+    replay = Replay(seed, 1, SCORE_CHALLENGE)
+    for _ in range(moves):
+        settle(playing)
+        move = find_moves(board.type_bytes(), board.width, board.height)[-1]
+        board.swap_jewels(*move)
+        replay.record_swap(playing.level_manager.elapsed, *move)
+    settle(playing)
+    replay.finish(playing.level_manager.elapsed, playing.score, board.state_hash(),
+                  board.resolve_count)
+    return replay
+
+
+def test_bytes_round_trip():
+    replay = Replay(123, 2, SCORE_CHALLENGE, [Swap(50, 1, 2, 1, 3), Swap(900, 4, 4, 5, 4)],
+                    duration_ms=1500, score=320, board_hash=0xdeadbeef, steps=7)
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert vars(loaded) == vars(replay)
+
+
+def test_save_and_load(tmp_path):
+    replay = Replay(5, 1, SCORE_CHALLENGE, [Swap(10, 0, 0, 1, 0)])
+    filename = replay.save(str(tmp_path / "game.jqr"))
+    assert Replay.load(filename).to_bytes() == replay.to_bytes()
+
+
+def test_invalid_replays(tmp_path):
+    data = Replay(5, 1, SCORE_CHALLENGE, [Swap(10, 0, 0, 1, 0)]).to_bytes()
+    with pytest.raises(ReplayError):
+        Replay.from_bytes(b'XYZ' + data[3:])
+    with pytest.raises(ReplayError):
+        Replay.from_bytes(data[:-1])
+    with pytest.raises(ReplayError):
+        Replay.load(str(tmp_path / "missing.jqr"))
+
+
+def test_playback_reproduces_recording(game):
+    replay = record(game, 8)
+    assert replay.score > 0
+    result = play(Replay.from_bytes(replay.to_bytes()), game)
+    assert result['swaps'] == 8
+    assert result['steps'] == replay.steps
+    assert result['ok']
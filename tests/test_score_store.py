@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from game.constants import CASUAL, SCORE_CHALLENGE, TIME_ATTACK
+from game.utils.score_store import ScoreStore
+
+WAIT = 5
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.db"), legacy_file=None, top_k=3)
+    yield store
+    store.close()
+
+
+def test_reads_do_not_wait_for_the_writer(store):
+    committed = threading.Event()
+    resume = threading.Event()
+    on_written = store.writer.on_written
+
+    def parked(records, last_id):
+        committed.set()
+        assert resume.wait(WAIT)
+        on_written(records, last_id)
+
+    store.writer.on_written = parked
+    store.add("ann", 500, 1, TIME_ATTACK)
+    assert committed.wait(WAIT)
+    assert [record['points'] for record in store.top_scores(TIME_ATTACK)] == [500]
+    assert store.count(TIME_ATTACK) == 1
+    assert store.levels(TIME_ATTACK) == [1]
+    resume.set()
+    store.flush()
+    assert not store.pending
+    assert [record['points'] for record in store.top_scores(TIME_ATTACK)] == [500]
+    assert store.count() == 1
+
+
+def test_rejected_score_is_not_ranked(store):
+    store.writer.submit = lambda record: False
+    store.add("bob", 900, 1, SCORE_CHALLENGE)
+    assert not store.pending
+    assert store.top[SCORE_CHALLENGE] == []
+    assert store.count() == 0
+
+
+def test_top_k_heap_tracks_the_cutoff(store):
+    assert store.is_high_score(TIME_ATTACK, 1)
+    assert not store.is_high_score(TIME_ATTACK, 0)
+    for points in (300, 100, 500, 200):
+        store.add("ann", points, 1, TIME_ATTACK)
+    assert sorted(store.top[TIME_ATTACK]) == [200, 300, 500]
+    assert not store.is_high_score(TIME_ATTACK, 200)
+    assert store.is_high_score(TIME_ATTACK, 201)
+    assert store.is_high_score(SCORE_CHALLENGE, 1)
+    store.flush()
+    reloaded = ScoreStore(store.filename, legacy_file=None, top_k=3)
+    try:
+        assert sorted(reloaded.top[TIME_ATTACK]) == [200, 300, 500]
+        assert reloaded.top[SCORE_CHALLENGE] == []
+    finally:
+        reloaded.close()
+
+
+def test_flush_writes_pending_scores(store):
+    for points, level in ((300, 1), (100, 2), (500, 2)):
+        store.add("ann", points, level, TIME_ATTACK)
+    store.add("bob", 400, 1, SCORE_CHALLENGE)
+    store.flush()
+    assert not store.pending
+    rows = store.connection.execute("SELECT points FROM scores ORDER BY id").fetchall()
+    assert [row[0] for row in rows] == [300, 100, 500, 400]
+    assert store.count() == 4
+    assert store.count(TIME_ATTACK, 2) == 2
+    assert store.levels(TIME_ATTACK) == [1, 2]
+    store.add("cat", 350, 1, TIME_ATTACK)
+    assert [record['points'] for record in store.top_scores(TIME_ATTACK)] == [500, 350, 300, 100]
+    assert [record['points'] for record in store.top_scores(TIME_ATTACK, limit=2, offset=1)] == [350, 300]
+
+
+def test_casual_scores_are_named(store):
+    assert store.is_high_score(CASUAL, 10)
+    store.add("dan", 10, 1, CASUAL)
+    store.flush()
+    record, = store.top_scores(CASUAL)
+    assert record['mode_name'] == "Casual"
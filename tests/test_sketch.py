@@ -0,0 +1,73 @@
+import random
+
+import pytest
+from game.utils.sketch import QuantileSketch
+
+FRACTIONS = (0.5, 0.9, 0.99)
+
+
+def exact_quantile(values, fraction):
+    values = sorted(values)
+    return values[int(fraction * (len(values) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(1, 1.5) for _ in range(5000)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    for fraction in FRACTIONS:
+        expected = exact_quantile(values, fraction)
+        assert sketch.quantile(fraction) == pytest.approx(expected, rel=sketch.relative_accuracy)
+    assert sketch.quantile(0) == pytest.approx(min(values), rel=sketch.relative_accuracy)
+    assert sketch.quantile(1) == pytest.approx(max(values), rel=sketch.relative_accuracy)
+    assert sketch.min == min(values) and sketch.max == max(values)
+
+
+def test_zeros_and_weights():
+    sketch = QuantileSketch()
+    sketch.add(0.0, 3)
+    sketch.add(10.0)
+    assert sketch.count == 4
+    assert sketch.quantile(0.5) == 0.0
+    assert sketch.quantile(1) == 10.0
+    assert sketch.summary(FRACTIONS)['mean'] == 2.5
+
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(5)
+    values = [rng.uniform(0, 100) for _ in range(2000)]
+    whole = QuantileSketch()
+    left = QuantileSketch()
+    right = QuantileSketch()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+    assert left.bins == whole.bins
+    assert left.summary(FRACTIONS) == whole.summary(FRACTIONS)
+
+
+def test_collapse_keeps_bins_bounded():
+    sketch = QuantileSketch(max_bins=16)
+    for i in range(1, 1000):
+        sketch.add(i * 1.5)
+    assert len(sketch.bins) <= 16
+    assert sum(sketch.bins.values()) == sketch.count == 999
+    assert sketch.quantile(0.99) == pytest.approx(
+        exact_quantile([i * 1.5 for i in range(1, 1000)], 0.99), rel=0.01)
+
+
+def test_empty_summary():
+    assert QuantileSketch().summary(FRACTIONS) == {'count': 0}
+    assert QuantileSketch().quantile(0.5) == 0.0
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        QuantileSketch(relative_accuracy=0)
+    with pytest.raises(ValueError):
+        QuantileSketch().add(-1)
+    with pytest.raises(ValueError):
+        QuantileSketch().merge(QuantileSketch(relative_accuracy=0.05))
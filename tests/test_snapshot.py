@@ -0,0 +1,83 @@
+import pytest
+from game.constants import FIXED_DT, TIME_ATTACK
+from game.load_client import find_moves
+from game.states.playing_state import PlayingState
+from game.utils.snapshot import SessionSnapshot, SnapshotError
+
+MAX_FRAMES = 3000
+
+
+def settle(playing):
+    for _ in range(MAX_FRAMES):
+        playing.update(FIXED_DT)
+        if playing.board.settled:
+            return
+
+
+def play(playing, moves):
+    board = playing.board
+    for _ in range(moves):
+        settle(playing)
+        board.swap_jewels(*find_moves(board.type_bytes(), board.width, board.height)[0])
+    settle(playing)
+
+
+@pytest.fixture
+def playing(game):
+    playing = PlayingState(game, TIME_ATTACK, 2, seed=42, record=False)
+    play(playing, 5)
+    return playing
+
+
+def test_bytes_round_trip(playing):
+    snapshot = playing.snapshot()
+    loaded = SessionSnapshot.from_bytes(snapshot.to_bytes())
+    assert loaded == snapshot._replace(elapsed=loaded.elapsed)
+    assert loaded.elapsed == pytest.approx(snapshot.elapsed, abs=0.001)
+
+
+def test_save_and_load(playing, tmp_path):
+    filename = str(tmp_path / "save.jqs")
+    snapshot = playing.snapshot()
+    snapshot.save(filename)
+    assert SessionSnapshot.load(filename).to_bytes() == snapshot.to_bytes()
+    assert not (tmp_path / "save.jqs.tmp").exists()
+
+
+def test_invalid_snapshots(playing, tmp_path):
+    data = playing.snapshot().to_bytes()
+    with pytest.raises(SnapshotError):
+        SessionSnapshot.from_bytes(b'XYZ' + data[3:])
+    with pytest.raises(SnapshotError):
+        SessionSnapshot.from_bytes(data[:40])
+    with pytest.raises(SnapshotError):
+        SessionSnapshot.load(str(tmp_path / "missing.jqs"))
+
+
+def test_resume_continues_identically(game, playing):
+    resumed = PlayingState(game, TIME_ATTACK, 2, snapshot=playing.snapshot())
+    assert resumed.board.state_hash() == playing.board.state_hash()
+    assert (resumed.score, resumed.collected()) == (playing.score, playing.collected())
+    play(playing, 5)
+    play(resumed, 5)
+    assert resumed.board.state_hash() == playing.board.state_hash()
+    assert resumed.score == playing.score
+
+
+def test_restart_restores_initial_board(game):
+    playing = PlayingState(game, TIME_ATTACK, 2, seed=42, record=False)
+    initial = playing.board.state_hash()
+    play(playing, 3)
+    playing.restart()
+    assert playing.board.state_hash() == initial
+    assert playing.score == 0
+
+
+def test_restart_after_resume_uses_the_session_seed(game, playing):
+    resumed = PlayingState(game, TIME_ATTACK, 2, snapshot=playing.snapshot())
+    play(resumed, 2)
+    resumed.restart()
+    fresh = PlayingState(game, TIME_ATTACK, 2, seed=42, record=False)
+    assert resumed.seed == 42
+    assert resumed.board.state_hash() == fresh.board.state_hash()
+    assert resumed.score == 0
@@ -0,0 +1,57 @@
+import json
+import os
+import threading
+
+from game.models.event_bus import EventBus
+from game.utils.telemetry import Telemetry, TelemetryWriter
+
+WAIT = 5
+
+
+def read_files(directory):
+    names = sorted(os.listdir(directory))
+    return names, [[json.loads(line) for line in open(os.path.join(directory, name))]
+                   for name in names]
+
+
+def test_writer_rotates_and_prunes(tmp_path):
+    writer = TelemetryWriter(str(tmp_path), max_bytes=80, max_files=3)
+    for n in range(10):
+        writer.submit({'n': n, 'pad': 'x' * 20})
+    writer.close()
+    assert writer.written == 10
+    assert writer.files == 5
+    names, files = read_files(tmp_path)
+    assert names == [f"{writer.name}-{n:04d}.jsonl" for n in (3, 4, 5)]
+    assert [[record['n'] for record in records] for records in files] == [[4, 5], [6, 7], [8, 9]]
+    assert all(os.path.getsize(tmp_path / name) <= 80 for name in names)
+
+
+def test_full_queue_drops_records(tmp_path):
+    writer = TelemetryWriter(str(tmp_path), max_pending=2)
+    entered = threading.Event()
+    resume = threading.Event()
+    write = writer._write
+
+    def blocked(records):
+        entered.set()
+        assert resume.wait(WAIT)
+        write(records)
+
+    writer._write = blocked
+    telemetry = Telemetry(writer, source="test")
+    telemetry.start_session(EventBus(), "score", 1, 0, 8, 8)
+    assert entered.wait(WAIT)
+    assert writer.submit({'n': 1})
+    assert writer.submit({'n': 2})
+    assert not writer.submit({'n': 3})
+    telemetry.record('reshuffle')
+    assert writer.dropped == 2
+    resume.set()
+    writer.flush()
+    telemetry.close()
+    _, (records,) = read_files(tmp_path)
+    assert [record.get('type') for record in records] == ['session_start', None, None,
+                                                          'session_end']
+    assert records[-1]['dropped'] == 2
+    assert writer.written == 4
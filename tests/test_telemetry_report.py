@@ -0,0 +1,52 @@
+import json
+
+from game.telemetry_report import find_files, main, summarize_file
+
+RECORDS = [
+    {'type': 'session_start', 'session': 'a', 'mode': 'score', 'level': 1},
+    {'type': 'move', 'session': 'a', 'mode': 'score', 'level': 1, 'depth': 2, 'points': 40,
+     'think_ms': 900.0, 'resolve_ms': 0.4},
+    {'type': 'session_end', 'session': 'a', 'mode': 'score', 'level': 1, 'outcome': 'complete',
+     'score': 40, 'elapsed': 3.5, 'moves': 1, 'dropped': 2},
+]
+
+
+def write_telemetry(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines))
+    return str(path)
+
+
+def test_summarize_file(tmp_path):
+    path = write_telemetry(tmp_path / "telemetry-1.jsonl",
+                           [json.dumps(record) for record in RECORDS] + ["{broken", "[1]"])
+    aggregate = summarize_file(path)
+    assert (aggregate.files, aggregate.records, aggregate.errors) == (1, 3, 2)
+    level, = aggregate.summary()['levels']
+    assert level['completion_rate'] == 1.0
+    assert level['cascade_depth'] == {'2': 1}
+    assert aggregate.dropped == 2
+
+
+def test_unreadable_file_is_not_counted(tmp_path):
+    aggregate = summarize_file(str(tmp_path))
+    assert (aggregate.files, aggregate.errors) == (0, 1)
+
+
+def test_find_files_skips_missing_paths(tmp_path, capsys):
+    write_telemetry(tmp_path / "telemetry-1.jsonl", [])
+    write_telemetry(tmp_path / "other.jsonl", [])
+    missing = str(tmp_path / "missing.jsonl")
+    assert find_files([str(tmp_path), missing]) == [str(tmp_path / "telemetry-1.jsonl")]
+    assert f"Could not find {missing}" in capsys.readouterr().err
+
+
+def test_main_fails_without_readable_files(tmp_path, capsys):
+    assert main([str(tmp_path / "missing.jsonl")]) == 1
+    assert main([str(tmp_path), '--jobs', '1']) == 1
+    (tmp_path / "telemetry-0.jsonl").mkdir()
+    assert main([str(tmp_path), '--jobs', '1']) == 1
+    assert "No telemetry files could be read" in capsys.readouterr().err
+    path = write_telemetry(tmp_path / "telemetry-1.jsonl", [json.dumps(RECORDS[0])])
+    output = tmp_path / "summary.json"
+    assert main([path, '--jobs', '1', '--output', str(output)]) == 0
+    assert json.loads(output.read_text())['files'] == 1